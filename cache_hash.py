@@ -0,0 +1,244 @@
+# cache_hash.py
+# ==========================================================
+# Caché persistente de hashes de contenido (SQLite)
+# ==========================================================
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+
+class CacheHash:
+    """
+    Guarda el hash de cada archivo junto a su tamaño, fecha de modificación
+    (ns), inodo y dispositivo. Mientras esos datos no cambien, el hash
+    guardado se da por bueno y no hace falta volver a leer el archivo.
+
+    Si la ruta no está en la caché se busca por (inodo, dispositivo, tamaño,
+    mtime), de modo que un archivo renombrado o movido dentro del mismo
+    disco (cuarentena, restauración) sigue acertando. El dispositivo hace
+    falta porque el mismo inodo se repite en discos distintos.
+    """
+
+    def __init__(self, ruta, max_entradas=1_000_000, lote=200):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.lote = lote
+
+        self.aciertos = 0
+        self.fallos = 0
+
+        self._conexion = None
+        self._cambios = 0
+        self._lock = threading.RLock()
+
+    # ---------- CONEXIÓN ----------
+
+    def _abrir(self):
+        if self._conexion is not None:
+            return self._conexion
+
+        con = sqlite3.connect(self.ruta, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+
+        # Las cachés anteriores no guardaban el dispositivo: como solo es
+        # una caché, se empieza de cero
+        columnas = [fila[1] for fila in con.execute("PRAGMA table_info(hashes)")]
+        if columnas and "dispositivo" not in columnas:
+            con.execute("DROP TABLE hashes")
+
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS hashes (
+                ruta TEXT NOT NULL,
+                algoritmo TEXT NOT NULL,
+                tamano INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inodo INTEGER NOT NULL,
+                dispositivo INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                usado REAL NOT NULL,
+                PRIMARY KEY (ruta, algoritmo)
+            )
+            """
+        )
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_hashes_inodo_dispositivo "
+            "ON hashes (inodo, dispositivo, tamano, mtime_ns)"
+        )
+        con.commit()
+        self._conexion = con
+        self._limitar_tamano()
+        return con
+
+    def _anotar_cambio(self):
+        self._cambios += 1
+        if self._cambios >= self.lote:
+            self.guardar_cambios()
+
+    def guardar_cambios(self):
+        """Confirma en disco los cambios pendientes."""
+        with self._lock:
+            if self._conexion is not None and self._cambios:
+                self._conexion.commit()
+            self._cambios = 0
+
+    def cerrar(self):
+        with self._lock:
+            if self._conexion is not None:
+                self.guardar_cambios()
+                self._conexion.close()
+                self._conexion = None
+
+    # ---------- CONSULTA / ALTA ----------
+
+    def obtener(self, ruta, st, algoritmo="sha256"):
+        """
+        Devuelve el hash guardado si el archivo no ha cambiado (según su
+        os.stat 'st'), o None si hay que calcularlo.
+        """
+        with self._lock:
+            con = self._abrir()
+            fila = con.execute(
+                "SELECT digest, tamano, mtime_ns, inodo, dispositivo FROM hashes "
+                "WHERE ruta = ? AND algoritmo = ?",
+                (ruta, algoritmo),
+            ).fetchone()
+
+            if fila and fila[1:] == (st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev):
+                digest = fila[0]
+            else:
+                digest = None
+                if st.st_ino:
+                    otra = con.execute(
+                        "SELECT digest FROM hashes WHERE inodo = ? AND dispositivo = ? "
+                        "AND tamano = ? AND mtime_ns = ? AND algoritmo = ? LIMIT 1",
+                        (st.st_ino, st.st_dev, st.st_size, st.st_mtime_ns, algoritmo),
+                    ).fetchone()
+                    if otra:
+                        digest = otra[0]
+
+            if digest is None:
+                self.fallos += 1
+                return None
+
+            self.aciertos += 1
+            self._guardar(con, ruta, st, digest, algoritmo)
+            return digest
+
+    def guardar(self, ruta, st, digest, algoritmo="sha256"):
+        """Guarda (o actualiza) el hash de un archivo."""
+        with self._lock:
+            self._guardar(self._abrir(), ruta, st, digest, algoritmo)
+
+    def _guardar(self, con, ruta, st, digest, algoritmo):
+        con.execute(
+            "INSERT OR REPLACE INTO hashes "
+            "(ruta, algoritmo, tamano, mtime_ns, inodo, dispositivo, digest, usado) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                ruta, algoritmo, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev,
+                digest, time.time(),
+            ),
+        )
+        self._anotar_cambio()
+
+    def olvidar(self, ruta):
+        """
+        Elimina de la caché las entradas de una ruta (p. ej. tras borrarla o
+        cambiar su contenido) y las de otras rutas con su mismo inodo, que
+        si no seguirían acertando por la búsqueda por inodo.
+        """
+        with self._lock:
+            con = self._abrir()
+            inodos = con.execute(
+                "SELECT DISTINCT inodo, dispositivo FROM hashes WHERE ruta = ?",
+                (ruta,),
+            ).fetchall()
+            con.execute("DELETE FROM hashes WHERE ruta = ?", (ruta,))
+            con.executemany(
+                "DELETE FROM hashes WHERE inodo = ? AND dispositivo = ?",
+                [(inodo, dispositivo) for inodo, dispositivo in inodos if inodo],
+            )
+            self._anotar_cambio()
+
+    # ---------- MANTENIMIENTO ----------
+
+    def purgar_inexistentes(self):
+        """
+        Elimina las entradas cuyos archivos ya no existen o han cambiado.
+        Devuelve cuántas entradas se han eliminado.
+        """
+        with self._lock:
+            con = self._abrir()
+            filas = con.execute(
+                "SELECT ruta, algoritmo, tamano, mtime_ns, inodo, dispositivo FROM hashes"
+            ).fetchall()
+
+        obsoletas = []
+        for ruta, algoritmo, *guardado in filas:
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                obsoletas.append((ruta, algoritmo))
+                continue
+            if (st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev) != tuple(guardado):
+                obsoletas.append((ruta, algoritmo))
+
+        with self._lock:
+            con.executemany(
+                "DELETE FROM hashes WHERE ruta = ? AND algoritmo = ?", obsoletas
+            )
+            con.commit()
+            self._cambios = 0
+        return len(obsoletas)
+
+    def _limitar_tamano(self):
+        """Si se supera max_entradas, elimina las menos usadas recientemente."""
+        con = self._conexion
+        total = con.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        sobrantes = total - self.max_entradas
+        if sobrantes > 0:
+            con.execute(
+                "DELETE FROM hashes WHERE rowid IN ("
+                "SELECT rowid FROM hashes ORDER BY usado LIMIT ?)",
+                (sobrantes,),
+            )
+            con.commit()
+
+    def estadisticas(self):
+        """
+        Entradas guardadas y contadores de aciertos / fallos desde que se
+        abrió la caché.
+        """
+        with self._lock:
+            entradas = self._abrir().execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": entradas,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_acierto": (self.aciertos / consultas) if consultas else 0.0,
+        }
+
+
+_caches_abiertas = []
+
+
+def abrir_cache(ruta, **opciones):
+    """Crea una caché de hashes que se guarda sola al cerrar el programa."""
+    cache = CacheHash(ruta, **opciones)
+    _caches_abiertas.append(cache)
+    return cache
+
+
+@atexit.register
+def _cerrar_caches_abiertas():
+    for cache in _caches_abiertas:
+        try:
+            cache.cerrar()
+        except Exception:
+            pass
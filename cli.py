@@ -0,0 +1,351 @@
+# cli.py
+# ==========================================================
+# Línea de órdenes del Gestor de Archivos (sin interfaz gráfica)
+# ==========================================================
+#
+#   python -m cli escanear  D:/Takeout
+#   python -m cli aplicar-fechas D:/Takeout --nativo
+#   python -m cli cuarentena D:/Takeout .zip --si
+#   python -m cli limpiar-cache
+#
+# El progreso va a stderr y el resumen final, en JSON, a stdout, así que
+# se puede usar desde cron o desde otro programa. Los módulos pesados se
+# cargan solo después de leer los argumentos, para que --help y los
+# errores de uso salgan al momento.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from motor_hash import ALGORITMO_POR_DEFECTO, ALGORITMOS
+
+# Cada cuánto (segundos) se pinta el progreso como mucho
+INTERVALO_PROGRESO = 0.5
+
+# Códigos de salida
+SALIDA_OK = 0
+SALIDA_CON_ERRORES = 1
+SALIDA_NO_EJECUTADA = 2
+
+
+class Consola:
+    """Muestra en stderr las líneas y el progreso de los eventos del núcleo."""
+
+    def __init__(self, silencioso=False, flujo=None):
+        self.silencioso = silencioso
+        self.flujo = flujo or sys.stderr
+        self.interactiva = self.flujo.isatty()
+        self._ultimo = 0.0
+        self._pintados = None
+        self._linea_abierta = False
+
+    def _escribir(self, texto):
+        if self._linea_abierta:
+            self.flujo.write("\n")
+            self._linea_abierta = False
+        self.flujo.write(texto + "\n")
+
+    def mostrar(self, evento):
+        """Procesa un evento y devuelve sus datos si es el resumen."""
+        tipo = evento["tipo"]
+        if tipo == "linea":
+            # Los avisos y errores salen siempre, aunque sea en silencio
+            if not self.silencioso or evento["nivel"] != "info":
+                self._escribir(evento["texto"])
+        elif tipo == "progreso" and not self.silencioso:
+            ahora = time.monotonic()
+            hechos, total = evento["hechos"], evento["total"]
+            if hechos == self._pintados or (
+                hechos < total and ahora - self._ultimo < INTERVALO_PROGRESO
+            ):
+                return None
+            self._ultimo = ahora
+            self._pintados = hechos
+            self._pintar_progreso(evento)
+        elif tipo == "resumen":
+            if self._linea_abierta:
+                self.flujo.write("\n")
+                self._linea_abierta = False
+            self.flujo.flush()
+            return evento["datos"]
+        return None
+
+    def _pintar_progreso(self, evento):
+        hechos, total = evento["hechos"], evento["total"]
+        texto = f"[{hechos}/{total}] {100 * hechos // max(1, total)}%"
+        velocidad = evento.get("archivos_por_segundo")
+        if velocidad:
+            texto += f" · {velocidad:.0f} arch/s"
+        restante = evento.get("segundos_restantes")
+        if restante is not None and hechos < total:
+            texto += f" · quedan {restante:.0f} s"
+
+        if self.interactiva:
+            self.flujo.write("\r" + texto.ljust(60))
+            self._linea_abierta = True
+        else:
+            self._escribir(texto)
+        self.flujo.flush()
+
+
+def confirmar(pregunta, si=False):
+    """
+    True si se ha confirmado con --si o, en una terminal, respondiendo
+    's'. Sin terminal (cron, tuberías) y sin --si no se hace nada.
+    """
+    if si:
+        return True
+    if not sys.stdin.isatty():
+        print(f"{pregunta} (usa --si para confirmar sin preguntar)", file=sys.stderr)
+        return False
+    respuesta = input(f"{pregunta} [s/N] ").strip().lower()
+    return respuesta in ("s", "si", "sí", "y", "yes")
+
+
+# ---------- ÓRDENES ----------
+# Cada una devuelve el generador de eventos del núcleo, o None si no hay
+# nada que hacer (y entonces devuelve también el resumen).
+
+def _orden_escanear(nucleo, args):
+    return nucleo.escanear(args.ruta), None
+
+
+def _orden_informe(nucleo, args):
+    generador = nucleo.informe_sin_json(
+        args.ruta, guardar=not args.sin_guardar, comprobar_fechas=args.comprobar_fechas
+    )
+    return generador, None
+
+
+def _orden_generar_json(nucleo, args):
+    generador = nucleo.generar_json(
+        args.ruta, simulacion=not args.crear, usar_fecha_interna=not args.sin_fecha_interna
+    )
+    return generador, None
+
+
+def _orden_aplicar_fechas(nucleo, args):
+    generador = nucleo.aplicar_fechas(
+        args.ruta,
+        saltar_sin_cambios=not args.todos,
+        solo_fechas_archivo=args.nativo,
+        escribir_fecha_interna=args.fecha_interna,
+    )
+    return generador, None
+
+
+def _orden_renombrar(nucleo, args):
+    generador = nucleo.renombrar_archivos(
+        args.ruta, args.desde, args.a, revertir=args.revertir
+    )
+    return generador, None
+
+
+def _orden_cuarentena(nucleo, args):
+    if args.listar:
+        return nucleo.listar_cuarentena(args.ruta), None
+    if not args.extension:
+        raise nucleo.ErrorOperacion("Indica la extensión de los archivos (p. ej. .zip).")
+
+    archivos = nucleo.buscar_por_extension(args.ruta, args.extension)
+    if not archivos:
+        return None, {"total": 0, "eliminados": 0, "errores": 0}
+    if args.definitivo:
+        pregunta = f"¿Eliminar definitivamente {len(archivos)} archivos con {args.extension}?"
+    else:
+        pregunta = f"¿Enviar a cuarentena {len(archivos)} archivos con {args.extension}?"
+    if not confirmar(pregunta, args.si):
+        return None, {"total": len(archivos), "cancelado": True}
+    generador = nucleo.eliminar_archivos(
+        args.ruta, archivos, usar_cuarentena=not args.definitivo
+    )
+    return generador, None
+
+
+def _orden_restaurar(nucleo, args):
+    archivos = nucleo.archivos_en_cuarentena(args.ruta, args.archivos)
+    if not archivos:
+        return None, {"total": 0, "restaurados": 0, "errores": 0}
+    if not confirmar(f"¿Restaurar {len(archivos)} archivo(s) desde la cuarentena?", args.si):
+        return None, {"total": len(archivos), "cancelado": True}
+    return nucleo.restaurar_cuarentena(args.ruta, archivos), None
+
+
+def _orden_purgar(nucleo, args):
+    archivos = nucleo.archivos_en_cuarentena(args.ruta, args.archivos)
+    if not archivos:
+        return None, {"total": 0, "purgados": 0, "errores": 0}
+    pregunta = (
+        f"Se van a ELIMINAR DEFINITIVAMENTE {len(archivos)} archivo(s) de la "
+        "cuarentena. ¿Continuar?"
+    )
+    if not confirmar(pregunta, args.si):
+        return None, {"total": len(archivos), "cancelado": True}
+    return nucleo.purgar_cuarentena(archivos), None
+
+
+def _orden_limpiar_cache(nucleo, args):
+    from utils import estadisticas_cache_hash, purgar_cache_hash
+
+    eliminadas = purgar_cache_hash()
+    return None, {"eliminadas": eliminadas, **estadisticas_cache_hash()}
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Gestor de Archivos Unificado sin interfaz gráfica. "
+        "El progreso sale por stderr y el resumen (JSON) por stdout.",
+    )
+    parser.add_argument(
+        "-q", "--silencioso", action="store_true",
+        help="no mostrar progreso ni líneas informativas (sí avisos y errores)",
+    )
+    parser.add_argument(
+        "--algoritmo", choices=sorted(ALGORITMOS), default=ALGORITMO_POR_DEFECTO,
+        help="algoritmo de los hashes nuevos (por defecto %(default)s; "
+        "blake2b es más rápido en CPU sin instrucciones SHA)",
+    )
+    # Las opciones generales valen también detrás de la orden
+    comunes = argparse.ArgumentParser(add_help=False)
+    comunes.add_argument(
+        "-q", "--silencioso", action="store_true", default=argparse.SUPPRESS,
+        help=argparse.SUPPRESS,
+    )
+    comunes.add_argument(
+        "--algoritmo", choices=sorted(ALGORITMOS), default=argparse.SUPPRESS,
+        help=argparse.SUPPRESS,
+    )
+    ordenes = parser.add_subparsers(dest="orden", metavar="ORDEN", required=True)
+
+    def orden(nombre, alias, funcion, ayuda):
+        sub = ordenes.add_parser(
+            nombre, aliases=[alias], parents=[comunes], help=ayuda, description=ayuda
+        )
+        sub.add_argument("ruta", help="carpeta base (Takeout / Google Fotos)")
+        sub.set_defaults(funcion=funcion, nombre_orden=nombre)
+        return sub
+
+    orden("escanear", "scan", _orden_escanear,
+          "escanear la carpeta (actualiza el índice incremental)")
+
+    sub = orden("informe", "report", _orden_informe,
+                "informe de archivos sin JSON y JSON sin fecha")
+    sub.add_argument("--sin-guardar", action="store_true",
+                     help="no escribir el informe_sin_json_*.txt")
+    sub.add_argument("--comprobar-fechas", action="store_true",
+                     help="listar también los JSON sin fecha (lee cada JSON: más lento)")
+
+    sub = orden("generar-json", "generate-json", _orden_generar_json,
+                "crear JSON desde el nombre del archivo o desde un JSON similar")
+    sub.add_argument("--crear", action="store_true",
+                     help="crear los JSON de verdad (por defecto solo simula)")
+    sub.add_argument("--sin-fecha-interna", action="store_true",
+                     help="no leer la fecha EXIF / QuickTime de dentro de los archivos")
+
+    sub = orden("aplicar-fechas", "apply-dates", _orden_aplicar_fechas,
+                "poner a cada archivo la fecha de su JSON")
+    # Como en la interfaz: ExifTool por defecto, el motor nativo si se pide
+    motor = sub.add_mutually_exclusive_group()
+    motor.add_argument("--nativo", action="store_true",
+                       help="poner las fechas del archivo desde Python (os.utime), "
+                       "sin arrancar ExifTool (más rápido)")
+    motor.add_argument("--exiftool", action="store_false", dest="nativo",
+                       help="usar ExifTool (es lo que se hace por defecto)")
+    sub.add_argument("--todos", action="store_true",
+                     help="reescribir también los que ya tienen la fecha correcta")
+    sub.add_argument("--fecha-interna", action="store_true",
+                     help="escribir también la fecha dentro de los JPEG y vídeos MP4 / MOV "
+                     "(en el sitio; exiftool solo si no se pueden parchear)")
+
+    sub = orden("renombrar", "rename", _orden_renombrar,
+                "cambiar la terminación de los archivos")
+    sub.add_argument("--desde", default=".supplemental-metadata.json",
+                     help="terminación actual (por defecto %(default)s)")
+    sub.add_argument("--a", default=".json",
+                     help="terminación nueva (por defecto %(default)s)")
+    sub.add_argument("--revertir", action="store_true",
+                     help="deshacer un renombrado registrado (comprueba el hash)")
+
+    sub = orden("cuarentena", "quarantine", _orden_cuarentena,
+                "enviar a la cuarentena los archivos con una extensión")
+    sub.add_argument("extension", nargs="?", help="p. ej. .zip")
+    sub.add_argument("--definitivo", action="store_true",
+                     help="borrar definitivamente en vez de mover a la cuarentena")
+    sub.add_argument("--listar", action="store_true",
+                     help="solo listar lo que hay en la cuarentena")
+    sub.add_argument("-y", "--si", action="store_true", help="no pedir confirmación")
+
+    sub = orden("restaurar", "restore", _orden_restaurar,
+                "devolver archivos de la cuarentena a su sitio")
+    sub.add_argument("archivos", nargs="*", help="solo estos (por defecto, todos)")
+    sub.add_argument("-y", "--si", action="store_true", help="no pedir confirmación")
+
+    sub = orden("purgar", "purge", _orden_purgar,
+                "borrar definitivamente archivos de la cuarentena")
+    sub.add_argument("archivos", nargs="*", help="solo estos (por defecto, todos)")
+    sub.add_argument("-y", "--si", action="store_true", help="no pedir confirmación")
+
+    # La caché de hashes es una sola para todas las carpetas: sin ruta
+    ayuda = "quitar de la caché de hashes los archivos que ya no existen o han cambiado"
+    sub = ordenes.add_parser(
+        "limpiar-cache", aliases=["clean-cache"], parents=[comunes],
+        help=ayuda, description=ayuda,
+    )
+    sub.set_defaults(funcion=_orden_limpiar_cache, nombre_orden="limpiar-cache", ruta=None)
+
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    # El índice, la cuarentena y el diario guardan rutas absolutas: una
+    # ruta relativa no casaría con lo registrado desde otra carpeta
+    if args.ruta is not None:
+        args.ruta = os.path.abspath(args.ruta)
+    if getattr(args, "archivos", None):
+        args.archivos = [os.path.abspath(ruta) for ruta in args.archivos]
+
+    # El núcleo (escáner, cachés, exiftool...) solo cuando ya hay algo que hacer
+    import nucleo
+    from utils import usar_algoritmo_hash
+
+    usar_algoritmo_hash(args.algoritmo)
+
+    consola = Consola(silencioso=args.silencioso)
+    generador = datos = None
+    try:
+        generador, datos = args.funcion(nucleo, args)
+        if generador is not None:
+            for evento in generador:
+                resumen = consola.mostrar(evento)
+                if resumen is not None:
+                    datos = resumen
+    except nucleo.ErrorOperacion as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return SALIDA_NO_EJECUTADA
+    except KeyboardInterrupt:
+        # Cerrar el generador deja registrado en el diario lo ya hecho
+        if generador is not None:
+            generador.close()
+        print("\nInterrumpido.", file=sys.stderr)
+        return 130
+
+    datos = datos or {}
+    print(json.dumps(
+        {"orden": args.nombre_orden, "ruta": args.ruta, **datos},
+        ensure_ascii=False,
+    ))
+
+    if datos.get("cancelado"):
+        return SALIDA_NO_EJECUTADA
+    if datos.get("errores") or datos.get("codigo"):
+        return SALIDA_CON_ERRORES
+    return SALIDA_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
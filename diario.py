@@ -0,0 +1,188 @@
+# diario.py
+# ==========================================================
+# Diario de operaciones (registro append-only en JSONL)
+# ==========================================================
+
+import atexit
+import json
+import os
+import threading
+import time
+
+
+class IndiceOperaciones:
+    """
+    Índice en memoria de las operaciones registradas, para buscar por
+    ruta nueva, ruta en cuarentena o hash sin recorrer todo el registro.
+    """
+
+    CLAVES = ("archivo_nuevo", "archivo_cuarentena", "hash")
+
+    def __init__(self, operaciones=()):
+        self._por_clave = {clave: {} for clave in self.CLAVES}
+        for op in operaciones:
+            self.anadir(op)
+
+    def anadir(self, op):
+        for clave, tabla in self._por_clave.items():
+            valor = op.get(clave)
+            if valor:
+                tabla.setdefault(valor, []).append(op)
+
+    def buscar(self, clave, valor):
+        """Devuelve las operaciones (en orden) cuyo campo 'clave' vale 'valor'."""
+        return self._por_clave[clave].get(valor, [])
+
+    def ultima(self, clave, valor, accion=None):
+        """Última operación con ese valor (y esa acción, si se indica)."""
+        for op in reversed(self.buscar(clave, valor)):
+            if accion is None or op.get("accion") == accion:
+                return op
+        return None
+
+
+class DiarioOperaciones:
+    """
+    Registro de operaciones en formato JSONL: una operación por línea.
+
+    - Añadir operaciones cuesta O(1): se acumulan en memoria y se vuelcan
+      al final del fichero en lotes (por tamaño o por tiempo).
+    - Al leer, se devuelve primero el contenido del registro antiguo
+      (lista JSON completa) si existe, y después las líneas del diario.
+    """
+
+    def __init__(self, ruta, ruta_legado=None, tam_lote=500, intervalo=2.0):
+        self.ruta = ruta
+        self.ruta_legado = ruta_legado
+        self.tam_lote = tam_lote
+        self.intervalo = intervalo
+
+        self._pendientes = []
+        self._ultimo_volcado = time.time()
+        self._indice = None
+        self._lock = threading.RLock()
+
+    # ---------- ESCRITURA ----------
+
+    def anadir(self, operaciones):
+        """Añade una o varias operaciones (dict) al diario."""
+        if isinstance(operaciones, dict):
+            operaciones = [operaciones]
+
+        with self._lock:
+            self._pendientes.extend(operaciones)
+            if self._indice is not None:
+                for op in operaciones:
+                    self._indice.anadir(op)
+            if (
+                len(self._pendientes) >= self.tam_lote
+                or time.time() - self._ultimo_volcado >= self.intervalo
+            ):
+                self.volcar()
+
+    def volcar(self):
+        """Escribe en disco las operaciones pendientes."""
+        with self._lock:
+            self._ultimo_volcado = time.time()
+            if not self._pendientes:
+                return
+
+            lineas = "".join(
+                json.dumps(op, ensure_ascii=False) + "\n" for op in self._pendientes
+            )
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(lineas)
+                f.flush()
+                os.fsync(f.fileno())
+            self._pendientes = []
+
+    def reescribir(self, operaciones):
+        """
+        Sustituye todo el contenido del diario por la lista dada.
+        El registro antiguo, si existe, se conserva como copia '.bak'.
+        """
+        with self._lock:
+            self._pendientes = []
+            self._indice = None
+            temporal = self.ruta + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                for op in operaciones:
+                    f.write(json.dumps(op, ensure_ascii=False) + "\n")
+            os.replace(temporal, self.ruta)
+
+            if self.ruta_legado and os.path.exists(self.ruta_legado):
+                os.replace(self.ruta_legado, self.ruta_legado + ".bak")
+
+    # ---------- LECTURA ----------
+
+    def iterar(self):
+        """Recorre todas las operaciones registradas, en orden cronológico."""
+        self.volcar()
+
+        if self.ruta_legado and os.path.exists(self.ruta_legado):
+            try:
+                with open(self.ruta_legado, "r", encoding="utf-8") as f:
+                    legado = json.load(f)
+                if isinstance(legado, list):
+                    yield from legado
+            except Exception:
+                pass
+
+        if not os.path.exists(self.ruta):
+            return
+
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    yield json.loads(linea)
+                except ValueError:
+                    # Línea cortada (p. ej. cierre brusco): la ignoramos
+                    continue
+
+    def leer(self):
+        """Devuelve la lista completa de operaciones."""
+        try:
+            return list(self.iterar())
+        except Exception:
+            return []
+
+    def indice(self):
+        """
+        Devuelve el índice de operaciones. Se construye una sola vez
+        (primera llamada) y después se mantiene al día con cada anadir().
+        """
+        with self._lock:
+            if self._indice is None:
+                self._indice = IndiceOperaciones(self.leer())
+            return self._indice
+
+    def existe(self):
+        """Indica si hay algún registro (nuevo o antiguo) en disco."""
+        with self._lock:
+            if self._pendientes:
+                return True
+        return os.path.exists(self.ruta) or bool(
+            self.ruta_legado and os.path.exists(self.ruta_legado)
+        )
+
+
+_diarios_abiertos = []
+
+
+def abrir_diario(ruta, ruta_legado=None, **opciones):
+    """Crea un diario y se asegura de volcarlo al cerrar el programa."""
+    diario = DiarioOperaciones(ruta, ruta_legado=ruta_legado, **opciones)
+    _diarios_abiertos.append(diario)
+    return diario
+
+
+@atexit.register
+def _volcar_diarios_abiertos():
+    for diario in _diarios_abiertos:
+        try:
+            diario.volcar()
+        except Exception:
+            pass
@@ -0,0 +1,412 @@
+# escaner.py
+# ==========================================================
+# Escáner de carpetas compartido (os.scandir + instantánea)
+# ==========================================================
+
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+
+# Extensiones que consideramos imagen / vídeo
+EXTENSIONES_MEDIA = {
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".webp",
+    ".gif",
+    ".heic",
+    ".mp4",
+    ".mov",
+    ".m4v",
+    ".avi",
+    ".mts",
+    ".mkv",
+}
+
+# Índice de escaneo persistente (junto al registro de operaciones)
+RUTA_INDICE_ESCANEO = "indice_escaneo.sqlite"
+
+# Un archivo de la instantánea. 'tipo' es "media", "json" u "otro".
+Archivo = namedtuple("Archivo", "ruta nombre directorio tamano mtime_ns tipo")
+
+# Una carpeta de la instantánea, en el mismo orden que os.walk.
+# 'partes' son los nombres de carpeta relativos a la ruta base.
+Carpeta = namedtuple("Carpeta", "ruta partes mtime_ns archivos subcarpetas")
+
+# Cambios respecto al escaneo anterior (rutas de archivos añadidos y
+# eliminados, y cuántas carpetas ha hecho falta volver a leer).
+Delta = namedtuple("Delta", "anadidos eliminados carpetas_releidas")
+
+
+def clasificar(nombre):
+    """Devuelve "json", "media" u "otro" según la extensión del nombre."""
+    lower = nombre.lower()
+    if lower.endswith(".json"):
+        return "json"
+    if os.path.splitext(lower)[1] in EXTENSIONES_MEDIA:
+        return "media"
+    return "otro"
+
+
+class Instantanea:
+    """
+    Foto del árbol de carpetas bajo 'ruta_base': rutas, tamaños, fechas de
+    modificación y tipo de cada archivo.
+
+    Las rutas se construyen igual que con os.walk(ruta_base), así que son
+    intercambiables con las que ya hay guardadas en el registro.
+    """
+
+    def __init__(self, ruta_base, carpetas, delta=None):
+        self.ruta_base = ruta_base
+        self.carpetas = carpetas
+        # Delta respecto al escaneo anterior (None si es el primero)
+        self.delta = delta
+
+    @property
+    def archivos(self):
+        """Todos los archivos, en el orden de os.walk."""
+        return [a for c in self.carpetas for a in c.archivos]
+
+    def iterar_carpetas(self, excluir=()):
+        """
+        Recorre las carpetas saltándose las que estén dentro de alguna
+        carpeta cuyo nombre aparezca en 'excluir' (p. ej. la cuarentena).
+        """
+        excluir = set(excluir)
+        for carpeta in self.carpetas:
+            if excluir and excluir.intersection(carpeta.partes):
+                continue
+            yield carpeta
+
+    def iterar_archivos(self, excluir=(), tipo=None):
+        """Recorre los archivos (opcionalmente solo de un tipo)."""
+        for carpeta in self.iterar_carpetas(excluir):
+            for archivo in carpeta.archivos:
+                if tipo is None or archivo.tipo == tipo:
+                    yield archivo
+
+    def total_archivos(self):
+        return sum(len(c.archivos) for c in self.carpetas)
+
+
+def _leer_carpeta(ruta, partes, mtime_ns):
+    """Lee una carpeta con os.scandir y devuelve su Carpeta."""
+    archivos = []
+    subcarpetas = []
+
+    with os.scandir(ruta) as it:
+        for entrada in it:
+            try:
+                es_dir = entrada.is_dir()
+            except OSError:
+                es_dir = False
+
+            if es_dir:
+                # Igual que os.walk: los enlaces a carpetas no se recorren
+                try:
+                    if not entrada.is_symlink():
+                        subcarpetas.append(entrada.name)
+                except OSError:
+                    pass
+                continue
+
+            try:
+                st = entrada.stat()
+                tamano, mtime = st.st_size, st.st_mtime_ns
+            except OSError:
+                tamano, mtime = -1, 0
+
+            archivos.append(
+                Archivo(
+                    os.path.join(ruta, entrada.name),
+                    entrada.name,
+                    ruta,
+                    tamano,
+                    mtime,
+                    clasificar(entrada.name),
+                )
+            )
+
+    return Carpeta(ruta, partes, mtime_ns, archivos, subcarpetas)
+
+
+def escanear(ruta_base, anterior=None):
+    """
+    Recorre ruta_base con os.scandir y devuelve una Instantanea nueva.
+
+    Si se pasa la instantánea 'anterior', solo se vuelven a leer las
+    carpetas cuya fecha de modificación ha cambiado; el resto se copia
+    tal cual. En ese caso la instantánea trae el 'delta' de cambios.
+
+    Nota: modificar el CONTENIDO de un archivo no cambia la fecha de su
+    carpeta, así que en carpetas no releídas el tamaño y la fecha de los
+    archivos son los del escaneo anterior.
+    """
+    previas = {c.ruta: c for c in anterior.carpetas} if anterior else {}
+    carpetas = []
+    anadidos = []
+    eliminados = []
+    releidas = 0
+    pila = [(ruta_base, ())]
+
+    while pila:
+        ruta, partes = pila.pop()
+        previa = previas.pop(ruta, None)
+        try:
+            mtime_ns = os.stat(ruta).st_mtime_ns
+            if previa is not None and previa.mtime_ns == mtime_ns:
+                carpeta = previa._replace(partes=partes)
+            else:
+                carpeta = _leer_carpeta(ruta, partes, mtime_ns)
+                releidas += 1
+                if anterior is not None:
+                    antes = {a.ruta for a in previa.archivos} if previa else set()
+                    ahora = {a.ruta for a in carpeta.archivos}
+                    anadidos.extend(ahora - antes)
+                    eliminados.extend(antes - ahora)
+        except OSError:
+            # Carpeta inaccesible: os.walk también la ignora
+            if previa is not None:
+                eliminados.extend(a.ruta for a in previa.archivos)
+            continue
+        carpetas.append(carpeta)
+
+        # En orden inverso para que salgan en el mismo orden que os.walk
+        for nombre in reversed(carpeta.subcarpetas):
+            pila.append((os.path.join(ruta, nombre), partes + (nombre,)))
+
+    # Carpetas que ya no existen (o ya no cuelgan del árbol)
+    for previa in previas.values():
+        eliminados.extend(a.ruta for a in previa.archivos)
+
+    delta = None
+    if anterior is not None:
+        delta = Delta(sorted(anadidos), sorted(eliminados), releidas)
+    return Instantanea(ruta_base, carpetas, delta)
+
+
+# ---------- ÍNDICE DE ESCANEO PERSISTENTE ----------
+
+def _abrir_indice():
+    con = sqlite3.connect(RUTA_INDICE_ESCANEO)
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS carpetas (
+            base TEXT NOT NULL,
+            ruta TEXT NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            subcarpetas TEXT NOT NULL,
+            PRIMARY KEY (base, ruta)
+        )
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS archivos (
+            base TEXT NOT NULL,
+            carpeta TEXT NOT NULL,
+            nombre TEXT NOT NULL,
+            tamano INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL
+        )
+        """
+    )
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_archivos_carpeta ON archivos (base, carpeta)"
+    )
+    return con
+
+
+def cargar_indice(ruta_base):
+    """Carga la última instantánea guardada de ruta_base (o None)."""
+    if not os.path.exists(RUTA_INDICE_ESCANEO):
+        return None
+
+    con = _abrir_indice()
+    try:
+        filas_carpetas = con.execute(
+            "SELECT ruta, mtime_ns, subcarpetas FROM carpetas WHERE base = ?",
+            (ruta_base,),
+        ).fetchall()
+        if not filas_carpetas:
+            return None
+
+        archivos_por_carpeta = {}
+        for carpeta, nombre, tamano, mtime_ns in con.execute(
+            "SELECT carpeta, nombre, tamano, mtime_ns FROM archivos "
+            "WHERE base = ? ORDER BY rowid",
+            (ruta_base,),
+        ):
+            archivos_por_carpeta.setdefault(carpeta, []).append(
+                Archivo(
+                    os.path.join(carpeta, nombre),
+                    nombre,
+                    carpeta,
+                    tamano,
+                    mtime_ns,
+                    clasificar(nombre),
+                )
+            )
+    finally:
+        con.close()
+
+    # 'partes' se recalcula al recorrer; aquí basta con el contenido
+    carpetas = [
+        Carpeta(
+            ruta,
+            (),
+            mtime_ns,
+            archivos_por_carpeta.get(ruta, []),
+            subcarpetas.split("\0") if subcarpetas else [],
+        )
+        for ruta, mtime_ns, subcarpetas in filas_carpetas
+    ]
+    return Instantanea(ruta_base, carpetas)
+
+
+def guardar_indice(instantanea, anterior=None):
+    """
+    Guarda la instantánea en el índice persistente. Si se indica la
+    instantánea 'anterior' (la que había guardada), solo se reescriben las
+    carpetas que han cambiado.
+    """
+    previas = {c.ruta: c for c in anterior.carpetas} if anterior else None
+    actuales = {c.ruta for c in instantanea.carpetas}
+    base = instantanea.ruta_base
+
+    con = _abrir_indice()
+    try:
+        with con:
+            if previas is None:
+                con.execute("DELETE FROM carpetas WHERE base = ?", (base,))
+                con.execute("DELETE FROM archivos WHERE base = ?", (base,))
+            else:
+                for ruta in previas.keys() - actuales:
+                    con.execute(
+                        "DELETE FROM carpetas WHERE base = ? AND ruta = ?", (base, ruta)
+                    )
+                    con.execute(
+                        "DELETE FROM archivos WHERE base = ? AND carpeta = ?",
+                        (base, ruta),
+                    )
+
+            for carpeta in instantanea.carpetas:
+                previa = previas.get(carpeta.ruta) if previas else None
+                if previa is not None and previa.mtime_ns == carpeta.mtime_ns:
+                    continue
+                if previas is not None:
+                    con.execute(
+                        "DELETE FROM archivos WHERE base = ? AND carpeta = ?",
+                        (base, carpeta.ruta),
+                    )
+                con.execute(
+                    "INSERT OR REPLACE INTO carpetas VALUES (?, ?, ?, ?)",
+                    (
+                        base,
+                        carpeta.ruta,
+                        carpeta.mtime_ns,
+                        "\0".join(carpeta.subcarpetas),
+                    ),
+                )
+                con.executemany(
+                    "INSERT INTO archivos VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (base, carpeta.ruta, a.nombre, a.tamano, a.mtime_ns)
+                        for a in carpeta.archivos
+                    ],
+                )
+    finally:
+        con.close()
+
+
+# ---------- INSTANTÁNEAS COMPARTIDAS EN LA SESIÓN ----------
+
+_instantaneas = {}
+_lock = threading.Lock()
+
+
+def obtener_instantanea(ruta_base):
+    """
+    Devuelve la instantánea de ruta_base.
+
+    Se parte de la última instantánea conocida (de esta sesión o, si no
+    hay, del índice guardado en disco) y solo se releen las carpetas cuya
+    fecha ha cambiado. El resultado trae el 'delta' de cambios.
+    """
+    with _lock:
+        anterior = _instantaneas.get(ruta_base)
+
+    if anterior is None:
+        try:
+            anterior = cargar_indice(ruta_base)
+        except sqlite3.Error:
+            anterior = None
+
+    inst = escanear(ruta_base, anterior)
+
+    delta = inst.delta
+    if delta is None or delta.carpetas_releidas or delta.eliminados:
+        try:
+            guardar_indice(inst, anterior)
+        except sqlite3.Error:
+            pass
+
+    with _lock:
+        _instantaneas[ruta_base] = inst
+    return inst
+
+
+def invalidar(ruta_base=None, carpetas=None):
+    """
+    Descarta la instantánea de una ruta (o todas si no se indica).
+
+    Con 'carpetas' no se descarta nada: esas carpetas se marcan para
+    releerlas en el siguiente escaneo, en las instantáneas de la sesión y
+    en el índice guardado. Hace falta tras cambiar archivos, porque
+    modificar uno no cambia la fecha de su carpeta (y en discos FAT la
+    fecha tiene tan poca resolución que un renombrado puede no notarse).
+    """
+    if carpetas is None:
+        with _lock:
+            if ruta_base is None:
+                _instantaneas.clear()
+            else:
+                _instantaneas.pop(ruta_base, None)
+        return
+
+    carpetas = set(carpetas)
+    if not carpetas:
+        return
+
+    with _lock:
+        if ruta_base is None:
+            instantaneas = list(_instantaneas.values())
+        else:
+            instantaneas = [i for i in (_instantaneas.get(ruta_base),) if i is not None]
+        # Con una fecha imposible, escanear() vuelve a leerlas
+        for inst in instantaneas:
+            inst.carpetas = [
+                c._replace(mtime_ns=-1) if c.ruta in carpetas else c
+                for c in inst.carpetas
+            ]
+
+    if not os.path.exists(RUTA_INDICE_ESCANEO):
+        return
+    try:
+        con = _abrir_indice()
+        try:
+            if ruta_base is None:
+                bases = [b for (b,) in con.execute("SELECT DISTINCT base FROM carpetas")]
+            else:
+                bases = [ruta_base]
+            with con:
+                con.executemany(
+                    "UPDATE carpetas SET mtime_ns = -1 WHERE base = ? AND ruta = ?",
+                    [(base, ruta) for base in bases for ruta in carpetas],
+                )
+        finally:
+            con.close()
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,279 @@
+# eventos.py
+# ==========================================================
+# Bus de eventos entre los hilos de trabajo y la interfaz Tk
+# ==========================================================
+
+import queue
+import threading
+import tkinter as tk
+
+# Bus de la ventana principal (el último creado), para en_hilo_principal()
+_bus_principal = None
+
+
+def en_hilo_principal(funcion, *args, **kwargs):
+    """
+    Llama a funcion(*args, **kwargs) en el hilo principal a través del bus de
+    la ventana y devuelve su resultado. Sin ventana, o si ya estamos en el
+    hilo principal, la llama directamente.
+    """
+    if _bus_principal is None:
+        return funcion(*args, **kwargs)
+    return _bus_principal.ejecutar(funcion, *args, **kwargs)
+
+
+class BusEventos:
+    """
+    Cola de eventos que los hilos de trabajo llenan sin tocar Tk.
+
+    El hilo principal la vacía cada 'intervalo_ms' con after(): junta los
+    textos consecutivos de un mismo widget en un solo insert, se queda solo
+    con el último valor de cada variable / barra y hace un único see().
+    Publicar nunca bloquea al hilo de trabajo; ejecutar() sí espera, porque
+    necesita la respuesta (p. ej. de un askyesno).
+    """
+
+    def __init__(self, raiz, intervalo_ms=50, max_por_ciclo=20000):
+        self.raiz = raiz
+        self.intervalo_ms = intervalo_ms
+        self.max_por_ciclo = max_por_ciclo
+        self._cola = queue.SimpleQueue()
+        self._sustitutos = {}
+        # False en cuanto se cierra la ventana: ya nadie vacía la cola
+        self.activo = True
+        self.raiz.bind("<Destroy>", self._al_cerrar, add="+")
+        self.raiz.after(self.intervalo_ms, self._drenar)
+
+        global _bus_principal
+        _bus_principal = self
+
+    def publicar(self, evento):
+        self._cola.put(evento)
+
+    def ejecutar(self, funcion, *args, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) en el hilo principal y espera su
+        resultado (las excepciones se relanzan en el hilo que llama). Si la
+        ventana se cierra mientras tanto, lanza tk.TclError.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return funcion(*args, **kwargs)
+        if not self.activo:
+            raise tk.TclError("la ventana se ha cerrado")
+
+        respuesta = queue.SimpleQueue()
+        self.publicar(("ejecutar", funcion, args, kwargs, respuesta))
+        while True:
+            try:
+                correcto, valor = respuesta.get(timeout=0.2)
+                break
+            except queue.Empty:
+                if not self.activo:
+                    raise tk.TclError("la ventana se ha cerrado")
+        if not correcto:
+            raise valor
+        return valor
+
+    def sustituto(self, objeto):
+        """
+        Devuelve el sustituto seguro para hilos de un widget o variable
+        (Text / VisorLog → SalidaDiferida, Progressbar → ProgresoDiferido,
+        StringVar → VariableDiferida). Se crea una sola vez por objeto.
+        """
+        if objeto is None:
+            return None
+
+        clave = str(objeto)
+        existente = self._sustitutos.get(clave)
+        if existente is not None and not getattr(existente, "_destruido", False):
+            return existente
+
+        if isinstance(objeto, tk.Variable):
+            nuevo = VariableDiferida(self, objeto)
+        elif hasattr(objeto, "insert"):
+            nuevo = SalidaDiferida(self, objeto)
+        else:
+            nuevo = ProgresoDiferido(self, objeto)
+        self._sustitutos[clave] = nuevo
+        return nuevo
+
+    # ---------- HILO PRINCIPAL ----------
+
+    def _al_cerrar(self, evento):
+        # <Destroy> de la raíz llega también por cada widget hijo
+        if evento.widget is self.raiz:
+            self.activo = False
+
+    def _drenar(self):
+        eventos = []
+        try:
+            while len(eventos) < self.max_por_ciclo:
+                eventos.append(self._cola.get_nowait())
+        except queue.Empty:
+            pass
+
+        if eventos:
+            self._aplicar(self._agrupar(eventos))
+
+        try:
+            self.raiz.after(self.intervalo_ms, self._drenar)
+        except tk.TclError:
+            # La ventana principal se ha cerrado
+            self.activo = False
+
+    @staticmethod
+    def _agrupar(eventos):
+        """
+        Junta eventos consecutivos equivalentes respetando el orden:
+        inserts seguidos en el mismo widget y con las mismas etiquetas se
+        concatenan; de las variables y barras solo cuenta el último valor.
+        """
+        agrupados = []
+        posicion_valor = {}
+        pendientes_see = []
+        # Último insert al que se pueden seguir añadiendo textos: los
+        # cambios de valores intercalados no cortan el grupo, un delete sí.
+        ultimo_insert = None
+
+        for evento in eventos:
+            tipo, destino = evento[0], evento[1]
+
+            if tipo == "insert":
+                if (
+                    ultimo_insert is not None
+                    and ultimo_insert[1] is destino
+                    and ultimo_insert[3] == evento[3]
+                ):
+                    ultimo_insert[2].append(evento[2])
+                else:
+                    ultimo_insert = ["insert", destino, [evento[2]], evento[3]]
+                    agrupados.append(ultimo_insert)
+            elif tipo in ("set", "config"):
+                # Solo vale el último valor: anulamos el anterior
+                clave = (tipo, id(destino), evento[2])
+                if clave in posicion_valor:
+                    agrupados[posicion_valor[clave]] = None
+                posicion_valor[clave] = len(agrupados)
+                agrupados.append(list(evento))
+            elif tipo == "see":
+                if destino not in pendientes_see:
+                    pendientes_see.append(destino)
+            else:
+                ultimo_insert = None
+                agrupados.append(list(evento))
+
+        agrupados = [e for e in agrupados if e is not None]
+        agrupados.extend(["see", destino] for destino in pendientes_see)
+        return agrupados
+
+    @staticmethod
+    def _aplicar(eventos):
+        for evento in eventos:
+            tipo, destino = evento[0], evento[1]
+            try:
+                if tipo == "insert":
+                    destino.insert(tk.END, "".join(evento[2]), *evento[3])
+                elif tipo == "delete":
+                    destino.delete(*evento[2])
+                elif tipo == "see":
+                    destino.see(tk.END)
+                elif tipo == "set":
+                    destino.set(evento[3])
+                elif tipo == "config":
+                    destino.config(**{evento[2]: evento[3]})
+                elif tipo == "llamar":
+                    getattr(destino, evento[2])(*evento[3], **evento[4])
+                elif tipo == "ejecutar":
+                    try:
+                        evento[4].put((True, destino(*evento[2], **evento[3])))
+                    except Exception as e:
+                        evento[4].put((False, e))
+            except tk.TclError:
+                # El widget ya no existe (cambio de página o cierre)
+                continue
+
+
+class _ProxyWidget:
+    """Base de los sustitutos de widgets que se pasan a los hilos."""
+
+    def __init__(self, bus, widget):
+        self._bus = bus
+        self._widget = widget
+        self._destruido = False
+        # Se crea en el hilo principal, así que aquí sí podemos usar Tk
+        widget.bind("<Destroy>", self._al_destruir, add="+")
+
+    def _al_destruir(self, _evento=None):
+        self._destruido = True
+
+    def _publicar(self, *evento):
+        # Igual que con el widget real: si ya no existe, TclError
+        if self._destruido:
+            raise tk.TclError("el widget ya no existe")
+        self._bus.publicar(evento)
+
+    def update(self):
+        """No hace nada: el refresco lo hace el bucle principal."""
+        if self._destruido:
+            raise tk.TclError("el widget ya no existe")
+
+    update_idletasks = update
+
+
+class SalidaDiferida(_ProxyWidget):
+    """Sustituto de un Text / VisorLog para usar desde un hilo."""
+
+    def insert(self, _indice, texto, *etiquetas):
+        self._publicar("insert", self._widget, texto, etiquetas)
+
+    def delete(self, *indices):
+        self._publicar("delete", self._widget, indices)
+
+    def see(self, _indice=None):
+        self._publicar("see", self._widget)
+
+    def tag_config(self, etiqueta, **opciones):
+        self._publicar("llamar", self._widget, "tag_config", (etiqueta,), opciones)
+
+
+class ProgresoDiferido(_ProxyWidget):
+    """Sustituto de una ttk.Progressbar para usar desde un hilo."""
+
+    def __init__(self, bus, widget):
+        super().__init__(bus, widget)
+        self._valores = {}
+
+    def __setitem__(self, clave, valor):
+        self._valores[clave] = valor
+        self._publicar("config", self._widget, clave, valor)
+
+    def __getitem__(self, clave):
+        return self._valores.get(clave, 0)
+
+    def config(self, **opciones):
+        for clave, valor in opciones.items():
+            self[clave] = valor
+
+    configure = config
+
+    def start(self, intervalo=50):
+        self._publicar("llamar", self._widget, "start", (intervalo,), {})
+
+    def stop(self):
+        self._publicar("llamar", self._widget, "stop", (), {})
+
+
+class VariableDiferida:
+    """Sustituto de una StringVar para usar desde un hilo."""
+
+    def __init__(self, bus, variable):
+        self._bus = bus
+        self._variable = variable
+        self._valor = variable.get()
+
+    def set(self, valor):
+        self._valor = valor
+        self._bus.publicar(("set", self._variable, "valor", valor))
+
+    def get(self):
+        return self._valor
@@ -0,0 +1,775 @@
+# fechas_internas.py
+# ==========================================================
+# Fecha guardada dentro del archivo (EXIF / QuickTime), sin ExifTool
+# ==========================================================
+#
+# Solo se leen las cabeceras:
+#   - JPEG: los segmentos hasta el APP1 "Exif" (DateTimeOriginal)
+#   - HEIC: el bloque "Exif\0\0" dentro de los primeros KB
+#   - MP4 / MOV: las cabeceras de las cajas hasta moov/mvhd
+#     (creation_time, en segundos desde 1904-01-01 UTC)
+#
+# Y se escribe en el sitio, cambiando solo los bytes de la fecha:
+#   - JPEG: los textos de fecha EXIF que ya existen (20 bytes cada uno)
+#   - MP4 / MOV: creation_time y modification_time de mvhd, tkhd y mdhd
+#
+# Comprobación con archivos de muestra generados al vuelo (lectura y
+# escritura): python fechas_internas.py (termina con código 1 si falla).
+
+import mmap
+import os
+import re
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from fechas_nombre import EPOCH_MAX, EPOCH_MIN
+
+# Hilos para leer cabeceras en bloque (trabajo de E/S)
+HILOS_INTERNAS = min(8, os.cpu_count() or 4)
+
+# En un HEIC se busca el bloque EXIF solo en este principio del archivo
+BYTES_BUSQUEDA_HEIC = 256 * 1024
+
+# Segundos entre 1904-01-01 (QuickTime) y 1970-01-01
+EPOCH_QUICKTIME = 2082844800
+
+# Etiquetas EXIF que nos interesan
+_TAG_EXIF_IFD = 0x8769
+_TAG_DATETIME = 0x0132
+_TAG_DATETIME_ORIGINAL = 0x9003
+_TAG_CREATE_DATE = 0x9004
+_TAG_OFFSET_TIME = 0x9010
+_TAG_OFFSET_TIME_ORIGINAL = 0x9011
+_TAG_OFFSET_TIME_DIGITIZED = 0x9012
+
+# Fecha y, si se conoce, su zona horaria, por orden de preferencia
+_FECHAS_EXIF = (
+    (_TAG_DATETIME_ORIGINAL, _TAG_OFFSET_TIME_ORIGINAL),
+    (_TAG_CREATE_DATE, _TAG_OFFSET_TIME_DIGITIZED),
+    (_TAG_DATETIME, _TAG_OFFSET_TIME),
+)
+
+# "2024:01:15 13:45:22" y "+01:00"
+_RE_FECHA_EXIF = re.compile(rb"^(\d{4}):(\d{2}):(\d{2}) (\d{2}):(\d{2}):(\d{2})")
+_RE_DESFASE = re.compile(rb"^([+-])(\d{2}):(\d{2})")
+
+# Marcas de HEIC/AVIF en la caja ftyp (el resto de ISO BMFF es vídeo)
+_MARCAS_HEIF = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"mif1", b"msf1", b"avif"}
+# Cajas con las que puede empezar un MOV antiguo sin ftyp
+_CAJAS_INICIALES = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+
+# Más cajas que estas en un nivel: no es un MP4 / MOV normal
+_MAX_CAJAS = 256
+
+# Extensiones cuya fecha interna se sabe escribir en el sitio
+EXTENSIONES_JPEG = {".jpg", ".jpeg"}
+EXTENSIONES_QUICKTIME = {".mp4", ".mov", ".m4v"}
+EXTENSIONES_ESCRITURA = EXTENSIONES_JPEG | EXTENSIONES_QUICKTIME
+
+
+def _en_rango(ts):
+    return ts if EPOCH_MIN <= ts <= EPOCH_MAX else None
+
+
+# ---------- EXIF (TIFF) ----------
+
+def _segundos_desfase(desfase):
+    """Segundos de una zona horaria EXIF (b"+01:00"), o None si no hay o no vale."""
+    md = _RE_DESFASE.match(desfase or b"")
+    if not md:
+        return None
+    segundos = int(md.group(2)) * 3600 + int(md.group(3)) * 60
+    return -segundos if md.group(1) == b"-" else segundos
+
+
+def _epoch_exif(valor, desfase=None):
+    """
+    Epoch de una fecha EXIF ("AAAA:MM:DD HH:MM:SS"). Si se conoce la zona
+    horaria ("+01:00") se tiene en cuenta; si no, la hora es la local del
+    equipo, que es como la guardan las cámaras (y ExifTool).
+    """
+    m = _RE_FECHA_EXIF.match(valor)
+    if not m:
+        return None
+    try:
+        dt = datetime(*map(int, m.groups()))
+    except ValueError:  # 0000:00:00 00:00:00 y similares
+        return None
+
+    segundos = _segundos_desfase(desfase)
+    if segundos is None:
+        try:
+            ts = dt.timestamp()  # hora local
+        except (OverflowError, OSError, ValueError):
+            return None
+    else:
+        ts = dt.replace(tzinfo=timezone.utc).timestamp() - segundos
+    return _en_rango(int(ts))
+
+
+def _texto_exif(ts, desfase=None):
+    """
+    Fecha EXIF de 'ts' en hora local, o en la zona 'desfase' (b"+02:00")
+    si se da. Es lo contrario de _epoch_exif.
+    """
+    segundos = _segundos_desfase(desfase)
+    if segundos is None:
+        dt = datetime.fromtimestamp(ts)
+    else:
+        dt = datetime.fromtimestamp(ts + segundos, tz=timezone.utc)
+    return dt.strftime("%Y:%m:%d %H:%M:%S").encode()
+
+
+def _entradas_ifd(tiff, desplazamiento, orden):
+    """
+    (etiqueta, tipo, cuenta, valor, pos_datos) de cada entrada de un IFD;
+    pos_datos es dónde empiezan sus datos (dentro de la propia entrada si
+    caben en 4 bytes). None si el IFD se sale de los datos.
+    """
+    if desplazamiento + 2 > len(tiff):
+        return None
+    (num,) = struct.unpack_from(orden + "H", tiff, desplazamiento)
+    fin = desplazamiento + 2 + 12 * num
+    if fin > len(tiff):
+        return None
+
+    entradas = []
+    for pos in range(desplazamiento + 2, fin, 12):
+        etiqueta, tipo, cuenta, valor = struct.unpack_from(orden + "HHII", tiff, pos)
+        pos_datos = pos + 8 if tipo == 2 and cuenta <= 4 else valor
+        entradas.append((etiqueta, tipo, cuenta, valor, pos_datos))
+    return entradas
+
+
+def _leer_ifd(tiff, desplazamiento, orden):
+    """
+    Entradas de un IFD como {etiqueta: valor} para las de texto (tipo 2) y
+    los punteros (tipo 4). None si el IFD se sale de los datos.
+    """
+    entradas_ifd = _entradas_ifd(tiff, desplazamiento, orden)
+    if entradas_ifd is None:
+        return None
+
+    entradas = {}
+    for etiqueta, tipo, cuenta, valor, pos_datos in entradas_ifd:
+        if tipo == 4 and cuenta == 1:
+            entradas[etiqueta] = valor
+        elif tipo == 2:
+            entradas[etiqueta] = tiff[pos_datos:pos_datos + cuenta].rstrip(b"\x00 ")
+    return entradas
+
+
+def _orden_tiff(tiff):
+    if tiff[:4] == b"II*\x00":
+        return "<"
+    if tiff[:4] == b"MM\x00*":
+        return ">"
+    return None
+
+
+def fecha_exif(tiff):
+    """
+    Epoch de la fecha de un bloque EXIF (empieza por la cabecera TIFF "II*"
+    o "MM*"): DateTimeOriginal, o si no CreateDate, o si no DateTime.
+    """
+    orden = _orden_tiff(tiff)
+    if orden is None:
+        return None
+
+    (ifd0,) = struct.unpack_from(orden + "I", tiff, 4)
+    entradas = _leer_ifd(tiff, ifd0, orden)
+    if entradas is None:
+        return None
+    puntero = entradas.get(_TAG_EXIF_IFD)
+    if isinstance(puntero, int):
+        entradas.update(_leer_ifd(tiff, puntero, orden) or {})
+
+    for etiqueta, etiqueta_desfase in _FECHAS_EXIF:
+        valor = entradas.get(etiqueta)
+        if isinstance(valor, bytes):
+            desfase = entradas.get(etiqueta_desfase)
+            ts = _epoch_exif(valor, desfase if isinstance(desfase, bytes) else None)
+            if ts is not None:
+                return ts
+    return None
+
+
+def _bloque_exif_jpeg(f):
+    """
+    Recorre los segmentos del JPEG hasta el APP1 EXIF (o el inicio de la
+    imagen). Devuelve (posición, largo) del bloque TIFF, o None.
+    """
+    f.seek(2)
+    while True:
+        cabecera = f.read(4)
+        if len(cabecera) < 4 or cabecera[0] != 0xFF:
+            return None
+        marca = cabecera[1]
+        if marca == 0xFF:  # relleno entre segmentos
+            f.seek(-3, os.SEEK_CUR)
+            continue
+        if marca == 0xDA or marca == 0xD9:  # empiezan los datos de la imagen
+            return None
+        (largo,) = struct.unpack(">H", cabecera[2:])
+        if largo < 2:
+            return None
+        if marca == 0xE1 and largo >= 8:
+            if f.read(6) == b"Exif\x00\x00":
+                return f.tell(), largo - 8
+            f.seek(largo - 8, os.SEEK_CUR)
+        else:
+            f.seek(largo - 2, os.SEEK_CUR)
+
+
+def _fecha_jpeg(f):
+    bloque = _bloque_exif_jpeg(f)
+    if bloque is None:
+        return None
+    pos, largo = bloque
+    f.seek(pos)
+    return fecha_exif(f.read(largo))
+
+
+def _fecha_heif(f):
+    """Busca el bloque "Exif\\0\\0" al principio de un HEIC / AVIF."""
+    f.seek(0)
+    datos = f.read(BYTES_BUSQUEDA_HEIC)
+    pos = datos.find(b"Exif\x00\x00")
+    while pos != -1:
+        ts = fecha_exif(datos[pos + 6:])
+        if ts is not None:
+            return ts
+        pos = datos.find(b"Exif\x00\x00", pos + 6)
+    return None
+
+
+# ---------- MP4 / MOV (ISO BMFF) ----------
+
+def cajas(f, inicio, fin):
+    """
+    Cabeceras de las cajas entre 'inicio' y 'fin' (sin leer su contenido).
+    Devuelve (tipo, posicion, largo_cabecera, largo_total) de cada una.
+    """
+    pos = inicio
+    for _ in range(_MAX_CAJAS):
+        if pos + 8 > fin:
+            return
+        f.seek(pos)
+        cabecera = f.read(16)
+        if len(cabecera) < 8:
+            return
+        largo, tipo = struct.unpack(">I4s", cabecera[:8])
+        largo_cabecera = 8
+        if largo == 1:  # tamaño de 64 bits
+            if len(cabecera) < 16:
+                return
+            (largo,) = struct.unpack(">Q", cabecera[8:16])
+            largo_cabecera = 16
+        elif largo == 0:  # hasta el final
+            largo = fin - pos
+        if largo < largo_cabecera or pos + largo > fin:
+            return
+        yield tipo, pos, largo_cabecera, largo
+        pos += largo
+
+
+def buscar_caja(f, ruta_cajas, inicio, fin):
+    """
+    Busca la caja de la ruta (p. ej. [b"moov", b"mvhd"]) y devuelve su
+    (posicion, largo_cabecera, largo_total), o None.
+    """
+    for tipo, pos, largo_cabecera, largo in cajas(f, inicio, fin):
+        if tipo != ruta_cajas[0]:
+            continue
+        if len(ruta_cajas) == 1:
+            return pos, largo_cabecera, largo
+        return buscar_caja(f, ruta_cajas[1:], pos + largo_cabecera, pos + largo)
+    return None
+
+
+def leer_tiempos_caja(f, pos_contenido):
+    """
+    (version, creation_time, modification_time) de una caja mvhd / tkhd /
+    mdhd cuyo contenido empieza en 'pos_contenido'. Los tiempos van en
+    segundos desde 1904-01-01 UTC.
+    """
+    f.seek(pos_contenido)
+    datos = f.read(20)
+    if len(datos) < 12:
+        return None
+    version = datos[0]
+    if version == 0:
+        creacion, modificacion = struct.unpack_from(">II", datos, 4)
+    elif version == 1 and len(datos) == 20:
+        creacion, modificacion = struct.unpack_from(">QQ", datos, 4)
+    else:
+        return None
+    return version, creacion, modificacion
+
+
+def _fecha_quicktime(f, tamano):
+    encontrada = buscar_caja(f, [b"moov", b"mvhd"], 0, tamano)
+    if encontrada is None:
+        return None
+    pos, largo_cabecera, _largo = encontrada
+    tiempos = leer_tiempos_caja(f, pos + largo_cabecera)
+    if tiempos is None or not tiempos[1]:  # 0 = sin fecha
+        return None
+    return _en_rango(tiempos[1] - EPOCH_QUICKTIME)
+
+
+def _cajas_de_tiempo(f, tamano):
+    """
+    Posición del contenido de mvhd y de los tkhd / mdhd de cada pista, con
+    mvhd la primera. None si no hay moov/mvhd (p. ej. un moov comprimido).
+    """
+    moov = buscar_caja(f, [b"moov"], 0, tamano)
+    if moov is None:
+        return None
+    pos, largo_cabecera, largo = moov
+
+    mvhd = None
+    pistas = []
+    for tipo, pos_caja, cab_caja, largo_caja in cajas(f, pos + largo_cabecera, pos + largo):
+        if tipo == b"mvhd" and mvhd is None:
+            mvhd = pos_caja + cab_caja
+        elif tipo == b"trak":
+            inicio, fin = pos_caja + cab_caja, pos_caja + largo_caja
+            for ruta_cajas in ([b"tkhd"], [b"mdia", b"mdhd"]):
+                encontrada = buscar_caja(f, ruta_cajas, inicio, fin)
+                if encontrada is not None:
+                    pistas.append(encontrada[0] + encontrada[1])
+    if mvhd is None:
+        return None
+    return [mvhd] + pistas
+
+
+def escribir_fecha_quicktime(ruta, timestamp):
+    """
+    Pone 'timestamp' como fecha de creación y de modificación de un MP4 /
+    MOV (mvhd y los tkhd / mdhd de cada pista) sobrescribiendo solo esos
+    campos, sin copiar el archivo.
+
+    Devuelve False, sin tocar nada, si el archivo no tiene una estructura
+    que sepamos modificar (entonces hay que recurrir a ExifTool). Los
+    errores de lectura / escritura se lanzan como OSError.
+    """
+    qt = int(timestamp) + EPOCH_QUICKTIME
+    with open(ruta, "r+b") as f:
+        inicio = f.read(12)
+        if len(inicio) < 8 or inicio[4:8] not in _CAJAS_INICIALES:
+            return False
+        if inicio[4:8] == b"ftyp" and inicio[8:12] in _MARCAS_HEIF:
+            return False
+
+        posiciones = _cajas_de_tiempo(f, os.fstat(f.fileno()).st_size)
+        if posiciones is None:
+            return False
+
+        # Primero se comprueba todo y después se escribe
+        parches = []
+        for pos in posiciones:
+            tiempos = leer_tiempos_caja(f, pos)
+            if tiempos is None:
+                return False
+            if tiempos[0] == 0:
+                if not 0 <= qt <= 0xFFFFFFFF:
+                    return False
+                parches.append((pos + 4, struct.pack(">II", qt, qt)))
+            else:
+                parches.append((pos + 4, struct.pack(">QQ", qt, qt)))
+
+        for pos, datos in parches:
+            f.seek(pos)
+            f.write(datos)
+    return True
+
+
+def _campos_fecha_exif(tiff):
+    """
+    Textos de fecha y de zona horaria del bloque EXIF, como
+    {etiqueta: (posición, cuenta)} con la posición relativa al bloque.
+    None si no es un bloque TIFF que se pueda recorrer.
+    """
+    orden = _orden_tiff(tiff)
+    if orden is None:
+        return None
+    (ifd0,) = struct.unpack_from(orden + "I", tiff, 4)
+    entradas = _entradas_ifd(tiff, ifd0, orden)
+    if entradas is None:
+        return None
+    for etiqueta, tipo, cuenta, valor, _pos in entradas:
+        if etiqueta == _TAG_EXIF_IFD and tipo == 4 and cuenta == 1:
+            entradas = entradas + (_entradas_ifd(tiff, valor, orden) or [])
+            break
+
+    etiquetas = {etiqueta for par in _FECHAS_EXIF for etiqueta in par}
+    return {
+        etiqueta: (pos_datos, cuenta)
+        for etiqueta, tipo, cuenta, _valor, pos_datos in entradas
+        if tipo == 2 and etiqueta in etiquetas
+    }
+
+
+def escribir_fecha_jpeg(ruta, timestamp):
+    """
+    Pone 'timestamp' en las fechas EXIF de un JPEG (DateTimeOriginal,
+    CreateDate y DateTime, las que ya existan) sobrescribiendo sus 20
+    bytes a través de un mmap, sin copiar el archivo. Cada fecha se
+    escribe en la zona de su OffsetTime* si lo tiene (que se conserva) y
+    si no en hora local, igual que se lee. Las que ya guardan ese mismo
+    instante no se tocan; si no hay que cambiar ninguna, no se escribe.
+
+    Devuelve False, sin tocar nada, si no hay DateTimeOriginal ni
+    CreateDate, algún campo no tiene el tamaño normal o el archivo está
+    cortado (entonces hay que recurrir a ExifTool). Los errores de lectura / escritura se lanzan
+    como OSError.
+    """
+    if _en_rango(int(timestamp)) is None:
+        return False
+    with open(ruta, "r+b") as f:
+        if f.read(2) != b"\xff\xd8":
+            return False
+        bloque = _bloque_exif_jpeg(f)
+        if bloque is None:
+            return False
+        pos_tiff, largo = bloque
+
+        with mmap.mmap(f.fileno(), 0) as mm:
+            if pos_tiff + largo > len(mm):
+                return False  # archivo cortado: el segmento EXIF no cabe
+            tiff = mm[pos_tiff:pos_tiff + largo]
+            try:
+                campos = _campos_fecha_exif(tiff)
+            except struct.error:
+                return False
+            if not campos or not (
+                _TAG_DATETIME_ORIGINAL in campos or _TAG_CREATE_DATE in campos
+            ):
+                return False
+
+            parches = []
+            for etiqueta_fecha, etiqueta_desfase in _FECHAS_EXIF:
+                if etiqueta_fecha not in campos:
+                    continue
+                pos, cuenta = campos[etiqueta_fecha]
+                if cuenta != 20 or pos + cuenta > largo:
+                    return False
+
+                desfase = None
+                if etiqueta_desfase in campos:
+                    pos_desfase, cuenta_desfase = campos[etiqueta_desfase]
+                    desfase = tiff[pos_desfase:pos_desfase + cuenta_desfase]
+                try:
+                    fecha = _texto_exif(int(timestamp), desfase) + b"\x00"
+                except (OverflowError, OSError, ValueError):
+                    return False
+                if tiff[pos:pos + cuenta] != fecha:
+                    parches.append((pos_tiff + pos, fecha))
+
+            for pos, fecha in parches:
+                mm[pos:pos + len(fecha)] = fecha
+            if parches:
+                mm.flush()
+    return True
+
+
+def escribir_fecha_interna(ruta, timestamp):
+    """
+    Escribe en el sitio la fecha interna del archivo si es de un tipo que
+    sabemos modificar. True si se escribió, False si hay que recurrir a
+    ExifTool.
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in EXTENSIONES_JPEG:
+        return escribir_fecha_jpeg(ruta, timestamp)
+    if extension in EXTENSIONES_QUICKTIME:
+        return escribir_fecha_quicktime(ruta, timestamp)
+    return False
+
+
+# ---------- LECTURA ----------
+
+def leer_fecha_interna(ruta):
+    """
+    Epoch de la fecha guardada dentro del archivo (DateTimeOriginal de un
+    JPEG o HEIC, creation_time de un MP4 / MOV), o None si no la tiene,
+    no es de un tipo conocido o no se puede leer. El tipo se reconoce por
+    el contenido, no por la extensión.
+    """
+    try:
+        with open(ruta, "rb") as f:
+            inicio = f.read(12)
+            if inicio[:2] == b"\xff\xd8":
+                return _fecha_jpeg(f)
+            if len(inicio) < 8 or inicio[4:8] not in _CAJAS_INICIALES:
+                return None
+            if inicio[4:8] == b"ftyp" and inicio[8:12] in _MARCAS_HEIF:
+                return _fecha_heif(f)
+            return _fecha_quicktime(f, os.fstat(f.fileno()).st_size)
+    except (OSError, struct.error):
+        return None
+
+
+def leer_fechas_internas(rutas, hilos=None):
+    """
+    Lee la fecha interna de muchos archivos a la vez con un grupo de hilos.
+
+    Es un generador: devuelve (ruta, timestamp) en el mismo orden que
+    'rutas' (timestamp es None si el archivo no tiene fecha interna).
+    """
+    rutas = list(rutas)
+    with ThreadPoolExecutor(max_workers=hilos or HILOS_INTERNAS) as pool:
+        yield from zip(rutas, pool.map(leer_fecha_interna, rutas, chunksize=32))
+
+
+# ---------- MUESTRAS Y COMPROBACIÓN ----------
+
+def muestra_tiff(ts, orden="<", desfase=None):
+    """
+    Bloque EXIF (TIFF) mínimo con DateTimeOriginal = ts (en hora local, o
+    en la zona 'desfase' si se da, p. ej. b"+02:00", con OffsetTimeOriginal).
+    """
+    fecha = _texto_exif(ts, desfase) + b"\x00"
+    cabecera = (b"II*\x00" if orden == "<" else b"MM\x00*") + struct.pack(orden + "I", 8)
+    # IFD0: solo el puntero al IFD EXIF
+    ifd0 = struct.pack(orden + "HHHII", 1, _TAG_EXIF_IFD, 4, 1, 26) + b"\x00" * 4
+    entradas = [(_TAG_DATETIME_ORIGINAL, fecha)]
+    if desfase:
+        entradas.append((_TAG_OFFSET_TIME_ORIGINAL, desfase + b"\x00"))
+    # IFD EXIF en 26, datos detrás
+    pos_datos = 26 + 2 + 12 * len(entradas) + 4
+    ifd = struct.pack(orden + "H", len(entradas))
+    datos = b""
+    for etiqueta, valor in entradas:
+        if len(valor) <= 4:
+            ifd += struct.pack(orden + "HHI", etiqueta, 2, len(valor)) + valor.ljust(4, b"\x00")
+        else:
+            ifd += struct.pack(orden + "HHII", etiqueta, 2, len(valor), pos_datos + len(datos))
+            datos += valor
+    ifd += b"\x00" * 4
+    return cabecera + ifd0 + ifd + datos
+
+
+def muestra_jpeg(ts, orden="<", desfase=None):
+    """JPEG mínimo (SOI, APP0, APP1 EXIF, SOS, EOI) con DateTimeOriginal."""
+    app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    app1 = b"Exif\x00\x00" + muestra_tiff(ts, orden, desfase)
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0
+        + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+        + b"\xff\xda\x00\x02" + b"\x00" * 16 + b"\xff\xd9"
+    )
+
+
+def _caja(tipo, contenido):
+    return struct.pack(">I", len(contenido) + 8) + tipo + contenido
+
+
+def _caja_tiempos(tipo, ts, version=0, resto=b""):
+    qt = ts + EPOCH_QUICKTIME if ts else 0
+    if version == 1:
+        return _caja(tipo, struct.pack(">B3xQQ", 1, qt, qt) + resto)
+    return _caja(tipo, struct.pack(">B3xII", 0, qt, qt) + resto)
+
+
+def muestra_mp4(ts, version=0, moov_al_final=False, marca=b"isom"):
+    """
+    MP4 mínimo con ftyp, mdat y moov (mvhd + trak/tkhd + trak/mdia/mdhd),
+    con todas las fechas = ts.
+    """
+    mvhd = _caja_tiempos(b"mvhd", ts, version, struct.pack(">II", 1000, 0) + b"\x00" * 80)
+    tkhd = _caja_tiempos(b"tkhd", ts, version, b"\x00" * 68)
+    mdhd = _caja_tiempos(b"mdhd", ts, version, struct.pack(">II", 1000, 0) + b"\x00" * 4)
+    moov = _caja(b"moov", mvhd + _caja(b"trak", tkhd + _caja(b"mdia", mdhd)))
+    ftyp = _caja(b"ftyp", marca + b"\x00\x00\x02\x00" + marca + b"mp41")
+    mdat = _caja(b"mdat", b"\x00" * 4096)
+    return ftyp + (mdat + moov if moov_al_final else moov + mdat)
+
+
+def muestra_heic(ts):
+    """Simulación de HEIC: ftyp 'heic', un meta cualquiera y el EXIF en mdat."""
+    ftyp = _caja(b"ftyp", b"heic\x00\x00\x00\x00mif1heic")
+    meta = _caja(b"meta", b"\x00" * 200)
+    mdat = _caja(b"mdat", b"\x00\x00\x00\x06Exif\x00\x00" + muestra_tiff(ts, ">") + b"\x00" * 512)
+    return ftyp + meta + mdat
+
+
+# (nombre, contenido, fecha esperada)
+def muestras_referencia():
+    ts = 1705326322  # 2024-01-15 13:45:22 UTC
+    return [
+        ("exif_intel.jpg", muestra_jpeg(ts, "<"), ts),
+        ("exif_motorola.jpg", muestra_jpeg(ts, ">"), ts),
+        ("exif_zona.jpg", muestra_jpeg(ts, "<", b"+02:00"), ts),
+        ("sin_exif.jpg", b"\xff\xd8\xff\xdb\x00\x04\x00\x00\xff\xda\x00\x02\xff\xd9", None),
+        ("video_v0.mp4", muestra_mp4(ts), ts),
+        ("video_v1.mov", muestra_mp4(ts, version=1, marca=b"qt  "), ts),
+        ("moov_al_final.mp4", muestra_mp4(ts, moov_al_final=True), ts),
+        ("sin_fecha.mp4", muestra_mp4(0), None),
+        ("foto.heic", muestra_heic(ts), ts),
+        ("texto.jpg", b"no es una imagen", None),
+        ("vacio.mp4", b"", None),
+    ]
+
+
+def comprobar_muestras():
+    """Crea las muestras en una carpeta temporal y devuelve las que fallan."""
+    import tempfile
+
+    fallos = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre, contenido, esperado in muestras_referencia():
+            ruta = os.path.join(carpeta, nombre)
+            with open(ruta, "wb") as f:
+                f.write(contenido)
+            obtenido = leer_fecha_interna(ruta)
+            if obtenido != esperado:
+                fallos.append((nombre, esperado, obtenido))
+    return fallos
+
+
+def _tiempos_quicktime(ruta):
+    """(creation, modification) de mvhd, tkhd y mdhd, para comprobar."""
+    with open(ruta, "rb") as f:
+        posiciones = _cajas_de_tiempo(f, os.fstat(f.fileno()).st_size) or []
+        return [leer_tiempos_caja(f, pos)[1:] for pos in posiciones]
+
+
+def comprobar_escritura():
+    """
+    Escribe una fecha nueva en JPEG y vídeos de muestra y comprueba que se
+    lee bien (en los vídeos, en todas las cajas), que el tamaño no cambia
+    y que fuera de los campos de fecha no se ha tocado ni un byte. Los que
+    no se saben modificar tienen que quedar intactos, la zona horaria de
+    la foto se conserva y si la fecha ya era esa no se escribe nada.
+    Devuelve los fallos.
+    """
+    import tempfile
+
+    antigua, nueva = 1_500_000_000, 1_705_326_322
+    casos = [
+        ("exif_intel.jpg", muestra_jpeg(antigua, "<"), True),
+        ("exif_motorola.jpeg", muestra_jpeg(antigua, ">"), True),
+        ("exif_zona.jpg", muestra_jpeg(antigua, "<", b"+02:00"), True),
+        ("sin_exif.jpg", b"\xff\xd8\xff\xdb\x00\x04\x00\x00\xff\xda\x00\x02\xff\xd9", False),
+        ("fecha_corta.jpg", muestra_jpeg(antigua).replace(b"\x02\x00\x14\x00", b"\x02\x00\x13\x00"), False),
+        ("v0.mp4", muestra_mp4(antigua), True),
+        ("v1.mov", muestra_mp4(antigua, version=1, marca=b"qt  "), True),
+        ("moov_al_final.mp4", muestra_mp4(antigua, moov_al_final=True), True),
+        ("sin_fecha.mp4", muestra_mp4(0), True),
+        ("sin_moov.mp4", _caja(b"ftyp", b"isom\x00\x00\x02\x00isom") + _caja(b"mdat", b"x" * 64), False),
+        ("moov_comprimido.mov", _caja(b"moov", _caja(b"cmov", b"\x00" * 32)), False),
+        ("foto.heic", muestra_heic(antigua), False),
+    ]
+    fallos = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre, contenido, soportado in casos:
+            ruta = os.path.join(carpeta, nombre)
+            with open(ruta, "wb") as f:
+                f.write(contenido)
+
+            escrito = escribir_fecha_interna(ruta, nueva)
+            with open(ruta, "rb") as f:
+                despues = f.read()
+
+            if escrito != soportado:
+                fallos.append((nombre, "escrito", soportado, escrito))
+                continue
+            if not soportado:
+                if despues != contenido:
+                    fallos.append((nombre, "modificado sin estar soportado", False, True))
+                continue
+
+            if os.path.splitext(nombre)[1] in EXTENSIONES_QUICKTIME:
+                tiempos = _tiempos_quicktime(ruta)
+                esperado = [(nueva + EPOCH_QUICKTIME,) * 2] * 3
+                if tiempos != esperado:
+                    fallos.append((nombre, "tiempos", esperado, tiempos))
+            distintos = sum(a != b for a, b in zip(contenido, despues))
+            if len(despues) != len(contenido) or distintos > 3 * 16:
+                fallos.append((nombre, "bytes cambiados", "<= 48", distintos))
+            if leer_fecha_interna(ruta) != nueva:
+                fallos.append((nombre, "lectura", nueva, leer_fecha_interna(ruta)))
+
+        # La zona horaria de la foto se conserva
+        with open(os.path.join(carpeta, "exif_zona.jpg"), "rb") as f:
+            if b"+02:00\x00" not in f.read():
+                fallos.append(("exif_zona.jpg", "zona horaria", b"+02:00", None))
+
+        # Con la misma fecha no se escribe (ni cambia la de modificación)
+        ruta = os.path.join(carpeta, "misma.jpg")
+        with open(ruta, "wb") as f:
+            f.write(muestra_jpeg(nueva, "<", b"-05:00"))
+        os.utime(ruta, (0, 0))
+        if not escribir_fecha_interna(ruta, nueva) or os.stat(ruta).st_mtime != 0:
+            fallos.append(("misma.jpg", "reescrito sin cambios", 0, os.stat(ruta).st_mtime))
+    return fallos
+
+
+def medir(num_archivos=2000):
+    """Archivos por segundo que lee leer_fechas_internas (mitad JPEG, mitad MP4)."""
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        rutas = []
+        for i in range(num_archivos):
+            ts = 1_500_000_000 + i
+            if i % 2:
+                ruta, contenido = os.path.join(carpeta, f"{i}.mp4"), muestra_mp4(ts)
+            else:
+                ruta, contenido = os.path.join(carpeta, f"{i}.jpg"), muestra_jpeg(ts)
+            with open(ruta, "wb") as f:
+                f.write(contenido)
+            rutas.append(ruta)
+
+        inicio = time.perf_counter()
+        leidas = sum(1 for _, ts in leer_fechas_internas(rutas) if ts is not None)
+        segundos = time.perf_counter() - inicio
+    return leidas, num_archivos / segundos
+
+
+def medir_escritura(num_archivos=2000):
+    """Archivos por segundo a los que escribir_fecha_interna cambia la fecha (mitad JPEG, mitad MP4)."""
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        rutas = []
+        for i in range(num_archivos):
+            if i % 2:
+                ruta, contenido = os.path.join(carpeta, f"{i}.mp4"), muestra_mp4(1_500_000_000)
+            else:
+                ruta, contenido = os.path.join(carpeta, f"{i}.jpg"), muestra_jpeg(1_500_000_000)
+            with open(ruta, "wb") as f:
+                f.write(contenido)
+            rutas.append(ruta)
+
+        inicio = time.perf_counter()
+        escritas = sum(escribir_fecha_interna(ruta, 1_705_326_322) for ruta in rutas)
+        segundos = time.perf_counter() - inicio
+    return escritas, num_archivos / segundos
+
+
+if __name__ == "__main__":
+    fallos = comprobar_muestras()
+    for nombre, esperado, obtenido in fallos:
+        print(f"FALLO {nombre}: esperado {esperado}, obtenido {obtenido}")
+    total = len(muestras_referencia())
+    print(f"Muestras: {total - len(fallos)}/{total} correctas")
+    fallos_escritura = comprobar_escritura()
+    for fallo in fallos_escritura:
+        print("FALLO escritura", *fallo)
+    print(
+        "Escritura en el sitio (JPEG / MP4 / MOV): "
+        f"{'correcta' if not fallos_escritura else 'con fallos'}"
+    )
+    leidas, velocidad = medir()
+    print(f"Velocidad: {velocidad:,.0f} archivos/s ({leidas} con fecha)")
+    escritas, velocidad = medir_escritura()
+    print(f"Escritura: {velocidad:,.0f} archivos/s ({escritas} escritas, un solo hilo)")
+    sys.exit(1 if fallos or fallos_escritura else 0)
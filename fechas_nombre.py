@@ -0,0 +1,240 @@
+# fechas_nombre.py
+# ==========================================================
+# Fecha a partir del nombre del archivo (tabla de formatos)
+# ==========================================================
+#
+# Comprobación del corpus de referencia: python fechas_nombre.py
+# (termina con código 1 si algún nombre no da la fecha esperada).
+
+import calendar
+import os
+import re
+import sys
+from collections import namedtuple
+from datetime import datetime, timezone
+
+# Rango razonable de fechas (2000-01-01 a 2035-12-31)
+EPOCH_MIN = int(datetime(2000, 1, 1, tzinfo=timezone.utc).timestamp())
+EPOCH_MAX = int(datetime(2035, 12, 31, tzinfo=timezone.utc).timestamp())
+
+# Un formato de nombre conocido. 'patron' es una expresión regular con
+# los grupos con nombre y, mo, d y, opcionalmente, h, mi, s. Si no trae
+# hora, se usa 'hora_por_defecto' (h, mi, s).
+Convencion = namedtuple("Convencion", "nombre patron hora_por_defecto")
+
+
+def convencion(nombre, patron, hora_por_defecto=(12, 0, 0)):
+    """Crea una Convencion compilando el patrón."""
+    return Convencion(nombre, re.compile(patron), hora_por_defecto)
+
+
+# Formatos de cámaras y aplicaciones. Se prueban antes que los genéricos.
+CONVENCIONES = [
+    # IMG-20240115-WA0001.jpg, VID-20240115-WA0003.mp4
+    convencion(
+        "whatsapp",
+        r"^(?:IMG|VID|AUD|PTT|STK)-(?P<y>20\d{2})(?P<mo>[01]\d)(?P<d>[0-3]\d)-WA\d+",
+    ),
+    # WhatsApp Image 2024-01-15 at 13.45.22
+    convencion(
+        "whatsapp_escritorio",
+        r"^WhatsApp (?:Image|Video) (?P<y>20\d{2})-(?P<mo>[01]\d)-(?P<d>[0-3]\d)"
+        r" at (?P<h>[0-2]\d)\.(?P<mi>[0-5]\d)\.(?P<s>[0-5]\d)",
+    ),
+    # PXL_20240115_134522123.jpg (Pixel, con milisegundos)
+    convencion(
+        "pixel",
+        r"^PXL_(?P<y>20\d{2})(?P<mo>[01]\d)(?P<d>[0-3]\d)_"
+        r"(?P<h>[0-2]\d)(?P<mi>[0-5]\d)(?P<s>[0-5]\d)",
+    ),
+    # 20240115_134522.jpg, 20240115_134522(0).jpg (Samsung)
+    convencion(
+        "samsung",
+        r"^(?P<y>20\d{2})(?P<mo>[01]\d)(?P<d>[0-3]\d)_"
+        r"(?P<h>[0-2]\d)(?P<mi>[0-5]\d)(?P<s>[0-5]\d)(?:\(\d+\))?$",
+    ),
+    # 20240115134522.jpg: sin esto, los 13 primeros dígitos se tomarían
+    # por un epoch en milisegundos (año 2034)
+    convencion(
+        "compacta",
+        r"^(?P<y>20\d{2})(?P<mo>[01]\d)(?P<d>[0-3]\d)"
+        r"(?P<h>[0-2]\d)(?P<mi>[0-5]\d)(?P<s>[0-5]\d)$",
+    ),
+    # Screenshot_2024-01-15-13-45-22-123_com.app, Screenshot 2024-01-15 at 13.45.22,
+    # Screenshot_20240115-134522
+    convencion(
+        "captura",
+        r"^Screen[ _]?[Ss]hot[ _](?P<y>20\d{2})-?(?P<mo>[01]\d)-?(?P<d>[0-3]\d)"
+        r"(?:[ _-](?:at )?(?P<h>[0-2]\d)[.-]?(?P<mi>[0-5]\d)[.-]?(?P<s>[0-5]\d))?",
+    ),
+]
+
+# Genéricos, en el orden de siempre
+_RE_EPOCH = re.compile(r"\d{10,13}")
+_RE_FECHA_HORA = re.compile(
+    r"(20\d{2})([01]\d)([0-3]\d)[ _-]?([0-2]\d)([0-5]\d)([0-5]\d)"
+)
+_RE_FECHA = re.compile(r"(20\d{2})([01]\d)([0-3]\d)")
+
+_DIAS_MES = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _a_epoch(y, mo, d, h, mi, s):
+    """
+    Epoch (UTC) de la fecha, o None si no es una fecha válida o se sale
+    del rango razonable. Igual que datetime(...).timestamp() pero sin
+    crear objetos.
+    """
+    if not 1 <= mo <= 12 or d < 1 or h > 23:
+        return None
+    dias = _DIAS_MES[mo - 1]
+    if mo == 2 and calendar.isleap(y):
+        dias = 29
+    if d > dias:
+        return None
+    ts = calendar.timegm((y, mo, d, h, mi, s))
+    if EPOCH_MIN <= ts <= EPOCH_MAX:
+        return ts
+    return None
+
+
+class ExtractorFechas:
+    """
+    Saca un timestamp (epoch) del nombre de un archivo.
+
+    Primero prueba las 'convenciones' (formatos de cámaras y aplicaciones,
+    en orden) y después los formatos genéricos de siempre:
+
+      1) números de 10 dígitos (epoch en segundos) o 13 (milisegundos)
+      2) 20240115_134522, 20240115-134522, 20240115 134522, 20240115134522
+      3) solo fecha 20240115 (hora ficticia 12:00:00)
+
+    Las expresiones se compilan una vez y los límites de fechas ya están
+    calculados, así que un mismo extractor sirve para miles de archivos.
+    """
+
+    def __init__(self, convenciones=None):
+        self.convenciones = list(CONVENCIONES if convenciones is None else convenciones)
+
+    def extraer(self, ruta):
+        """Timestamp del nombre del archivo (sin extensión), o None."""
+        nombre, _ = os.path.splitext(os.path.basename(ruta))
+
+        for conv in self.convenciones:
+            m = conv.patron.search(nombre)
+            if m is None:
+                continue
+            grupos = m.groupdict()
+            if grupos.get("h") is not None:
+                hora = (int(grupos["h"]), int(grupos["mi"]), int(grupos["s"]))
+            else:
+                hora = conv.hora_por_defecto
+            ts = _a_epoch(int(grupos["y"]), int(grupos["mo"]), int(grupos["d"]), *hora)
+            if ts is not None:
+                return ts
+
+        # 1) Epoch de 10 o 13 dígitos
+        for m in _RE_EPOCH.finditer(nombre):
+            num_str = m.group(0)
+            num = int(num_str)
+            if len(num_str) == 13:
+                num //= 1000  # milisegundos → segundos
+            if EPOCH_MIN <= num <= EPOCH_MAX:
+                return num
+
+        # 2) Fecha y hora
+        m = _RE_FECHA_HORA.search(nombre)
+        if m:
+            ts = _a_epoch(*map(int, m.groups()))
+            if ts is not None:
+                return ts
+
+        # 3) Solo fecha YYYYMMDD → hora ficticia 12:00:00
+        m = _RE_FECHA.search(nombre)
+        if m:
+            y, mo, d = map(int, m.groups())
+            return _a_epoch(y, mo, d, 12, 0, 0)
+
+        return None
+
+    def extraer_varios(self, rutas):
+        """Lista con el timestamp (o None) de cada ruta, en el mismo orden."""
+        extraer = self.extraer
+        return [extraer(r) for r in rutas]
+
+
+# Extractor por defecto (todas las convenciones conocidas)
+extractor = ExtractorFechas()
+
+
+# ---------- CORPUS DE REFERENCIA Y MEDICIÓN ----------
+
+# (nombre, timestamp esperado). Los genéricos deben seguir dando lo mismo
+# que la versión anterior de extraer_timestamp_de_nombre (salvo el nombre
+# de 14 dígitos, que antes se leía como epoch en milisegundos).
+CORPUS_REFERENCIA = [
+    # Genéricos
+    ("1500000000.jpg", 1500000000),
+    ("1500000000123.jpg", 1500000000),
+    ("foto_9999999999.jpg", None),
+    ("IMG_20240115_134522.jpg", 1705326322),
+    ("VID_20240115-134522.mp4", 1705326322),
+    ("20240115 134522.jpg", 1705326322),
+    ("20240115134522.jpg", 1705326322),
+    ("IMG_20240115.jpg", 1705320000),
+    ("IMG_20240230_101010.jpg", None),
+    ("IMG_20240231.jpg", None),
+    ("IMG_20240229.jpg", 1709208000),
+    ("IMG_19991231_235959.jpg", None),
+    ("IMG_20240115_254522.jpg", 1705320000),
+    ("vacaciones.jpg", None),
+    ("DSC_0001.JPG", None),
+    ("IMG_20240115_134522(1).jpg", 1705326322),
+    ("IMG_20240115_134522-ha editado.jpg", 1705326322),
+    # WhatsApp
+    ("IMG-20240115-WA0001.jpg", 1705320000),
+    ("VID-20231231-WA0012.mp4", 1704024000),
+    ("WhatsApp Image 2024-01-15 at 13.45.22.jpeg", 1705326322),
+    ("WhatsApp Video 2024-01-15 at 13.45.22.mp4", 1705326322),
+    # Pixel
+    ("PXL_20240115_134522123.jpg", 1705326322),
+    ("PXL_20240115_134522123.NIGHT.jpg", 1705326322),
+    # Samsung
+    ("20240115_134522.jpg", 1705326322),
+    ("20240115_134522(0).jpg", 1705326322),
+    # Capturas
+    ("Screenshot_2024-01-15-13-45-22-123_com.whatsapp.jpg", 1705326322),
+    ("Screenshot 2024-01-15 at 13.45.22.png", 1705326322),
+    ("Screenshot_20240115-134522.png", 1705326322),
+    ("Screenshot_2024-01-15.png", 1705320000),
+]
+
+
+def comprobar_corpus(extractor_a_probar=None):
+    """Devuelve la lista de (nombre, esperado, obtenido) que no coinciden."""
+    ext = extractor_a_probar or extractor
+    return [
+        (nombre, esperado, obtenido)
+        for nombre, esperado in CORPUS_REFERENCIA
+        for obtenido in [ext.extraer(nombre)]
+        if obtenido != esperado
+    ]
+
+
+def medir(repeticiones=2000):
+    """Nombres por segundo que procesa el extractor sobre el corpus."""
+    import time
+
+    nombres = [n for n, _ in CORPUS_REFERENCIA] * repeticiones
+    inicio = time.perf_counter()
+    extractor.extraer_varios(nombres)
+    return len(nombres) / (time.perf_counter() - inicio)
+
+
+if __name__ == "__main__":
+    fallos = comprobar_corpus()
+    for nombre, esperado, obtenido in fallos:
+        print(f"FALLO {nombre}: esperado {esperado}, obtenido {obtenido}")
+    print(f"Corpus: {len(CORPUS_REFERENCIA) - len(fallos)}/{len(CORPUS_REFERENCIA)} correctos")
+    print(f"Velocidad: {medir():,.0f} nombres/s")
+    sys.exit(1 if fallos else 0)
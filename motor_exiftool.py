@@ -0,0 +1,351 @@
+# motor_exiftool.py
+# ==========================================================
+# Procesos ExifTool persistentes (-stay_open) y grupo de procesos
+# ==========================================================
+
+import atexit
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+
+def localizar_exiftool():
+    """
+    Devuelve la ruta del ejecutable de ExifTool: primero 'exiftool.exe'
+    junto al programa, si no el 'exiftool' del PATH. None si no hay.
+    """
+    if getattr(sys, "frozen", False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    exif_local = os.path.join(base_dir, "exiftool.exe")
+    if os.path.exists(exif_local):
+        return exif_local
+
+    # Recurre al PATH del sistema
+    return shutil.which("exiftool")
+
+
+class ErrorExifTool(Exception):
+    """El proceso ExifTool no ha podido arrancar o se ha cerrado."""
+
+
+class ProcesoExifTool:
+    """
+    Un proceso 'exiftool -stay_open True -@ -' que se queda abierto.
+
+    Cada orden se escribe por stdin como un argfile (un argumento por
+    línea) terminado en '-execute{n}', y la respuesta termina cuando
+    ExifTool imprime '{ready n}'. Así solo se paga el arranque de Perl
+    una vez.
+    """
+
+    def __init__(self, exif_bin):
+        self.exif_bin = exif_bin
+        self._contador = 0
+        self._lock = threading.Lock()
+
+        flags = 0
+        if sys.platform == "win32":
+            flags = subprocess.CREATE_NO_WINDOW
+
+        try:
+            self._proc = subprocess.Popen(
+                [
+                    exif_bin,
+                    "-stay_open", "True",
+                    "-@", "-",
+                    "-common_args", "-charset", "filename=utf8",
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                creationflags=flags,
+            )
+        except OSError as e:
+            raise ErrorExifTool(f"No se pudo arrancar ExifTool: {e}") from e
+
+    def vivo(self):
+        return self._proc.poll() is None
+
+    def ejecutar(self, argumentos, al_recibir_linea=None):
+        """
+        Ejecuta una orden con los argumentos dados.
+
+        - al_recibir_linea: si se indica, se llama con cada línea de salida
+          según llega (para mostrar progreso).
+
+        Devuelve la lista de líneas de salida (sin el marcador {ready}).
+        """
+        with self._lock:
+            if not self.vivo():
+                raise ErrorExifTool("El proceso ExifTool se ha cerrado.")
+
+            self._contador += 1
+            marca = f"{{ready{self._contador}}}"
+            argfile = "".join(f"{arg}\n" for arg in argumentos)
+            try:
+                self._proc.stdin.write(argfile + f"-execute{self._contador}\n")
+                self._proc.stdin.flush()
+            except OSError as e:
+                raise ErrorExifTool(f"No se pudo enviar la orden: {e}") from e
+
+            lineas = []
+            for linea in self._proc.stdout:
+                if linea.rstrip("\r\n") == marca:
+                    return lineas
+                lineas.append(linea)
+                if al_recibir_linea is not None:
+                    al_recibir_linea(linea)
+
+            raise ErrorExifTool("ExifTool terminó sin completar la orden.")
+
+    def cerrar(self):
+        with self._lock:
+            if not self.vivo():
+                return
+            try:
+                self._proc.stdin.write("-stay_open\nFalse\n")
+                self._proc.stdin.flush()
+                self._proc.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self._proc.kill()
+
+
+class PoolExifTool:
+    """
+    Grupo de N procesos ExifTool persistentes.
+
+    - ejecutar(): usa el primer proceso libre para una orden suelta.
+    - ejecutar_lotes(): reparte una lista de órdenes entre todos los
+      procesos a la vez (una por proceso) y devuelve las salidas en orden.
+    """
+
+    def __init__(self, exif_bin, procesos=None):
+        self.exif_bin = exif_bin
+        self.num_procesos = procesos or max(1, min(8, os.cpu_count() or 1))
+        self._libres = queue.Queue()
+        self._todos = []
+        self._lock = threading.Lock()
+
+    def _tomar(self):
+        """Devuelve un proceso libre, arrancando uno nuevo si hace falta."""
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._todos) < self.num_procesos:
+                proceso = ProcesoExifTool(self.exif_bin)
+                self._todos.append(proceso)
+                return proceso
+
+        return self._libres.get()
+
+    def _devolver(self, proceso):
+        if proceso.vivo():
+            self._libres.put(proceso)
+        else:
+            with self._lock:
+                self._todos.remove(proceso)
+
+    def ejecutar(self, argumentos, al_recibir_linea=None):
+        proceso = self._tomar()
+        try:
+            return proceso.ejecutar(argumentos, al_recibir_linea)
+        finally:
+            self._devolver(proceso)
+
+    def ejecutar_lotes(self, lotes, al_recibir_linea=None):
+        """
+        Ejecuta varias órdenes en paralelo (como mucho una por proceso).
+
+        - al_recibir_linea(indice_lote, linea): se llama desde los hilos
+          de trabajo con cada línea de salida.
+
+        Devuelve una lista con las líneas de salida de cada lote, en el
+        mismo orden que 'lotes'. Si un lote falla, su entrada es la
+        excepción ErrorExifTool correspondiente.
+        """
+        resultados = [None] * len(lotes)
+        pendientes = queue.Queue()
+        for i, lote in enumerate(lotes):
+            pendientes.put((i, lote))
+
+        def trabajador():
+            while True:
+                try:
+                    i, lote = pendientes.get_nowait()
+                except queue.Empty:
+                    return
+
+                aviso = None
+                if al_recibir_linea is not None:
+                    aviso = lambda linea, i=i: al_recibir_linea(i, linea)
+                try:
+                    resultados[i] = self.ejecutar(lote, aviso)
+                except ErrorExifTool as e:
+                    resultados[i] = e
+
+        hilos = [
+            threading.Thread(target=trabajador, daemon=True)
+            for _ in range(min(self.num_procesos, len(lotes)))
+        ]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        return resultados
+
+    def cerrar(self):
+        with self._lock:
+            procesos, self._todos = self._todos, []
+        for proceso in procesos:
+            proceso.cerrar()
+        self._libres = queue.Queue()
+
+
+# ---------- LECTURA DEL PROGRESO ----------
+
+# "======== ruta/archivo.jpg [12/500]"
+_RE_CABECERA = re.compile(r"^======== (.*?)(?: \[(\d+)/(\d+)\])?\s*$")
+# "    3 image files updated", "1 files weren't updated due to errors"...
+_RE_RESUMEN = re.compile(
+    r"^\s*(\d+) (?:image )?files? (updated|unchanged|weren't updated due to errors)"
+)
+_CAMPO_RESUMEN = {
+    "updated": "actualizados",
+    "unchanged": "sin_cambios",
+    "weren't updated due to errors": "errores",
+}
+
+
+class ProgresoExifTool:
+    """
+    Interpreta la salida de 'exiftool -progress' de uno o varios lotes y
+    lleva la cuenta: archivos hechos, actualizados, sin cambios y con
+    error, archivos por segundo y tiempo restante estimado.
+
+    procesar() devuelve True si la línea merece ir al log: los errores y
+    avisos siempre, y de las cabeceras de archivo solo una de cada
+    'muestreo' (para no llenar el log con cientos de miles de líneas).
+    """
+
+    def __init__(self, total, lineas_log=200):
+        self.total = total
+        self.muestreo = max(1, total // max(1, lineas_log))
+
+        self.actualizados = 0
+        self.sin_cambios = 0
+        self.errores = 0
+        self.lineas_error = []
+
+        self._hechos_por_lote = {}
+        self._cabeceras = 0
+        self._inicio = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def hechos(self):
+        return sum(self._hechos_por_lote.values())
+
+    def procesar(self, linea, lote=0):
+        """Procesa una línea de salida del lote indicado."""
+        texto = linea.rstrip("\r\n")
+
+        m = _RE_CABECERA.match(texto)
+        if m:
+            with self._lock:
+                self._cabeceras += 1
+                if m.group(2):
+                    n = int(m.group(2))
+                else:
+                    # Sin marcador [n/total]: contamos cabeceras
+                    n = self._hechos_por_lote.get(lote, 0) + 1
+                if n > self._hechos_por_lote.get(lote, 0):
+                    self._hechos_por_lote[lote] = n
+                return (self._cabeceras - 1) % self.muestreo == 0
+
+        m = _RE_RESUMEN.match(texto)
+        if m:
+            with self._lock:
+                campo = _CAMPO_RESUMEN[m.group(2)]
+                setattr(self, campo, getattr(self, campo) + int(m.group(1)))
+            return campo == "errores"
+
+        if texto.startswith("Error") or texto.startswith("Warning"):
+            if texto.startswith("Error"):
+                with self._lock:
+                    self.lineas_error.append(texto)
+            return True
+
+        return False
+
+    def anotar_fallo_lote(self, num_archivos):
+        """Cuenta como errores los archivos de un lote que no llegó a terminar."""
+        with self._lock:
+            self.errores += num_archivos
+
+    def archivos_por_segundo(self):
+        transcurrido = time.time() - self._inicio
+        return self.hechos / transcurrido if transcurrido > 0 else 0.0
+
+    def segundos_restantes(self):
+        """Estimación del tiempo que falta (None si aún no se puede saber)."""
+        velocidad = self.archivos_por_segundo()
+        if not velocidad:
+            return None
+        return max(0.0, (self.total - self.hechos) / velocidad)
+
+    def hay_errores(self):
+        return bool(self.errores or self.lineas_error)
+
+    def resumen(self):
+        return {
+            "total": self.total,
+            "hechos": self.hechos,
+            "actualizados": self.actualizados,
+            "sin_cambios": self.sin_cambios,
+            "errores": self.errores,
+            "archivos_por_segundo": round(self.archivos_por_segundo(), 1),
+        }
+
+
+# ---------- GRUPO COMPARTIDO POR TODO EL PROGRAMA ----------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool(procesos=None):
+    """
+    Devuelve el grupo de procesos ExifTool compartido (se crea la primera
+    vez). Lanza ErrorExifTool si no se encuentra ExifTool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            exif_bin = localizar_exiftool()
+            if exif_bin is None:
+                raise ErrorExifTool(
+                    "No se encontró 'exiftool'.\n\n"
+                    "Coloca 'exiftool.exe' junto al ejecutable o añádelo al PATH."
+                )
+            _pool = PoolExifTool(exif_bin, procesos)
+        return _pool
+
+
+@atexit.register
+def _cerrar_pool():
+    if _pool is not None:
+        _pool.cerrar()
@@ -0,0 +1,242 @@
+# motor_fechas.py
+# ==========================================================
+# Fechas del sistema de archivos desde los JSON (sin ExifTool)
+# ==========================================================
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from fechas_internas import EXTENSIONES_ESCRITURA, escribir_fecha_interna, leer_fecha_interna
+from sidecar import leer_timestamp
+
+# Hilos para leer JSON y cambiar fechas (trabajo de E/S)
+HILOS_FECHAS = min(8, os.cpu_count() or 4)
+
+# Segundos entre 1601-01-01 (FILETIME de Windows) y 1970-01-01
+_EPOCH_FILETIME = 11644473600
+
+
+def fecha_creacion(st):
+    """Fecha de creación del archivo en Windows (None en otros sistemas)."""
+    if sys.platform != "win32":
+        return None
+    return getattr(st, "st_birthtime", st.st_ctime)
+
+
+def fechas_ya_aplicadas(par, comprobar_interna=False):
+    """
+    True si las fechas del archivo ya coinciden con las de su JSON lateral
+    (la de modificación y, en Windows, también la de creación), es decir,
+    si no habría nada que cambiar. 'par' es (ruta, ruta_json).
+
+    Con 'comprobar_interna', en los archivos cuya fecha interna se sabe
+    escribir (JPEG y vídeos) tiene que coincidir también esa.
+    """
+    ruta, ruta_json = par
+    timestamp = leer_timestamp(ruta_json)
+    if timestamp is None:
+        return False
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return False
+
+    if int(st.st_mtime) != timestamp:
+        return False
+    creacion = fecha_creacion(st)
+    if creacion is not None and int(creacion) != timestamp:
+        return False
+
+    if comprobar_interna and os.path.splitext(ruta)[1].lower() in EXTENSIONES_ESCRITURA:
+        return leer_fecha_interna(ruta) == timestamp
+    return True
+
+
+def filtrar_fechas_ya_aplicadas(pares, hilos=HILOS_FECHAS, comprobar_interna=False):
+    """
+    Separa los pares (ruta, ruta_json) en (pendientes, saltados) según si
+    las fechas ya coinciden con las del JSON. Las comprobaciones van en
+    paralelo.
+    """
+    pendientes = []
+    saltados = 0
+    comprobar = partial(fechas_ya_aplicadas, comprobar_interna=comprobar_interna)
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        for par, aplicada in zip(
+            pares, pool.map(comprobar, pares, chunksize=64)
+        ):
+            if aplicada:
+                saltados += 1
+            else:
+                pendientes.append(par)
+    return pendientes, saltados
+
+
+# ---------- ESCRITURA DE FECHAS ----------
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.CreateFileW.restype = wintypes.HANDLE
+    _kernel32.CreateFileW.argtypes = (
+        wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+        wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+    )
+    _kernel32.SetFileTime.argtypes = (
+        wintypes.HANDLE, ctypes.POINTER(wintypes.FILETIME),
+        ctypes.POINTER(wintypes.FILETIME), ctypes.POINTER(wintypes.FILETIME),
+    )
+    _kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    _FILE_WRITE_ATTRIBUTES = 0x100
+    _OPEN_EXISTING = 3
+    _FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+    _INVALID_HANDLE = wintypes.HANDLE(-1).value
+
+    def _poner_fecha_creacion(ruta, timestamp):
+        valor = int((timestamp + _EPOCH_FILETIME) * 10_000_000)
+        creacion = wintypes.FILETIME(valor & 0xFFFFFFFF, valor >> 32)
+        h = _kernel32.CreateFileW(
+            ruta, _FILE_WRITE_ATTRIBUTES, 0x7, None,
+            _OPEN_EXISTING, _FILE_FLAG_BACKUP_SEMANTICS, None,
+        )
+        if h == _INVALID_HANDLE:
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            if not _kernel32.SetFileTime(h, ctypes.byref(creacion), None, None):
+                raise ctypes.WinError(ctypes.get_last_error())
+        finally:
+            _kernel32.CloseHandle(h)
+
+else:
+
+    def _poner_fecha_creacion(ruta, timestamp):
+        # Linux no permite cambiar la fecha de creación (ExifTool tampoco)
+        pass
+
+
+def aplicar_fecha(ruta, timestamp):
+    """
+    Pone la fecha de modificación (y de acceso) del archivo y, en Windows,
+    también la de creación. Equivale a -FileModifyDate / -FileCreateDate.
+    """
+    os.utime(ruta, (timestamp, timestamp))
+    _poner_fecha_creacion(ruta, timestamp)
+
+
+def _aplicar_desde_json(par):
+    ruta, ruta_json = par
+    timestamp = leer_timestamp(ruta_json)
+    if timestamp is None:
+        return f"Error: no se pudo leer photoTakenTime de {ruta_json}"
+    try:
+        aplicar_fecha(ruta, timestamp)
+    except OSError as e:
+        return f"Error: {ruta}: {e}"
+    return None
+
+
+def aplicar_fechas_json(pares, hilos=None):
+    """
+    Aplica a cada archivo la fecha de su JSON lateral. 'pares' es una
+    lista de (ruta, ruta_json).
+
+    Es un generador: devuelve (ruta, error) en el mismo orden que 'pares',
+    con error=None si todo fue bien o el texto del error.
+    """
+    with ThreadPoolExecutor(max_workers=hilos or HILOS_FECHAS) as pool:
+        resultados = pool.map(_aplicar_desde_json, pares, chunksize=64)
+        for (ruta, _ruta_json), error in zip(pares, resultados):
+            yield ruta, error
+
+
+def _escribir_interna_desde_json(par):
+    ruta, ruta_json = par
+    timestamp = leer_timestamp(ruta_json)
+    if timestamp is None:
+        return False, f"Error: no se pudo leer photoTakenTime de {ruta_json}"
+    try:
+        return escribir_fecha_interna(ruta, timestamp), None
+    except OSError as e:
+        return False, f"Error: {ruta}: {e}"
+
+
+def escribir_fechas_internas_json(pares, hilos=None):
+    """
+    Escribe en el sitio la fecha del JSON lateral dentro de cada archivo
+    (las fechas EXIF de un JPEG, las de las cajas de un MP4 / MOV), sin
+    copiar el archivo.
+
+    Es un generador: devuelve (ruta, escrita, error) en el mismo orden que
+    'pares'. escrita=False sin error quiere decir que el archivo no tiene
+    una estructura que sepamos modificar y hay que usar ExifTool.
+    """
+    with ThreadPoolExecutor(max_workers=hilos or HILOS_FECHAS) as pool:
+        resultados = pool.map(_escribir_interna_desde_json, pares, chunksize=16)
+        for (ruta, _ruta_json), (escrita, error) in zip(pares, resultados):
+            yield ruta, escrita, error
+
+
+# ---------- COMPARATIVA CON EXIFTOOL ----------
+
+def comparar_motores(num_archivos=2000):
+    """
+    Crea en una carpeta temporal 'num_archivos' archivos con su JSON y
+    mide cuánto tarda cada motor en aplicar las fechas: este (os.utime) y
+    exiftool con el grupo de procesos persistentes, si está instalado.
+    Devuelve {motor: segundos}.
+    """
+    import tempfile
+
+    from motor_exiftool import ErrorExifTool, obtener_pool
+
+    tiempos = {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivos = []
+        for i in range(num_archivos):
+            ruta = os.path.join(carpeta, f"IMG_{i:06d}.jpg")
+            with open(ruta, "wb") as f:
+                f.write(b"\xff\xd8\xff\xd9")
+            with open(ruta + ".json", "w", encoding="utf-8") as f:
+                json.dump({"photoTakenTime": {"timestamp": str(1_500_000_000 + i)}}, f)
+            archivos.append(ruta)
+
+        inicio = time.perf_counter()
+        pares = [(ruta, ruta + ".json") for ruta in archivos]
+        errores = sum(1 for _, error in aplicar_fechas_json(pares) if error)
+        tiempos["nativo"] = time.perf_counter() - inicio
+        if errores:
+            print(f"nativo: {errores} errores")
+
+        try:
+            pool = obtener_pool()
+        except ErrorExifTool as e:
+            print(f"exiftool: no disponible ({e})")
+            return tiempos
+
+        # Fechas distintas para que exiftool tenga que escribir de verdad
+        for ruta in archivos:
+            os.utime(ruta, (0, 0))
+
+        from nucleo import ARGUMENTOS_FECHAS_EXIFTOOL, repartir_en_lotes
+
+        inicio = time.perf_counter()
+        pool.ejecutar_lotes(
+            [ARGUMENTOS_FECHAS_EXIFTOOL + lote
+             for lote in repartir_en_lotes(archivos, pool.num_procesos)]
+        )
+        tiempos["exiftool"] = time.perf_counter() - inicio
+
+    return tiempos
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for motor, segundos in comparar_motores(n).items():
+        print(f"{motor:9s} {segundos:8.3f} s  ({n / segundos:,.0f} archivos/s)")
@@ -0,0 +1,139 @@
+# motor_hash.py
+# ==========================================================
+# Hash del contenido de los archivos (SHA-256 o BLAKE2b)
+# ==========================================================
+#
+# Los archivos se leen con readinto sobre un búfer que cada hilo reserva
+# una sola vez (sin crear un bytes nuevo por trozo) y, a partir de cierto
+# tamaño, se le pasan enteros a hashlib a través de un mmap.
+
+import hashlib
+import mmap
+import os
+import sys
+import threading
+import time
+
+# SHA-256 por compatibilidad con los registros; BLAKE2b es más rápido
+ALGORITMOS = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+}
+ALGORITMO_POR_DEFECTO = "sha256"
+
+# Tamaño de cada lectura (se ajusta al bloque del dispositivo)
+TAMANO_BUFFER = 1024 * 1024
+
+# A partir de este tamaño el archivo se lee con mmap
+UMBRAL_MMAP = 64 * 1024 * 1024
+
+_por_hilo = threading.local()
+
+
+def tamano_buffer(st):
+    """TAMANO_BUFFER redondeado a un múltiplo del bloque del dispositivo."""
+    bloque = getattr(st, "st_blksize", 0) or 4096
+    return max(bloque, TAMANO_BUFFER // bloque * bloque)
+
+
+def _buffer(tamano):
+    """Búfer de lectura de este hilo (se reserva una vez y se reutiliza)."""
+    vista = getattr(_por_hilo, "vista", None)
+    if vista is None or len(vista) != tamano:
+        vista = _por_hilo.vista = memoryview(bytearray(tamano))
+    return vista
+
+
+def _hash_mmap(f, hasher):
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, "madvise"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        hasher.update(mm)
+
+
+def _hash_lectura(f, hasher, st):
+    vista = _buffer(tamano_buffer(st))
+    while n := f.readinto(vista):
+        hasher.update(vista[:n])
+
+
+def hash_archivo(ruta, algoritmo=ALGORITMO_POR_DEFECTO, umbral_mmap=UMBRAL_MMAP):
+    """
+    Hash (hexadecimal) del contenido de un archivo con 'algoritmo'.
+    Devuelve (hash, st), con el os.stat tomado al abrirlo. Los errores de
+    lectura se lanzan como OSError.
+    """
+    nuevo_hasher = ALGORITMOS[algoritmo]
+    with open(ruta, "rb", buffering=0) as f:
+        st = os.fstat(f.fileno())
+        if st.st_size >= umbral_mmap:
+            hasher = nuevo_hasher()
+            try:
+                _hash_mmap(f, hasher)
+                return hasher.hexdigest(), st
+            except (OSError, ValueError, OverflowError):
+                # Sin espacio de direcciones o sistema sin mmap: a trozos
+                f.seek(0)
+
+        hasher = nuevo_hasher()
+        _hash_lectura(f, hasher, st)
+        return hasher.hexdigest(), st
+
+
+# ---------- COMPARATIVA ----------
+
+def _hash_antiguo(ruta):
+    """Como se calculaba antes: f.read de 8 KB y SHA-256."""
+    with open(ruta, "rb") as f:
+        hasher = hashlib.sha256()
+        while chunk := f.read(8192):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def medir(tamano_mb=256, repeticiones=3):
+    """
+    Crea un archivo temporal de 'tamano_mb' MB y mide cuántos MB/s hashea
+    cada variante (el archivo queda en la caché del sistema, así que se
+    mide la CPU, no el disco). Devuelve {variante: MB/s}.
+    """
+    import tempfile
+
+    variantes = {"sha256 f.read 8 KB (antes)": _hash_antiguo}
+    for algoritmo in ALGORITMOS:
+        variantes[f"{algoritmo} readinto"] = (
+            lambda ruta, a=algoritmo: hash_archivo(ruta, a, umbral_mmap=float("inf"))
+        )
+        variantes[f"{algoritmo} mmap"] = (
+            lambda ruta, a=algoritmo: hash_archivo(ruta, a, umbral_mmap=0)
+        )
+
+    velocidades = {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "muestra.bin")
+        trozo = os.urandom(1024 * 1024)
+        with open(ruta, "wb") as f:
+            for _ in range(tamano_mb):
+                f.write(trozo)
+
+        _hash_antiguo(ruta)  # calentar la caché del sistema
+        for nombre, funcion in variantes.items():
+            mejor = float("inf")
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                funcion(ruta)
+                mejor = min(mejor, time.perf_counter() - inicio)
+            velocidades[nombre] = tamano_mb / mejor
+
+        # Todas las variantes de un algoritmo tienen que dar lo mismo
+        esperado = _hash_antiguo(ruta)
+        for umbral in (0, float("inf")):
+            if hash_archivo(ruta, "sha256", umbral_mmap=umbral)[0] != esperado:
+                raise AssertionError(f"hash distinto con umbral_mmap={umbral}")
+    return velocidades
+
+
+if __name__ == "__main__":
+    mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    for nombre, velocidad in medir(mb).items():
+        print(f"{nombre:28s} {velocidad:8,.0f} MB/s")
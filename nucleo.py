@@ -0,0 +1,1163 @@
+# nucleo.py
+# ==========================================================
+# Motores de las operaciones, sin interfaz (generadores de eventos)
+# ==========================================================
+#
+# Cada operación es un generador que va devolviendo eventos (dict):
+#
+#   {"tipo": "inicio", "total": n}              ya se sabe cuántos hay
+#   {"tipo": "progreso", "hechos": i, "total": n, ...}
+#   {"tipo": "linea", "texto": "...", "nivel": "info" | "aviso" | "error"}
+#   {"tipo": "resumen", "datos": {...}}         siempre el último
+#
+# Lo usan la interfaz Tk (operaciones.py) y la línea de órdenes (cli.py).
+# Aquí no se pregunta nada: las confirmaciones las hace quien llama,
+# antes de lanzar el generador.
+
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+from escaner import invalidar, obtener_instantanea
+from fechas_internas import EXTENSIONES_ESCRITURA, leer_fechas_internas
+from fechas_nombre import extractor as extractor_fechas
+from motor_exiftool import ErrorExifTool, ProgresoExifTool, obtener_pool
+from motor_fechas import (
+    aplicar_fechas_json,
+    escribir_fechas_internas_json,
+    filtrar_fechas_ya_aplicadas,
+)
+from sidecar import (
+    SUFIJO_SUPLEMENTARIO,
+    emparejar_laterales,
+    leer_laterales,
+    leer_timestamp,
+)
+from utils import (
+    algoritmo_hash,
+    calcular_hashes,
+    calcular_huella,
+    calcular_huella_y_hash,
+    comprobar_archivo,
+    olvidar_hash,
+    registrar_operacion,
+    indice_registro,
+    vaciar_registro,
+)
+
+# Carpeta de cuarentena dentro de la ruta base
+NOMBRE_CARPETA_CUARENTENA = "__Cuarentena_GestorArchivos__"
+
+
+class ErrorOperacion(Exception):
+    """La operación no se puede ni empezar (ruta no válida, sin exiftool...)."""
+
+
+# ---------- EVENTOS ----------
+
+def evento_inicio(total):
+    return {"tipo": "inicio", "total": total}
+
+
+def evento_progreso(hechos, total, **extra):
+    return {"tipo": "progreso", "hechos": hechos, "total": total, **extra}
+
+
+def evento_linea(texto, nivel="info"):
+    return {"tipo": "linea", "texto": texto, "nivel": nivel}
+
+
+def evento_resumen(**datos):
+    return {"tipo": "resumen", "datos": datos}
+
+
+def _comprobar_ruta(ruta_base, mensaje="Ruta no válida o inexistente."):
+    if not os.path.isdir(ruta_base):
+        raise ErrorOperacion(mensaje)
+
+
+# ---------- AUXILIARES COMPARTIDAS ----------
+
+def describir_cambios(instantanea):
+    """Texto con los cambios de una instantánea respecto al escaneo anterior."""
+    delta = instantanea.delta
+    if delta is None:
+        return "Primer escaneo de esta carpeta.\n"
+    return (
+        f"Cambios desde el último escaneo: +{len(delta.anadidos)} / "
+        f"-{len(delta.eliminados)} archivos "
+        f"({delta.carpetas_releidas} carpetas releídas)\n"
+    )
+
+
+def obtener_ruta_cuarentena(ruta_base, ruta_archivo):
+    """
+    Devuelve la ruta dentro de la carpeta de cuarentena para un archivo dado.
+
+    Estructura:
+        <ruta_base>/__Cuarentena_GestorArchivos__/REL_PATH
+
+    donde REL_PATH es la ruta del archivo relativa a ruta_base.
+    """
+    ruta_base_abs = os.path.abspath(ruta_base)
+    archivo_abs = os.path.abspath(ruta_archivo)
+
+    try:
+        rel = os.path.relpath(archivo_abs, ruta_base_abs)
+    except ValueError:
+        # Por si no están en el mismo disco (no debería pasar si todo parte de ruta_base)
+        rel = os.path.basename(archivo_abs)
+
+    cuarentena_root = os.path.join(ruta_base_abs, NOMBRE_CARPETA_CUARENTENA)
+    return os.path.join(cuarentena_root, rel)
+
+
+def argumentos_fechas_exiftool(origen="%d/%F.json"):
+    """Argumentos de exiftool para copiar la fecha del JSON 'origen'."""
+    return [
+        "-d", "%s",
+        "-tagsfromfile", origen,
+        "-FileCreateDate<PhotoTakenTimeTimestamp",
+        "-FileModifyDate<PhotoTakenTimeTimestamp",
+        "-overwrite_original",
+        "-progress",
+    ]
+
+
+# Argumentos comunes de exiftool para copiar la fecha del <archivo>.json
+ARGUMENTOS_FECHAS_EXIFTOOL = argumentos_fechas_exiftool()
+
+
+def argumentos_fecha_interna_exiftool(origen):
+    """
+    Argumentos de exiftool para escribir la fecha del JSON 'origen' dentro
+    del archivo (EXIF y fechas QuickTime de película, pistas y medios).
+    Reescribe el archivo entero: solo para lo que no se puede parchear.
+    """
+    return [
+        "-d", "%s",  # el EXIF queda en hora local, como lo escribe y lee fechas_internas
+        "-api", "QuickTimeUTC",
+        "-tagsfromfile", origen,
+        "-AllDates<PhotoTakenTimeTimestamp",
+        "-Track*Date<PhotoTakenTimeTimestamp",
+        "-Media*Date<PhotoTakenTimeTimestamp",
+        "-overwrite_original",
+    ]
+
+
+def pares_con_json_lateral(carpeta):
+    """
+    Empareja los archivos de una carpeta de la instantánea con su JSON
+    lateral (con las variantes de nombre de Takeout). Devuelve
+    {nombre_archivo: nombre_json}.
+    """
+    return emparejar_laterales(
+        [a.nombre for a in carpeta.archivos],
+        [a.nombre for a in carpeta.archivos if a.tipo == "json"],
+    )
+
+
+def archivos_con_json_lateral(ruta_base):
+    """
+    Devuelve (rutas absolutas) los pares (archivo, json) de los archivos
+    que no son JSON y tienen su JSON lateral. Igual que exiftool -r, no
+    entra en carpetas cuyo nombre empieza por punto.
+    """
+    pares = []
+    for carpeta in obtener_instantanea(ruta_base).carpetas:
+        if any(p.startswith(".") for p in carpeta.partes):
+            continue
+        ruta_dir = os.path.abspath(carpeta.ruta)
+        emparejados = pares_con_json_lateral(carpeta)
+        for a in carpeta.archivos:
+            nombre_json = emparejados.get(a.nombre)
+            if nombre_json is not None:
+                pares.append(
+                    (os.path.join(ruta_dir, a.nombre), os.path.join(ruta_dir, nombre_json))
+                )
+    return pares
+
+
+def ordenes_fechas_exiftool(pares, num_procesos):
+    """
+    Órdenes de exiftool para aplicar las fechas a los pares (archivo,
+    json). Los que usan <archivo>.json o <archivo>.supplemental-metadata.json
+    van por lotes ('%d/%F.json' o '%d/%F.supplemental-metadata.json'); los
+    de nombre de Takeout recortado o con '(n)' llevan cada uno su
+    '-tagsfromfile'. Devuelve [(argumentos, num_archivos)].
+    """
+    por_sufijo = {".json": [], SUFIJO_SUPLEMENTARIO + ".json": []}
+    sueltos = []
+    for ruta, ruta_json in pares:
+        sufijo = ruta_json[len(ruta):] if ruta_json.startswith(ruta) else None
+        if sufijo in por_sufijo:
+            por_sufijo[sufijo].append(ruta)
+        else:
+            sueltos.append((ruta, ruta_json))
+
+    ordenes = []
+    for sufijo, rutas in por_sufijo.items():
+        argumentos = argumentos_fechas_exiftool("%d/%F" + sufijo)
+        ordenes.extend(
+            (argumentos + lote, len(lote))
+            for lote in repartir_en_lotes(rutas, num_procesos)
+        )
+    ordenes.extend(
+        (argumentos_fechas_exiftool(ruta_json) + [ruta], 1)
+        for ruta, ruta_json in sueltos
+    )
+    return ordenes
+
+
+def repartir_en_lotes(archivos, num_procesos, max_por_lote=500):
+    """
+    Parte la lista en lotes para los procesos de exiftool. Se hacen unos
+    cuantos lotes por proceso para que ninguno se quede parado al final.
+    """
+    if not archivos:
+        return []
+    tam = -(-len(archivos) // (num_procesos * 4))  # división hacia arriba
+    tam = max(1, min(max_por_lote, tam))
+    return [archivos[i:i + tam] for i in range(0, len(archivos), tam)]
+
+
+def extraer_timestamp_de_nombre(ruta):
+    """
+    Intenta obtener un timestamp (epoch) a partir del nombre del archivo.
+    Ver fechas_nombre.ExtractorFechas para los formatos que reconoce.
+    """
+    return extractor_fechas.extraer(ruta)
+
+
+def formatear_fecha(timestamp):
+    """'AAAA-MM-DD HH:MM:SS' (UTC) de un epoch."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def crear_json_desde_timestamp(ruta_media, timestamp):
+    """
+    Crea un JSON estilo Google Photos minimalista usando el timestamp dado.
+    Devuelve la ruta del JSON creado.
+    """
+    formatted = formatear_fecha(timestamp)
+
+    data = {
+        "title": os.path.basename(ruta_media),
+        "photoTakenTime": {
+            "timestamp": str(int(timestamp)),
+            "formatted": formatted
+        }
+    }
+
+    destino = ruta_media + ".json"
+    with open(destino, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+    return destino
+
+
+# ---------- ESCANEO ----------
+
+def escanear(ruta_base):
+    """Escanea (o actualiza el índice de) la carpeta y resume lo que hay."""
+    _comprobar_ruta(ruta_base)
+    inicio = time.time()
+
+    instantanea = obtener_instantanea(ruta_base)
+    yield evento_linea(describir_cambios(instantanea).rstrip("\n"))
+
+    tipos = {"media": 0, "json": 0, "otro": 0}
+    for a in instantanea.iterar_archivos():
+        tipos[a.tipo] += 1
+    delta = instantanea.delta
+
+    yield evento_resumen(
+        carpetas=len(instantanea.carpetas),
+        archivos=instantanea.total_archivos(),
+        media=tipos["media"],
+        json=tipos["json"],
+        otros=tipos["otro"],
+        anadidos=len(delta.anadidos) if delta else None,
+        eliminados=len(delta.eliminados) if delta else None,
+        carpetas_releidas=delta.carpetas_releidas if delta else None,
+        segundos=round(time.time() - inicio, 3),
+    )
+
+
+# ---------- RENOMBRAR ----------
+
+def renombrar_archivos(ruta_base, ext_origen, ext_nueva, revertir=False):
+    """
+    Renombra los archivos que acaban en 'ext_origen' para que acaben en
+    'ext_nueva'. Con revertir=True hace lo contrario, pero solo con los
+    archivos que coinciden con un renombrado registrado: primero por la
+    huella rápida y, si no coincide, por el hash completo.
+    """
+    _comprobar_ruta(ruta_base)
+    inicio = time.time()
+    renombrados = omitidos = errores = 0
+
+    # Si revertimos, intercambiamos extensiones
+    if revertir:
+        ext_origen, ext_nueva = ext_nueva, ext_origen
+
+    archivos = [
+        a.ruta
+        for a in obtener_instantanea(ruta_base).iterar_archivos()
+        if a.nombre.endswith(ext_origen)
+    ]
+    total = len(archivos)
+    yield evento_inicio(total)
+    carpetas_tocadas = set()
+
+    try:
+        if total:
+            # Índice del registro para verificar reversiones sin releerlo
+            indice = indice_registro() if revertir else None
+
+            # Las huellas (y al renombrar, los hashes) se calculan en paralelo
+            # por delante del bucle. Al revertir, el hash completo solo se
+            # calcula si la huella no coincide con la registrada.
+            calculados = calcular_hashes(
+                archivos, funcion=calcular_huella if revertir else calcular_huella_y_hash
+            )
+
+            for i, (ruta_origen, calculado) in enumerate(calculados, start=1):
+                nuevo_nombre = os.path.basename(ruta_origen)[: -len(ext_origen)] + ext_nueva
+                ruta_destino = os.path.join(os.path.dirname(ruta_origen), nuevo_nombre)
+
+                op_registrada = None
+                if revertir:
+                    huella = calculado
+                    registradas = indice.buscar("archivo_nuevo", ruta_origen)
+                    if registradas:
+                        op_registrada, hash_original, algoritmo, verificacion = (
+                            comprobar_archivo(ruta_origen, huella, registradas)
+                        )
+                else:
+                    huella, hash_original = calculado
+                    algoritmo = algoritmo_hash()
+
+                if revertir and op_registrada is None:
+                    yield evento_linea(
+                        f"⚠️ Saltado (hash no coincide o no fue renombrado): {ruta_origen}",
+                        "aviso",
+                    )
+                    omitidos += 1
+                elif os.path.exists(ruta_destino):
+                    # Evitar sobreescrituras
+                    yield evento_linea(f"OMITIDO (ya existe): {ruta_destino}", "aviso")
+                    omitidos += 1
+                else:
+                    try:
+                        os.rename(ruta_origen, ruta_destino)
+                        carpetas_tocadas.add(os.path.dirname(ruta_origen))
+                        renombrados += 1
+                        op = {
+                            "accion": "revertido" if revertir else "renombrado",
+                            "archivo_original": ruta_origen,
+                            "archivo_nuevo": ruta_destino,
+                            "hash": hash_original,
+                            "algoritmo": algoritmo,
+                            "huella": huella,
+                        }
+                        if revertir:
+                            op["verificacion"] = verificacion
+                        # Se registra antes de avisar: si se cierra el generador
+                        # en el yield, el renombrado ya consta en el diario
+                        registrar_operacion([op])
+                        yield evento_linea(f"✔ Renombrado: {ruta_origen} → {ruta_destino}")
+                    except OSError as e:
+                        yield evento_linea(f"❌ ERROR en {ruta_origen}: {e}", "error")
+                        errores += 1
+
+                yield evento_progreso(i, total)
+    finally:
+        vaciar_registro()
+        invalidar(carpetas=carpetas_tocadas)
+
+    yield evento_resumen(
+        extension=ext_origen,
+        total=total,
+        renombrados=renombrados,
+        omitidos=omitidos,
+        errores=errores,
+        segundos=round(time.time() - inicio, 3),
+    )
+
+
+# ---------- ELIMINAR / CUARENTENA ----------
+
+def buscar_por_extension(ruta_base, extension):
+    """
+    Rutas de los archivos que acaban en 'extension', sin entrar en la
+    carpeta de cuarentena.
+    """
+    _comprobar_ruta(ruta_base)
+    return [
+        a.ruta
+        for a in obtener_instantanea(ruta_base).iterar_archivos(
+            excluir=[NOMBRE_CARPETA_CUARENTENA]
+        )
+        if a.nombre.endswith(extension)
+    ]
+
+
+def eliminar_archivos(ruta_base, archivos, usar_cuarentena=True):
+    """
+    Envía a la cuarentena de 'ruta_base' (o borra definitivamente, con
+    usar_cuarentena=False) los archivos indicados.
+    """
+    inicio = time.time()
+    eliminados = errores = 0
+
+    archivos = [r for r in archivos if os.path.exists(r)]
+    total = len(archivos)
+    yield evento_inicio(total)
+    carpetas_tocadas = set()
+
+    # Cada archivo se registra nada más moverlo o borrarlo (antes de
+    # avisar), y el diario se vuelca aunque se cierre el generador a medias
+    try:
+        calculados = calcular_hashes(archivos, funcion=calcular_huella_y_hash)
+        for i, (ruta, (huella, hash_archivo)) in enumerate(calculados, start=1):
+            try:
+                op = {
+                    "archivo_original": ruta,
+                    "hash": hash_archivo,
+                    "algoritmo": algoritmo_hash(),
+                    "huella": huella,
+                }
+                if usar_cuarentena:
+                    ruta_cuarentena = obtener_ruta_cuarentena(ruta_base, ruta)
+                    os.makedirs(os.path.dirname(ruta_cuarentena), exist_ok=True)
+                    shutil.move(ruta, ruta_cuarentena)
+                    carpetas_tocadas.update(
+                        (os.path.dirname(ruta), os.path.dirname(ruta_cuarentena))
+                    )
+                    op["accion"] = "cuarentena"
+                    op["archivo_cuarentena"] = ruta_cuarentena
+                    registrar_operacion([op])
+                    eliminados += 1
+                    yield evento_linea(f"🧪 A CUARENTENA: {ruta} → {ruta_cuarentena}")
+                else:
+                    os.remove(ruta)
+                    olvidar_hash(ruta)
+                    carpetas_tocadas.add(os.path.dirname(ruta))
+                    op["accion"] = "eliminado"
+                    registrar_operacion([op])
+                    eliminados += 1
+                    yield evento_linea(f"🗑 Eliminado: {ruta}")
+            except OSError as e:
+                yield evento_linea(f"❌ ERROR procesando {ruta}: {e}", "error")
+                errores += 1
+
+            yield evento_progreso(i, total)
+    finally:
+        vaciar_registro()
+        invalidar(carpetas=carpetas_tocadas)
+
+    yield evento_resumen(
+        total=total,
+        cuarentena=usar_cuarentena,
+        eliminados=eliminados,
+        errores=errores,
+        segundos=round(time.time() - inicio, 3),
+    )
+
+
+def carpeta_cuarentena(ruta_base):
+    """Ruta absoluta de la carpeta de cuarentena de 'ruta_base'."""
+    return os.path.join(os.path.abspath(ruta_base), NOMBRE_CARPETA_CUARENTENA)
+
+
+def archivos_en_cuarentena(ruta_base, rutas_seleccionadas=None):
+    """
+    Archivos de la cuarentena de 'ruta_base': los seleccionados que aún
+    existen o, si no se indica ninguno, todos. Devuelve None si no hay
+    carpeta de cuarentena.
+    """
+    _comprobar_ruta(ruta_base, "Ruta base no válida o inexistente.")
+    carpeta_cuar = carpeta_cuarentena(ruta_base)
+    if not os.path.isdir(carpeta_cuar):
+        return None
+    if rutas_seleccionadas:
+        return [r for r in rutas_seleccionadas if os.path.exists(r)]
+    return [a.ruta for a in obtener_instantanea(carpeta_cuar).iterar_archivos()]
+
+
+def listar_cuarentena(ruta_base):
+    """Una línea por archivo en cuarentena (solo la ruta, para poder copiarla)."""
+    archivos = archivos_en_cuarentena(ruta_base)
+    if archivos is None:
+        yield evento_linea(
+            "No se ha encontrado la carpeta de cuarentena para esta ruta.", "aviso"
+        )
+        yield evento_resumen(carpeta=None, total=0)
+        return
+
+    carpeta_cuar = carpeta_cuarentena(ruta_base)
+    yield evento_linea(f"Listando archivos en cuarentena:\n{carpeta_cuar}\n")
+
+    total = len(archivos)
+    yield evento_inicio(total)
+    for i, ruta in enumerate(archivos, start=1):
+        yield evento_linea(ruta)
+        yield evento_progreso(i, total)
+
+    yield evento_resumen(carpeta=carpeta_cuar, total=total)
+
+
+def restaurar_cuarentena(ruta_base, archivos):
+    """
+    Devuelve los archivos indicados de la cuarentena a su ruta original.
+    Se comprueba que son los que se enviaron con la huella rápida y, solo
+    si no coincide, con el hash completo.
+    """
+    inicio = time.time()
+    restaurados = errores = 0
+    ruta_base_abs = os.path.abspath(ruta_base)
+    carpeta_cuar = carpeta_cuarentena(ruta_base)
+
+    total = len(archivos)
+    yield evento_inicio(total)
+    carpetas_tocadas = set()
+
+    try:
+        # Índice del registro para recuperar la ruta original
+        indice = indice_registro()
+
+        huellas = calcular_hashes(archivos, funcion=calcular_huella)
+        for i, (ruta_cuar, huella) in enumerate(huellas, start=1):
+            try:
+                # Buscar en el registro la última operación de cuarentena
+                ruta_original = None
+                hash_reg = None
+
+                op = indice.ultima("archivo_cuarentena", ruta_cuar, accion="cuarentena")
+                if op is not None:
+                    ruta_original = op.get("archivo_original")
+                    hash_reg = op.get("hash")
+                _coincide, hash_actual, algoritmo, verificacion = comprobar_archivo(
+                    ruta_cuar, huella, [op] if op is not None else []
+                )
+
+                if ruta_original is None:
+                    # Si no hay información en el registro, reconstruimos
+                    # la ruta original a partir de la relativa.
+                    rel = os.path.relpath(ruta_cuar, carpeta_cuar)
+                    ruta_original = os.path.join(ruta_base_abs, rel)
+
+                if hash_reg and hash_reg != hash_actual:
+                    yield evento_linea(
+                        f"⚠️ Hash distinto al registrado, restaurando igualmente: {ruta_cuar}",
+                        "aviso",
+                    )
+
+                os.makedirs(os.path.dirname(ruta_original), exist_ok=True)
+                shutil.move(ruta_cuar, ruta_original)
+                carpetas_tocadas.update(
+                    (os.path.dirname(ruta_cuar), os.path.dirname(ruta_original))
+                )
+
+                yield evento_linea(f"🔁 Restaurado: {ruta_cuar} → {ruta_original}")
+                restaurados += 1
+
+                registrar_operacion([{
+                    "accion": "restaurado",
+                    "archivo_original": ruta_original,
+                    "archivo_cuarentena": ruta_cuar,
+                    "hash": hash_actual,
+                    "algoritmo": algoritmo,
+                    "huella": huella,
+                    "verificacion": verificacion,
+                }])
+            except OSError as e:
+                yield evento_linea(f"❌ ERROR restaurando {ruta_cuar}: {e}", "error")
+                errores += 1
+
+            yield evento_progreso(i, total)
+    finally:
+        vaciar_registro()
+        invalidar(carpetas=carpetas_tocadas)
+
+    yield evento_resumen(
+        total=total,
+        restaurados=restaurados,
+        errores=errores,
+        segundos=round(time.time() - inicio, 3),
+    )
+
+
+def purgar_cuarentena(archivos):
+    """Borra DEFINITIVAMENTE los archivos indicados de la cuarentena."""
+    inicio = time.time()
+    purgados = errores = 0
+
+    total = len(archivos)
+    yield evento_inicio(total)
+    carpetas_tocadas = set()
+
+    try:
+        # Si la huella coincide con la de la cuarentena, se apunta el hash
+        # registrado sin leer el archivo entero
+        indice = indice_registro()
+        huellas = calcular_hashes(archivos, funcion=calcular_huella)
+        for i, (ruta_cuar, huella) in enumerate(huellas, start=1):
+            try:
+                op = indice.ultima("archivo_cuarentena", ruta_cuar, accion="cuarentena")
+                _coincide, hash_archivo, algoritmo, verificacion = comprobar_archivo(
+                    ruta_cuar, huella, [op] if op is not None else []
+                )
+                os.remove(ruta_cuar)
+                olvidar_hash(ruta_cuar)
+                carpetas_tocadas.add(os.path.dirname(ruta_cuar))
+                yield evento_linea(f"🔥 PURGADO definitivamente: {ruta_cuar}")
+                purgados += 1
+
+                registrar_operacion([{
+                    "accion": "purgado",
+                    "archivo_cuarentena": ruta_cuar,
+                    "hash": hash_archivo,
+                    "algoritmo": algoritmo,
+                    "huella": huella,
+                    "verificacion": verificacion,
+                }])
+            except OSError as e:
+                yield evento_linea(f"❌ ERROR purgando {ruta_cuar}: {e}", "error")
+                errores += 1
+
+            yield evento_progreso(i, total)
+    finally:
+        vaciar_registro()
+        invalidar(carpetas=carpetas_tocadas)
+
+    yield evento_resumen(
+        total=total,
+        purgados=purgados,
+        errores=errores,
+        segundos=round(time.time() - inicio, 3),
+    )
+
+
+# ---------- INFORME DE ARCHIVOS SIN JSON ----------
+
+def informe_sin_json(ruta_base, guardar=True, comprobar_fechas=False):
+    """
+    Busca los archivos de imagen/vídeo sin JSON lateral. Con
+    comprobar_fechas=True busca también los JSON sin fecha (hay que leer
+    cada JSON). Con guardar=True, si hay alguno, escribe en la carpeta base
+    informe_sin_json_YYYYMMDD_HHMMSS.txt.
+    """
+    _comprobar_ruta(ruta_base)
+    inicio = time.time()
+
+    yield evento_linea("Generando informe de archivos sin JSON...\n")
+
+    # Escaneo recursivo (incremental respecto al anterior)
+    instantanea = obtener_instantanea(ruta_base)
+    yield evento_linea(describir_cambios(instantanea))
+
+    # JSON de cada archivo (emparejado con el listado de la carpeta)
+    media_files = []
+    json_de = {}
+    for carpeta in instantanea.carpetas:
+        emparejados = pares_con_json_lateral(carpeta)
+        for a in carpeta.archivos:
+            if a.tipo != "media":
+                continue
+            media_files.append(a.ruta)
+            if a.nombre in emparejados:
+                json_de[a.ruta] = os.path.join(carpeta.ruta, emparejados[a.nombre])
+
+    total = len(media_files)
+    yield evento_inicio(total)
+
+    sin_json = []
+    con_json = []
+    for i, media in enumerate(media_files, start=1):
+        ruta_json = json_de.get(media)
+        if ruta_json is not None:
+            con_json.append(ruta_json)
+        else:
+            sin_json.append(media)
+            yield evento_linea(f"Sin JSON: {media}", "aviso")
+        yield evento_progreso(i, total)
+
+    # JSON que existen pero no traen una fecha utilizable (solo si se pide:
+    # en un Takeout grande son cientos de miles de lecturas)
+    json_sin_fecha = []
+    if comprobar_fechas:
+        json_sin_fecha = [
+            ruta_json
+            for ruta_json, lateral in leer_laterales(con_json)
+            if lateral is None or lateral.timestamp is None
+        ]
+    for ruta_json in json_sin_fecha:
+        yield evento_linea(f"JSON sin fecha: {ruta_json}", "aviso")
+
+    ruta_informe = None
+    if guardar and (sin_json or json_sin_fecha):
+        nombre_informe = f"informe_sin_json_{time.strftime('%Y%m%d_%H%M%S')}.txt"
+        ruta_informe = os.path.join(ruta_base, nombre_informe)
+        with open(ruta_informe, "w", encoding="utf-8") as f:
+            f.write(
+                "INFORME DE ARCHIVOS SIN JSON\n"
+                f"Carpeta base: {ruta_base}\n"
+                f"Total archivos de imagen/vídeo: {total}\n"
+                f"Archivos sin JSON: {len(sin_json)}\n"
+            )
+            if comprobar_fechas:
+                f.write(f"JSON sin fecha (photoTakenTime): {len(json_sin_fecha)}\n")
+            f.write("\n")
+            for media in sin_json:
+                f.write(media + "\n")
+            if json_sin_fecha:
+                f.write("\nJSON SIN FECHA\n")
+                for ruta_json in json_sin_fecha:
+                    f.write(ruta_json + "\n")
+
+    yield evento_resumen(
+        total=total,
+        sin_json=len(sin_json),
+        json_sin_fecha=len(json_sin_fecha) if comprobar_fechas else None,
+        informe=ruta_informe,
+        segundos=round(time.time() - inicio, 3),
+    )
+
+
+# ---------- JSON DESDE EL NOMBRE O DESDE SIMILARES ----------
+
+def generar_json(ruta_base, simulacion=True, usar_fecha_interna=True):
+    """
+    Busca archivos de imagen/vídeo SIN JSON y:
+
+      1º intenta crear un JSON con la fecha guardada DENTRO del archivo
+         (EXIF DateTimeOriginal, QuickTime mvhd), si usar_fecha_interna
+      2º si no, con la FECHA del NOMBRE del archivo
+      3º si tampoco, busca un JSON con nombre similar en la misma carpeta
+         y lo copia.
+
+    Con simulacion=True solo cuenta lo que haría, sin crear nada.
+    """
+    # NumPy (opcional) solo se carga si se llega a usar
+    from similitud import UMBRAL_SIMILITUD, IndiceSimilares
+
+    _comprobar_ruta(ruta_base)
+    inicio = time.time()
+
+    yield evento_linea(
+        "Buscando archivos sin JSON y posibles fuentes (fecha interna, nombre o similares)...\n"
+    )
+
+    archivos_sin_json = []
+    json_en_carpeta = {}
+
+    # 1) Recorremos todo el árbol y separamos media + json
+    instantanea = obtener_instantanea(ruta_base)
+    yield evento_linea(describir_cambios(instantanea))
+
+    for carpeta in instantanea.carpetas:
+        ruta_dir = os.path.abspath(carpeta.ruta)
+        lista_media = []
+        lista_json = []
+        for a in carpeta.archivos:
+            if a.tipo == "json":
+                lista_json.append(os.path.join(ruta_dir, a.nombre))
+            elif a.tipo == "media":
+                lista_media.append(os.path.join(ruta_dir, a.nombre))
+        if not lista_media:
+            continue
+
+        json_en_carpeta[ruta_dir] = lista_json
+
+        # Emparejado con el listado de la carpeta, sin ir al disco
+        emparejados = pares_con_json_lateral(carpeta)
+        for media in lista_media:
+            if os.path.basename(media) not in emparejados:
+                archivos_sin_json.append(media)
+
+    total = len(archivos_sin_json)
+    yield evento_inicio(total)
+
+    # Fechas guardadas dentro de los archivos (EXIF / QuickTime), en paralelo
+    if usar_fecha_interna and archivos_sin_json:
+        yield evento_linea(f"Leyendo fechas internas de {total} archivos...\n")
+        timestamps_internos = [ts for _, ts in leer_fechas_internas(archivos_sin_json)]
+    else:
+        timestamps_internos = [None] * total
+
+    # Fechas sacadas de los nombres, todas de una vez
+    timestamps_nombre = extractor_fechas.extraer_varios(archivos_sin_json)
+
+    # Un índice de nombres de JSON por carpeta (se crea al usarlo)
+    indices_similares = {}
+
+    creados_total = 0
+    creados_desde_interna = 0
+    creados_desde_nombre = 0
+    con_fecha_interna = 0
+    con_nombre_valido = 0
+    con_similar = 0
+    sin_coincidencia = 0
+    errores = 0
+    carpetas_tocadas = set()
+
+    # Si se cierra a medias, las carpetas con JSON nuevos se marcan igual
+    try:
+        fechas = zip(archivos_sin_json, timestamps_internos, timestamps_nombre)
+        for i, (media, ts_interna, ts_nombre) in enumerate(fechas, start=1):
+            json_destino = media + ".json"
+
+            if ts_interna is not None or ts_nombre is not None:
+                # 1) Fecha guardada dentro del archivo o, si no, sacada del nombre
+                if ts_interna is not None:
+                    ts, fuente = ts_interna, "fecha interna"
+                    con_fecha_interna += 1
+                    yield evento_linea(
+                        f"[INTERNA] {media}\n  → fecha interna: {ts} ({formatear_fecha(ts)})"
+                    )
+                else:
+                    ts, fuente = ts_nombre, "nombre"
+                    con_nombre_valido += 1
+                    yield evento_linea(f"[NOMBRE] {media}\n  → timestamp extraído: {ts}")
+
+                if simulacion:
+                    yield evento_linea(f"  (SIMULACIÓN: se crearía JSON desde {fuente})\n")
+                elif os.path.exists(json_destino):
+                    yield evento_linea("  (Ya existe JSON, no se crea otro)\n")
+                else:
+                    try:
+                        crear_json_desde_timestamp(media, ts)
+                        carpetas_tocadas.add(os.path.dirname(media))
+                        if ts_interna is not None:
+                            creados_desde_interna += 1
+                        else:
+                            creados_desde_nombre += 1
+                        creados_total += 1
+                        yield evento_linea(f"  JSON creado desde {fuente}: {json_destino}\n")
+                    except (OSError, ValueError) as e:
+                        errores += 1
+                        yield evento_linea(
+                            f"  ERROR al crear JSON desde {fuente}: {e}\n", "error"
+                        )
+            else:
+                # 2) Sin fecha en el archivo ni en el nombre: buscar un JSON similar
+                ruta_dir = os.path.dirname(media)
+                indice = indices_similares.get(ruta_dir)
+                if indice is None:
+                    indice = IndiceSimilares(json_en_carpeta.get(ruta_dir, []), UMBRAL_SIMILITUD)
+                    indices_similares[ruta_dir] = indice
+                mejor_json, mejor_ratio = indice.buscar(media)
+
+                if mejor_json and mejor_ratio >= UMBRAL_SIMILITUD:
+                    con_similar += 1
+                    ts_similar = leer_timestamp(mejor_json)
+                    fecha_similar = (
+                        formatear_fecha(ts_similar) if ts_similar is not None else "sin fecha"
+                    )
+                    yield evento_linea(
+                        f"[SIMILAR] {media}\n"
+                        f"  a partir de: {mejor_json} "
+                        f"(coincidencia {mejor_ratio:.2f}, fecha {fecha_similar})"
+                    )
+
+                    if simulacion:
+                        yield evento_linea("  (SIMULACIÓN: se copiaría JSON similar)\n")
+                    elif os.path.exists(json_destino):
+                        yield evento_linea("  (Ya existe JSON, no se copia)\n")
+                    else:
+                        try:
+                            shutil.copy2(mejor_json, json_destino)
+                            carpetas_tocadas.add(os.path.dirname(media))
+                            creados_total += 1
+                            yield evento_linea(f"  JSON copiado a: {json_destino}\n")
+                        except OSError as e:
+                            errores += 1
+                            yield evento_linea(f"  ERROR al copiar JSON: {e}\n", "error")
+                else:
+                    sin_coincidencia += 1
+                    yield evento_linea(f"[SIN COINCIDENCIA] {media}", "aviso")
+
+            yield evento_progreso(i, total)
+    finally:
+        invalidar(carpetas=carpetas_tocadas)
+
+    yield evento_resumen(
+        simulacion=simulacion,
+        total=total,
+        con_fecha_interna=con_fecha_interna,
+        con_nombre_valido=con_nombre_valido,
+        con_similar=con_similar,
+        sin_coincidencia=sin_coincidencia,
+        creados=creados_total,
+        creados_desde_interna=creados_desde_interna,
+        creados_desde_nombre=creados_desde_nombre,
+        creados_desde_similares=(
+            creados_total - creados_desde_interna - creados_desde_nombre
+        ),
+        errores=errores,
+        segundos=round(time.time() - inicio, 3),
+    )
+
+
+# ---------- APLICAR FECHAS DE LOS JSON ----------
+
+def aplicar_fechas(
+    ruta_base, saltar_sin_cambios=True, solo_fechas_archivo=False,
+    escribir_fecha_interna=False,
+):
+    """
+    Pone a cada archivo la fecha de su JSON lateral de Google Photos.
+
+    - saltar_sin_cambios: antes se comprueba con os.stat qué archivos ya
+      tienen la fecha del JSON y esos se dejan como están
+    - solo_fechas_archivo: aplicar las fechas con os.utime desde Python,
+      sin arrancar exiftool
+    - escribir_fecha_interna: escribir también la fecha dentro de los
+      JPEG (EXIF) y los vídeos (MP4 / MOV), parcheando en el sitio solo los
+      bytes de la fecha; los que no se pueden parchear pasan por exiftool
+
+    El resumen trae 'codigo': 0 si todo fue bien, 1 si algún archivo dio
+    error y -1 si falló algún lote de exiftool entero.
+    """
+    _comprobar_ruta(ruta_base)
+    inicio = time.time()
+
+    # --- Localizar exiftool (procesos persistentes compartidos) ---
+    pool = None
+    if not solo_fechas_archivo:
+        try:
+            pool = obtener_pool()
+        except ErrorExifTool as e:
+            raise ErrorOperacion(str(e)) from e
+
+    # Archivos a procesar: los que no son JSON y tienen su JSON
+    archivos = archivos_con_json_lateral(ruta_base)
+
+    # Los que ya tienen la fecha correcta no hace falta reescribirlos
+    saltados = 0
+    if saltar_sin_cambios and archivos:
+        yield evento_linea(f"Comprobando fechas actuales de {len(archivos)} archivos...")
+        archivos, saltados = filtrar_fechas_ya_aplicadas(
+            archivos, comprobar_interna=escribir_fecha_interna
+        )
+        yield evento_linea(f"Ya tenían la fecha correcta (se saltan): {saltados}")
+
+    total = len(archivos)
+    yield evento_inicio(total)
+
+    if total == 0:
+        if saltados:
+            yield evento_linea("Todas las fechas estaban ya aplicadas.")
+        else:
+            yield evento_linea("No hay archivos con JSON lateral que procesar.")
+        yield evento_resumen(
+            motor=None, codigo=0, total=0, actualizados=0, sin_cambios=saltados,
+            errores=0, segundos=round(time.time() - inicio, 3),
+        )
+        return
+
+    try:
+        # La fecha interna va antes: al escribirla cambia la de modificación
+        internas = errores_internas = 0
+        if escribir_fecha_interna:
+            internas, errores_internas = yield from _escribir_fechas_internas(archivos, pool)
+
+        if solo_fechas_archivo:
+            datos = yield from _aplicar_fechas_nativo(archivos, saltados, inicio)
+        else:
+            datos = yield from _aplicar_fechas_exiftool(pool, archivos, saltados)
+    finally:
+        # Cambian los archivos, no sus carpetas: el escáner no lo notaría
+        invalidar(carpetas={os.path.dirname(ruta) for ruta, _ in archivos})
+    if escribir_fecha_interna:
+        datos["fechas_internas"] = internas
+        datos["errores"] += errores_internas
+        if errores_internas and datos["codigo"] == 0:
+            datos["codigo"] = 1
+    datos["segundos"] = round(time.time() - inicio, 3)
+    yield evento_resumen(**datos)
+
+
+def _escribir_fechas_internas(archivos, pool):
+    """
+    Escribe la fecha del JSON dentro de los JPEG y los vídeos. Se parchean
+    en el sitio (solo cambian los bytes de la fecha, sin copiar archivos
+    de varios GB); los que no tienen ya la etiqueta o tienen una
+    estructura rara pasan por exiftool.
+    Devuelve (escritas, errores).
+    """
+    candidatos = [
+        par for par in archivos
+        if os.path.splitext(par[0])[1].lower() in EXTENSIONES_ESCRITURA
+    ]
+    if not candidatos:
+        return 0, 0
+    yield evento_linea(f"Escribiendo la fecha interna de {len(candidatos)} archivos (JPEG / MP4 / MOV)...")
+
+    escritas = 0
+    errores = 0
+    para_exiftool = []
+    for par, (ruta, escrita, error) in zip(candidatos, escribir_fechas_internas_json(candidatos)):
+        if error:
+            errores += 1
+            yield evento_linea(error, "error")
+        elif escrita:
+            escritas += 1
+            olvidar_hash(ruta)  # mismo tamaño y, al final, misma fecha: la caché no lo notaría
+        else:
+            para_exiftool.append(par)
+    yield evento_linea(f"Fecha interna escrita en el sitio: {escritas}")
+
+    if para_exiftool:
+        if pool is None:
+            try:
+                pool = obtener_pool()
+            except ErrorExifTool as e:
+                yield evento_linea(
+                    f"Sin exiftool no se puede escribir la fecha interna de "
+                    f"{len(para_exiftool)} archivos: {e}",
+                    "error",
+                )
+                return escritas, errores + len(para_exiftool)
+
+        yield evento_linea(
+            f"Escribiendo con exiftool la fecha interna de {len(para_exiftool)} archivos..."
+        )
+        resultados = pool.ejecutar_lotes(
+            [argumentos_fecha_interna_exiftool(ruta_json) + [ruta]
+             for ruta, ruta_json in para_exiftool]
+        )
+        for (ruta, _ruta_json), resultado in zip(para_exiftool, resultados):
+            if isinstance(resultado, ErrorExifTool):
+                fallos = [str(resultado)]
+            else:
+                fallos = [linea.rstrip("\r\n") for linea in resultado if linea.startswith("Error")]
+            if fallos:
+                errores += 1
+                for texto in fallos:
+                    yield evento_linea(texto, "error")
+            else:
+                escritas += 1
+                olvidar_hash(ruta)
+    return escritas, errores
+
+
+def _aplicar_fechas_nativo(archivos, saltados, inicio):
+    """Aplica las fechas con os.utime (sin exiftool)."""
+    total = len(archivos)
+    yield evento_linea(f"Aplicando fechas a {total} archivos (sin exiftool)...\n")
+
+    actualizados = 0
+    errores = 0
+    for i, (_ruta, error) in enumerate(aplicar_fechas_json(archivos), start=1):
+        if error:
+            errores += 1
+            yield evento_linea(error, "error")
+        else:
+            actualizados += 1
+        yield evento_progreso(i, total)
+
+    transcurrido = time.time() - inicio
+    velocidad = total / transcurrido if transcurrido else 0
+    yield evento_linea(
+        f"\nActualizados: {actualizados} · Sin cambios: {saltados} · "
+        f"Con error: {errores} · {velocidad:.1f} archivos/s"
+    )
+    return {
+        "motor": "nativo",
+        "codigo": 1 if errores else 0,
+        "total": total,
+        "actualizados": actualizados,
+        "sin_cambios": saltados,
+        "errores": errores,
+        "archivos_por_segundo": round(velocidad, 1),
+    }
+
+
+def _aplicar_fechas_exiftool(pool, archivos, saltados):
+    """
+    Aplica las fechas con exiftool por lotes. Los procesos escriben sus
+    líneas en una cola desde sus hilos y aquí se van convirtiendo en
+    eventos.
+    """
+    total = len(archivos)
+    ordenes = ordenes_fechas_exiftool(archivos, pool.num_procesos)
+    yield evento_linea(
+        f"Ejecutando exiftool: {total} archivos en {len(ordenes)} lotes "
+        f"({pool.num_procesos} procesos)...\n"
+    )
+
+    # Progreso agregado de todos los lotes
+    estado = ProgresoExifTool(total)
+    cola = queue.Queue()
+    resultados = []
+    fallo = []
+
+    def ejecutar():
+        try:
+            resultados.extend(
+                pool.ejecutar_lotes(
+                    [argumentos for argumentos, _ in ordenes],
+                    lambda indice_lote, linea: cola.put((indice_lote, linea)),
+                )
+            )
+        except Exception as e:  # se relanza en el hilo del generador
+            fallo.append(e)
+        finally:
+            cola.put(None)
+
+    threading.Thread(target=ejecutar, daemon=True).start()
+
+    while (elemento := cola.get()) is not None:
+        indice_lote, linea = elemento
+        if estado.procesar(linea, indice_lote):
+            texto = linea.rstrip("\r\n")
+            if texto.startswith("Error") or texto.endswith("due to errors"):
+                nivel = "error"
+            elif texto.startswith("Warning"):
+                nivel = "aviso"
+            else:
+                nivel = "info"
+            yield evento_linea(texto, nivel)
+        yield evento_progreso(
+            estado.hechos,
+            total,
+            archivos_por_segundo=estado.archivos_por_segundo(),
+            segundos_restantes=estado.segundos_restantes(),
+        )
+
+    if fallo:
+        raise fallo[0]
+
+    codigo = 0
+    for (_, num_archivos), resultado in zip(ordenes, resultados):
+        if isinstance(resultado, ErrorExifTool):
+            estado.anotar_fallo_lote(num_archivos)
+            yield evento_linea(str(resultado), "error")
+            codigo = -1
+    if codigo == 0 and estado.hay_errores():
+        codigo = 1
+
+    r = estado.resumen()
+    yield evento_linea(
+        f"\nActualizados: {r['actualizados']} · "
+        f"Sin cambios: {r['sin_cambios'] + saltados} "
+        f"({saltados} sin pasar por exiftool) · "
+        f"Con error: {r['errores']} · "
+        f"{r['archivos_por_segundo']} archivos/s"
+    )
+    return {
+        "motor": "exiftool",
+        "codigo": codigo,
+        "total": total,
+        "actualizados": r["actualizados"],
+        "sin_cambios": r["sin_cambios"] + saltados,
+        "errores": r["errores"],
+        "archivos_por_segundo": r["archivos_por_segundo"],
+    }
@@ -2,51 +2,138 @@
 # ==========================================================
 # Módulo de operaciones del Gestor de Archivos Unificado
 # ==========================================================
+#
+# Adaptadores Tk de los motores de nucleo.py: lanzan el motor en un hilo,
+# llevan sus eventos a los widgets (salida, barra de progreso, contador y
+# tiempo) y hacen las preguntas y avisos con messagebox.
 
-import json
 import os
 import threading
 import time
 import tkinter as tk
-import subprocess
-import shutil
-import re
-import sys
-from datetime import datetime, timezone
-from tkinter import messagebox
-from difflib import SequenceMatcher
-
+from tkinter import messagebox as _messagebox
+
+import nucleo
+from eventos import en_hilo_principal
+# Se siguen pudiendo importar desde aquí
+from nucleo import (
+    NOMBRE_CARPETA_CUARENTENA,
+    archivos_con_json_lateral,
+    crear_json_desde_timestamp,
+    describir_cambios,
+    extraer_timestamp_de_nombre,
+    obtener_ruta_cuarentena,
+)
 from utils import (
-    calcular_hash,
-    registrar_operacion,
-    leer_json,
-    formatear_tiempo,
     bloquear_botones,
     desbloquear_botones,
+    formatear_tiempo,
+    purgar_cache_hash,
 )
-# Carpeta de cuarentena dentro de la ruta base
-NOMBRE_CARPETA_CUARENTENA = "__Cuarentena_GestorArchivos__"
 
-def obtener_ruta_cuarentena(ruta_base, ruta_archivo):
+
+# ==========================================================
+# DE LOS EVENTOS DEL NÚCLEO A LOS WIDGETS
+# ==========================================================
+
+
+class _MessageboxHilo:
+    """
+    messagebox para las tareas que corren en hilos: cada diálogo se abre en
+    el hilo principal (a través del bus) y el hilo espera la respuesta.
     """
-    Devuelve la ruta dentro de la carpeta de cuarentena para un archivo dado.
 
-    Estructura:
-        <ruta_base>/__Cuarentena_GestorArchivos__/REL_PATH
+    def __getattr__(self, nombre):
+        funcion = getattr(_messagebox, nombre)
+        return lambda *args, **kwargs: en_hilo_principal(funcion, *args, **kwargs)
+
+
+messagebox = _MessageboxHilo()
+
 
-    donde REL_PATH es la ruta del archivo relativa a ruta_base.
+def _en_hilo(tarea, botones, daemon=True):
     """
-    ruta_base_abs = os.path.abspath(ruta_base)
-    archivo_abs = os.path.abspath(ruta_archivo)
+    Ejecuta 'tarea' en un hilo con los botones bloqueados. Los errores que
+    impiden empezar (nucleo.ErrorOperacion) se muestran con messagebox.
+    """
+
+    def envoltura():
+        try:
+            tarea()
+        except nucleo.ErrorOperacion as e:
+            messagebox.showerror("Error", str(e))
+        except tk.TclError:
+            # La ventana se ha cerrado con la tarea en marcha
+            return
+        finally:
+            # Pase lo que pase, reactivamos botones (en el hilo principal)
+            try:
+                en_hilo_principal(desbloquear_botones, botones)
+            except tk.TclError:
+                pass
+
+    bloquear_botones(botones)
+    threading.Thread(target=envoltura, daemon=daemon).start()
+
 
+def _limpiar(salida, contador_var, tiempo_var):
+    """Vacía la salida y pone los indicadores a cero. False si ya no hay ventana."""
     try:
-        rel = os.path.relpath(archivo_abs, ruta_base_abs)
-    except ValueError:
-        # Por si no están en el mismo disco (no debería pasar si todo parte de ruta_base)
-        rel = os.path.basename(archivo_abs)
+        salida.delete(1.0, tk.END)
+        contador_var.set("0/0")
+        tiempo_var.set("00:00")
+    except tk.TclError:
+        return False
+    return True
+
+
+def _escribir(salida, texto):
+    """Añade texto a la salida (sin fallar si la ventana ya se cerró)."""
+    try:
+        salida.insert(tk.END, texto)
+        salida.see(tk.END)
+    except tk.TclError:
+        pass
+
+
+def _mostrar_eventos(eventos, salida, progreso, contador_var, tiempo_var, inicio):
+    """
+    Lleva a los widgets los eventos de un motor del núcleo y devuelve los
+    datos de su resumen, o None si la ventana se cerró por el camino (en
+    ese caso el motor se detiene).
+    """
+    datos = None
+    try:
+        for evento in eventos:
+            tipo = evento["tipo"]
+            if tipo == "linea":
+                salida.insert(tk.END, evento["texto"] + "\n")
+                salida.see(tk.END)
+            elif tipo == "progreso":
+                hechos, total = evento["hechos"], evento["total"]
+                progreso["value"] = hechos
+                texto_tiempo = formatear_tiempo(time.time() - inicio)
+                velocidad = evento.get("archivos_por_segundo")
+                if velocidad is None:
+                    contador_var.set(f"{hechos}/{total}")
+                else:
+                    contador_var.set(f"{hechos}/{total} · {velocidad:.0f} arch/s")
+                    restante = evento.get("segundos_restantes")
+                    if restante is not None and hechos < total:
+                        texto_tiempo += f" (quedan {formatear_tiempo(restante)})"
+                tiempo_var.set(texto_tiempo)
+            elif tipo == "inicio":
+                progreso["maximum"] = evento["total"]
+                progreso["value"] = 0
+                contador_var.set(f"0/{evento['total']}")
+            elif tipo == "resumen":
+                datos = evento["datos"]
+    except tk.TclError:
+        # Ventana cerrada: cerramos el generador para que guarde lo hecho
+        eventos.close()
+        return None
+    return datos
 
-    cuarentena_root = os.path.join(ruta_base_abs, NOMBRE_CARPETA_CUARENTENA)
-    return os.path.join(cuarentena_root, rel)
 
 # ==========================================================
 # FUNCIÓN GENÉRICA PARA RENOMBRAR ARCHIVOS
@@ -67,147 +154,32 @@ def renombrar_archivos(
 
     def tarea():
         inicio = time.time()
-        total = renombrados = omitidos = errores = 0
-        operaciones = []
-
-        try:
-            salida.delete(1.0, tk.END)
-        except tk.TclError:
+        if not _limpiar(salida, contador_var, tiempo_var):
             return
 
-        if not os.path.isdir(ruta_base):
-            messagebox.showerror("Error", "Ruta no válida o inexistente.")
-            if botones:
-                desbloquear_botones(botones)
+        datos = _mostrar_eventos(
+            nucleo.renombrar_archivos(ruta_base, ext_origen, ext_nueva, revertir),
+            salida, progreso, contador_var, tiempo_var, inicio,
+        )
+        if datos is None:
             return
-
-        # Si revertimos, intercambiamos extensiones
-        if revertir:
-            ext_origen_local, ext_nueva_local = ext_nueva, ext_origen
-        else:
-            ext_origen_local, ext_nueva_local = ext_origen, ext_nueva
-
-        # Buscar archivos coincidentes
-        archivos = []
-        for dirpath, _, files in os.walk(ruta_base):
-            for f in files:
-                if f.endswith(ext_origen_local):
-                    archivos.append(os.path.join(dirpath, f))
-
-        total = len(archivos)
-        if total == 0:
+        if datos["total"] == 0:
             messagebox.showinfo(
-                "Sin archivos", f"No se encontraron archivos con {ext_origen_local}"
+                "Sin archivos", f"No se encontraron archivos con {datos['extension']}"
             )
-            if botones:
-                desbloquear_botones(botones)
             return
 
-        try:
-            progreso["maximum"] = total
-            progreso["value"] = 0
-        except tk.TclError:
-            return
-
-        for i, ruta_origen in enumerate(archivos, start=1):
-            dirpath = os.path.dirname(ruta_origen)
-            nuevo_nombre = (
-                os.path.basename(ruta_origen)[: -len(ext_origen_local)] + ext_nueva_local
-            )
-            ruta_destino = os.path.join(dirpath, nuevo_nombre)
-            hash_original = calcular_hash(ruta_origen)
-
-            # Verificación de hash en modo revertir
-            if revertir:
-                valido = False
-                registro = leer_json()
-                for op in registro:
-                    if (
-                        op.get("archivo_nuevo") == ruta_origen
-                        and op.get("hash") == hash_original
-                    ):
-                        valido = True
-                        break
-                if not valido:
-                    try:
-                        salida.insert(
-                            tk.END,
-                            f"⚠️ Saltado (hash no coincide o no fue renombrado): {ruta_origen}\n",
-                        )
-                    except tk.TclError:
-                        return
-                    omitidos += 1
-                    continue
-
-            # Evitar sobreescrituras
-            if os.path.exists(ruta_destino):
-                try:
-                    salida.insert(tk.END, f"OMITIDO (ya existe): {ruta_destino}\n")
-                except tk.TclError:
-                    return
-                omitidos += 1
-                continue
-
-            try:
-                os.rename(ruta_origen, ruta_destino)
-                salida.insert(
-                    tk.END, f"✔ Renombrado: {ruta_origen} → {ruta_destino}\n"
-                )
-                renombrados += 1
-                operaciones.append(
-                    {
-                        "accion": "revertido" if revertir else "renombrado",
-                        "archivo_original": ruta_origen,
-                        "archivo_nuevo": ruta_destino,
-                        "hash": hash_original,
-                    }
-                )
-            except Exception as e:
-                try:
-                    salida.insert(tk.END, f"❌ ERROR en {ruta_origen}: {e}\n")
-                except tk.TclError:
-                    return
-                errores += 1
-
-            try:
-                progreso["value"] = i
-                contador_var.set(f"{i}/{total}")
-                tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                salida.see(tk.END)
-                salida.update()
-            except tk.TclError:
-                return
-
-        # Guardar registro
-        if operaciones:
-            registrar_operacion(operaciones)
-
-        fin = time.time()
-        try:
-            salida.insert(tk.END, f"\n=== RESUMEN ===\n")
-            salida.insert(
-                tk.END,
-                f"Archivos totales: {total}\nRenombrados: {renombrados}\n"
-                f"Omitidos: {omitidos}\nErrores: {errores}\n",
-            )
-            salida.insert(
-                tk.END, f"Duración total: {formatear_tiempo(fin - inicio)}\n"
-            )
-            salida.see(tk.END)
-        except tk.TclError:
-            pass
-
-        if botones:
-            desbloquear_botones(botones)
-
-        messagebox.showinfo(
-            "Completado", f"Proceso finalizado ({formatear_tiempo(fin - inicio)})."
+        duracion = formatear_tiempo(time.time() - inicio)
+        _escribir(
+            salida,
+            "\n=== RESUMEN ===\n"
+            f"Archivos totales: {datos['total']}\nRenombrados: {datos['renombrados']}\n"
+            f"Omitidos: {datos['omitidos']}\nErrores: {datos['errores']}\n"
+            f"Duración total: {duracion}\n",
         )
+        messagebox.showinfo("Completado", f"Proceso finalizado ({duracion}).")
 
-    if botones:
-        bloquear_botones(botones)
-    hilo = threading.Thread(target=tarea, daemon=True)
-    hilo.start()
+    _en_hilo(tarea, botones)
 
 
 # ==========================================================
@@ -235,147 +207,82 @@ def eliminar_archivos(
 
     def tarea():
         inicio = time.time()
-        total = eliminados = errores = 0
-        operaciones = []
+        if not _limpiar(salida, contador_var, tiempo_var):
+            return
 
-        try:
-            salida.delete(1.0, tk.END)
+        # --- Construir la lista de archivos a borrar ---
+        if rutas_seleccionadas:
+            # Solo los seleccionados en la interfaz
+            archivos = [r for r in rutas_seleccionadas if os.path.exists(r)]
+        else:
+            # Buscar por carpeta + extensión (sin entrar en la cuarentena)
+            archivos = nucleo.buscar_por_extension(ruta_base, extension)
 
-            # --- Construir la lista de archivos a borrar ---
+        total = len(archivos)
+        if total == 0:
             if rutas_seleccionadas:
-                # Solo los seleccionados en la interfaz
-                archivos = [r for r in rutas_seleccionadas if os.path.exists(r)]
+                messagebox.showinfo(
+                    "Sin archivos", "Ninguno de los archivos seleccionados existe ya."
+                )
             else:
-                # Buscar por carpeta + extensión
-                if not os.path.isdir(ruta_base):
-                    messagebox.showerror("Error", "Ruta no válida o inexistente.")
-                    return
-
-                archivos = []
-                for dirpath, dirnames, files in os.walk(ruta_base):
-                    # Evitar que entre en la propia carpeta de cuarentena
-                    if NOMBRE_CARPETA_CUARENTENA in dirnames:
-                        dirnames.remove(NOMBRE_CARPETA_CUARENTENA)
-
-                    for f in files:
-                        if f.endswith(extension):
-                            archivos.append(os.path.join(dirpath, f))
-
-            total = len(archivos)
-            if total == 0:
-                if rutas_seleccionadas:
-                    messagebox.showinfo(
-                        "Sin archivos", "Ninguno de los archivos seleccionados existe ya."
-                    )
-                else:
-                    messagebox.showinfo(
-                        "Sin archivos", f"No se encontraron archivos con {extension}"
-                    )
-                return
+                messagebox.showinfo(
+                    "Sin archivos", f"No se encontraron archivos con {extension}"
+                )
+            return
 
-            progreso["maximum"] = total
-            progreso["value"] = 0
+        # --- Confirmación ---
+        if rutas_seleccionadas:
+            mensaje_conf = f"¿Enviar a cuarentena {total} archivo(s) seleccionado(s)?" if usar_cuarentena \
+                           else f"¿Eliminar definitivamente {total} archivo(s) seleccionado(s)?"
+        else:
+            mensaje_conf = (
+                f"¿Enviar a cuarentena {total} archivos con {extension}?"
+                if usar_cuarentena
+                else f"¿Eliminar definitivamente {total} archivos con {extension}?"
+            )
 
-            # --- Confirmación ---
-            if rutas_seleccionadas:
-                mensaje_conf = f"¿Enviar a cuarentena {total} archivo(s) seleccionado(s)?" if usar_cuarentena \
-                               else f"¿Eliminar definitivamente {total} archivo(s) seleccionado(s)?"
-            else:
-                mensaje_conf = (
-                    f"¿Enviar a cuarentena {total} archivos con {extension}?"
-                    if usar_cuarentena
-                    else f"¿Eliminar definitivamente {total} archivos con {extension}?"
-                )
+        confirmar = messagebox.askyesno(
+            "Confirmar eliminación / cuarentena", mensaje_conf
+        )
+        if not confirmar:
+            return
+
+        # --- Borrado real / cuarentena ---
+        datos = _mostrar_eventos(
+            nucleo.eliminar_archivos(ruta_base, archivos, usar_cuarentena),
+            salida, progreso, contador_var, tiempo_var, inicio,
+        )
+        if datos is None:
+            return
+
+        duracion = formatear_tiempo(time.time() - inicio)
+        eliminados = datos["eliminados"]
+        if usar_cuarentena:
+            linea_hechos = f"Enviados a cuarentena: {eliminados}\n"
+        else:
+            linea_hechos = f"Eliminados: {eliminados}\n"
+        _escribir(
+            salida,
+            "\n=== RESUMEN ===\n"
+            f"Archivos objetivo: {datos['total']}\n"
+            f"{linea_hechos}"
+            f"Errores: {datos['errores']}\n"
+            f"Duración total: {duracion}\n",
+        )
 
-            confirmar = messagebox.askyesno(
-                "Confirmar eliminación / cuarentena", mensaje_conf
+        if usar_cuarentena:
+            messagebox.showinfo(
+                "Completado",
+                f"Se han enviado {eliminados} archivo(s) a la cuarentena\n"
+                f"en {duracion}.",
             )
-            if not confirmar:
-                return
-
-            # --- Borrado real / cuarentena ---
-            for i, ruta in enumerate(archivos, start=1):
-                try:
-                    hash_archivo = calcular_hash(ruta)
-
-                    if usar_cuarentena:
-                        ruta_cuarentena = obtener_ruta_cuarentena(ruta_base, ruta)
-                        os.makedirs(os.path.dirname(ruta_cuarentena), exist_ok=True)
-                        shutil.move(ruta, ruta_cuarentena)
-                        salida.insert(
-                            tk.END,
-                            f"🧪 A CUARENTENA: {ruta} → {ruta_cuarentena}\n",
-                        )
-                        accion = "cuarentena"
-                    else:
-                        os.remove(ruta)
-                        salida.insert(tk.END, f"🗑 Eliminado: {ruta}\n")
-                        accion = "eliminado"
-
-                    eliminados += 1
-
-                    op = {
-                        "accion": accion,
-                        "archivo_original": ruta,
-                        "hash": hash_archivo,
-                    }
-                    if usar_cuarentena:
-                        op["archivo_cuarentena"] = ruta_cuarentena
-
-                    operaciones.append(op)
-
-                except Exception as e:
-                    salida.insert(
-                        tk.END, f"❌ ERROR procesando {ruta}: {e}\n"
-                    )
-                    errores += 1
-
-                try:
-                    progreso["value"] = i
-                    contador_var.set(f"{i}/{total}")
-                    tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                    salida.see(tk.END)
-                    salida.update()
-                except tk.TclError:
-                    return
-
-            if operaciones:
-                registrar_operacion(operaciones)
-
-            fin = time.time()
-            salida.insert(tk.END, f"\n=== RESUMEN ===\n")
-            salida.insert(tk.END, f"Archivos objetivo: {total}\n")
-            if usar_cuarentena:
-                salida.insert(
-                    tk.END,
-                    f"Enviados a cuarentena: {eliminados}\n"
-                )
-            else:
-                salida.insert(tk.END, f"Eliminados: {eliminados}\n")
-            salida.insert(tk.END, f"Errores: {errores}\n")
-            salida.insert(
-                tk.END, f"Duración total: {formatear_tiempo(fin - inicio)}\n"
+        else:
+            messagebox.showinfo(
+                "Completado",
+                f"Se eliminaron {eliminados} archivo(s) en {duracion}.",
             )
-            salida.see(tk.END)
 
-            if usar_cuarentena:
-                messagebox.showinfo(
-                    "Completado",
-                    f"Se han enviado {eliminados} archivo(s) a la cuarentena\n"
-                    f"en {formatear_tiempo(fin - inicio)}.",
-                )
-            else:
-                messagebox.showinfo(
-                    "Completado",
-                    f"Se eliminaron {eliminados} archivo(s) en {formatear_tiempo(fin - inicio)}.",
-                )
-        finally:
-            # Pase lo que pase, reactivamos botones
-            desbloquear_botones(botones)
-
-    bloquear_botones(botones)
-    hilo = threading.Thread(target=tarea)
-    hilo.start()
+    _en_hilo(tarea, botones, daemon=False)
 
 # ==========================================================
 # PREVISUALIZAR ARCHIVOS POR EXTENSIÓN (SIN BORRAR)
@@ -389,73 +296,37 @@ def previsualizar_archivos(
 
     def tarea():
         inicio = time.time()
-        try:
-            salida.delete(1.0, tk.END)
-        except tk.TclError:
-            return
-
-        if not os.path.isdir(ruta_base):
-            messagebox.showerror("Error", "Ruta no válida o inexistente.")
-            if botones:
-                desbloquear_botones(botones)
+        if not _limpiar(salida, contador_var, tiempo_var):
             return
 
-        archivos = []
-        for dirpath, dirnames, files in os.walk(ruta_base):
-                # Evitar entrar en la carpeta de cuarentena
-            if NOMBRE_CARPETA_CUARENTENA in dirnames:
-                dirnames.remove(NOMBRE_CARPETA_CUARENTENA)
-
-            for f in files:
-                if f.endswith(extension):
-                    archivos.append(os.path.join(dirpath, f))
-
-
+        # Evitar entrar en la carpeta de cuarentena
+        archivos = nucleo.buscar_por_extension(ruta_base, extension)
         total = len(archivos)
-        try:
-            progreso["maximum"] = total
-            progreso["value"] = 0
-        except tk.TclError:
-            return
-
         if total == 0:
             messagebox.showinfo(
                 "Sin archivos", f"No se encontraron archivos con {extension}"
             )
             return
 
-        for i, ruta in enumerate(archivos, start=1):
-            try:
-                salida.insert(tk.END, f"Encontrado: {ruta}\n")
-                progreso["value"] = i
-                contador_var.set(f"{i}/{total}")
-                tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                salida.see(tk.END)
-                salida.update()
-            except tk.TclError:
-                # La ventana o widgets se han destruido: salimos del hilo
-                return
-
         try:
-            salida.insert(tk.END, f"\n=== RESUMEN ===\n")
-            salida.insert(
-                tk.END, f"Archivos encontrados con {extension}: {total}\n"
-            )
+            progreso["maximum"] = total
+            progreso["value"] = total
+            contador_var.set(f"{total}/{total}")
+            for ruta in archivos:
+                salida.insert(tk.END, f"Encontrado: {ruta}\n")
+            salida.insert(tk.END, "\n=== RESUMEN ===\n")
+            salida.insert(tk.END, f"Archivos encontrados con {extension}: {total}\n")
             salida.see(tk.END)
+            tiempo_var.set(formatear_tiempo(time.time() - inicio))
         except tk.TclError:
-            pass
+            # La ventana o widgets se han destruido: salimos del hilo
+            return
 
         messagebox.showinfo(
             "Búsqueda finalizada", f"Se encontraron {total} archivos con {extension}."
         )
 
-        if botones:
-            desbloquear_botones(botones)
-
-    if botones:
-        bloquear_botones(botones)
-    hilo = threading.Thread(target=tarea, daemon=True)
-    hilo.start()
+    _en_hilo(tarea, botones)
 
 
 # ==========================================================
@@ -470,9 +341,17 @@ def aplicar_exiftool_fechas(
     contador_var,
     tiempo_var,
     botones=None,
+    saltar_sin_cambios=True,
+    solo_fechas_archivo=False,
+    escribir_fecha_interna=False,
 ):
     """
     Ejecuta exiftool para actualizar fechas a partir de los JSON de Google Photos.
+    Los archivos se reparten en lotes que procesan a la vez varios procesos
+    exiftool persistentes (uno por núcleo, como mucho 8).
+
+    Con saltar_sin_cambios, antes se comprueba con os.stat qué archivos ya
+    tienen la fecha del JSON y esos no se le pasan a exiftool.
 
     - ruta_base: carpeta base (Takeout / Google Fotos)
     - salida: widget ScrolledText donde se muestra la salida
@@ -480,256 +359,57 @@ def aplicar_exiftool_fechas(
     - contador_var: StringVar "x/y" (aquí la usamos solo como texto)
     - tiempo_var: StringVar "mm:ss"
     - botones: lista de botones a deshabilitar mientras se ejecuta
+    - saltar_sin_cambios: no reescribir archivos que ya tienen la fecha
+    - solo_fechas_archivo: aplicar las fechas con os.utime desde Python,
+      sin arrancar exiftool
+    - escribir_fecha_interna: escribir también la fecha dentro de los
+      JPEG y los vídeos (en el sitio; exiftool solo para los que no se
+      pueden parchear)
     """
 
-    import threading
-
     def tarea():
         inicio = time.time()
+        if not _limpiar(salida, contador_var, tiempo_var):
+            return
 
-        try:
-            # Limpiar salida e inicializar indicadores
-            try:
-                salida.delete(1.0, tk.END)
-            except tk.TclError:
-                return
-
-            contador_var.set("0/0")
-            tiempo_var.set("00:00")
-
-            if not os.path.isdir(ruta_base):
-                messagebox.showerror("Error", "Ruta no válida o inexistente.")
-                return
-
-            # --- Localizar exiftool ---
-            if getattr(sys, "frozen", False):
-                base_dir = os.path.dirname(sys.executable)
-            else:
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-
-            exif_local = os.path.join(base_dir, "exiftool.exe")
-            if os.path.exists(exif_local):
-                exif_bin = exif_local
-            else:
-                # Recurre al PATH del sistema
-                exif_bin = "exiftool"
-
-            if shutil.which(exif_bin) is None and not os.path.exists(exif_local):
-                messagebox.showerror(
-                    "Error",
-                    "No se encontró 'exiftool'.\n\n"
-                    "Coloca 'exiftool.exe' junto al ejecutable o añádelo al PATH."
-                )
-                return
-
-            # Barra en modo indeterminado
-            try:
-                progreso.config(mode="indeterminate")
-                progreso.start(10)
-            except tk.TclError:
-                pass
+        datos = _mostrar_eventos(
+            nucleo.aplicar_fechas(
+                ruta_base, saltar_sin_cambios, solo_fechas_archivo, escribir_fecha_interna
+            ),
+            salida, progreso, contador_var, tiempo_var, inicio,
+        )
+        if datos is None or datos["total"] == 0:
+            return
 
-            # Comando exiftool
-            cmd = [
-                exif_bin,
-                "-r",
-                "-d", "%s",
-                "-tagsfromfile", "%d/%F.json",
-                "-FileCreateDate<PhotoTakenTimeTimestamp",
-                "-FileModifyDate<PhotoTakenTimeTimestamp",
-                "-ext", "*",
-                "--ext", "json",
-                "-overwrite_original",
-                "-progress",
-                ".",
-            ]
+        if datos["motor"] == "nativo":
+            nombre_motor = "El motor nativo"
+        else:
+            nombre_motor = "ExifTool"
 
-            try:
-                salida.insert(tk.END, "Ejecutando exiftool...\n\n")
-                salida.see(tk.END)
-            except tk.TclError:
-                return
-
-            proc = subprocess.Popen(
-                cmd,
-                cwd=ruta_base,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
+        codigo = datos["codigo"]
+        if codigo == 0:
+            _escribir(salida, f"\n{nombre_motor} terminó correctamente.\n")
+            messagebox.showinfo(
+                "Completado",
+                f"{nombre_motor} ha actualizado las fechas usando los JSON."
+            )
+        else:
+            _escribir(
+                salida,
+                f"\n{nombre_motor} terminó con código {codigo}. Revisa la salida.\n"
+            )
+            messagebox.showerror(
+                "Error",
+                f"{nombre_motor} terminó con código {codigo}. Revisa el registro."
             )
 
-            # Leer salida en streaming
-            for linea in proc.stdout:
-                try:
-                    salida.insert(tk.END, linea)
-                    salida.see(tk.END)
-                    tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                    salida.update()
-                except tk.TclError:
-                    # Ventana cerrada
-                    break
-
-            proc.wait()
-            codigo = proc.returncode
-
-            # Restaurar barra de progreso
-            try:
-                progreso.stop()
-                progreso.config(mode="determinate")
-                progreso["value"] = 0
-            except tk.TclError:
-                pass
-
-            if codigo == 0:
-                try:
-                    salida.insert(tk.END, "\nExifTool terminó correctamente.\n")
-                    salida.see(tk.END)
-                except tk.TclError:
-                    pass
-
-                messagebox.showinfo(
-                    "Completado",
-                    "ExifTool ha actualizado las fechas usando los JSON."
-                )
-            else:
-                try:
-                    salida.insert(
-                        tk.END,
-                        f"\nExifTool terminó con código {codigo}. Revisa la salida.\n"
-                    )
-                    salida.see(tk.END)
-                except tk.TclError:
-                    pass
-
-                messagebox.showerror(
-                    "Error",
-                    f"ExifTool terminó con código {codigo}. Revisa el registro."
-                )
-
-        finally:
-            # Pase lo que pase: reactivar botones
-            desbloquear_botones(botones or [])
-        
-    if botones:
-        bloquear_botones(botones)
-    hilo = threading.Thread(target=tarea, daemon=True)
-    hilo.start()
+    _en_hilo(tarea, botones)
 
 
 # ==========================================================
 # JSON SIMILARES (PARA FOTOS EDITADAS, ETC.)
 # ==========================================================
 
-def extraer_timestamp_de_nombre(ruta):
-    """
-    Intenta obtener un timestamp (epoch) a partir del nombre del archivo.
-
-    Soporta:
-      - números de 10 dígitos (epoch en segundos)
-      - números de 13 dígitos (epoch en milisegundos)
-      - formatos tipo: 20240115_134522, 20240115-134522, 20240115 134522
-      - fechas tipo: 20240115 (hora ficticia 12:00:00)
-    """
-    base = os.path.basename(ruta)
-    nombre, _ = os.path.splitext(base)
-
-    # Rango razonable de fechas (2000-01-01 a 2035-12-31)
-    epoch_min = int(datetime(2000, 1, 1, tzinfo=timezone.utc).timestamp())
-    epoch_max = int(datetime(2035, 12, 31, tzinfo=timezone.utc).timestamp())
-
-    # 1) Epoch de 10 o 13 dígitos
-    for m in re.finditer(r"\d{10,13}", nombre):
-        num_str = m.group(0)
-        num = int(num_str)
-        if len(num_str) == 13:
-            num //= 1000  # milisegundos → segundos
-
-        if epoch_min <= num <= epoch_max:
-            return num
-
-    # 2) Formatos tipo 20240115_134522 o 20240115-134522 o 20240115134522
-    m = re.search(
-        r"(20\d{2})([01]\d)([0-3]\d)[ _-]?([0-2]\d)([0-5]\d)([0-5]\d)",
-        nombre
-    )
-    if m:
-        y, mo, d, h, mi, s = map(int, m.groups())
-        try:
-            dt = datetime(y, mo, d, h, mi, s, tzinfo=timezone.utc)
-            ts = int(dt.timestamp())
-            if epoch_min <= ts <= epoch_max:
-                return ts
-        except ValueError:
-            pass
-
-    # 3) Solo fecha YYYYMMDD → hora ficticia 12:00:00
-    m = re.search(r"(20\d{2})([01]\d)([0-3]\d)", nombre)
-    if m:
-        y, mo, d = map(int, m.groups())
-        try:
-            dt = datetime(y, mo, d, 12, 0, 0, tzinfo=timezone.utc)
-            ts = int(dt.timestamp())
-            if epoch_min <= ts <= epoch_max:
-                return ts
-        except ValueError:
-            pass
-
-    return None
-
-
-def crear_json_desde_timestamp(ruta_media, timestamp):
-    """
-    Crea un JSON estilo Google Photos minimalista usando el timestamp dado.
-    Devuelve la ruta del JSON creado.
-    """
-    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-    formatted = dt.strftime("%Y-%m-%d %H:%M:%S")
-
-    data = {
-        "title": os.path.basename(ruta_media),
-        "photoTakenTime": {
-            "timestamp": str(int(timestamp)),
-            "formatted": formatted
-        }
-    }
-
-    destino = ruta_media + ".json"
-    with open(destino, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-    return destino
-
-
-def normalizar_nombre_archivo(ruta):
-    """
-    Convierte un nombre de archivo en una versión simplificada para
-    comparar similitudes. Elimina palabras típicas de Google Photos
-    como 'ha editado', 'effects', espacios, guiones, paréntesis, etc.
-    """
-    nombre = os.path.basename(ruta).lower()
-    # Quitamos la extensión
-    nombre, _ = os.path.splitext(nombre)
-
-    # Palabras / patrones que estorban para comparar
-    reemplazos = [
-        "ha editado",  # Google Photos en español
-        "ha_editado",
-        "edited",  # por si acaso en inglés
-        "effects",
-    ]
-    for r in reemplazos:
-        nombre = nombre.replace(r, "")
-
-    # Quitamos paréntesis con números: (1), (2), etc.
-    nombre = re.sub(r"\(\d+\)", "", nombre)
-
-    # Quitamos espacios, guiones y subrayados
-    nombre = nombre.replace(" ", "").replace("-", "").replace("_", "")
-
-    return nombre
-
 
 def generar_json_desde_similares(
     ruta_base,
@@ -743,248 +423,60 @@ def generar_json_desde_similares(
     """
     Busca archivos de imagen/vídeo SIN JSON y:
 
-      1º intenta crear un JSON a partir de la FECHA del NOMBRE del archivo
+      1º intenta crear un JSON con la fecha guardada DENTRO del archivo
+         (EXIF DateTimeOriginal de JPEG / HEIC, creación de MP4 / MOV)
+
+      2º si no la tiene, a partir de la FECHA del NOMBRE del archivo
          (timestamp, YYYYMMDD_HHMMSS, etc.)
 
-      2º si no lo consigue, intenta buscar un JSON con nombre similar
+      3º si no lo consigue, intenta buscar un JSON con nombre similar
          en la misma carpeta y lo copia.
 
     - simulacion=True  → solo muestra qué haría, sin crear nada.
     - simulacion=False → crea realmente los .json.
     """
 
-    MEDIA_EXTS = {
-        ".jpg", ".jpeg", ".png", ".webp", ".gif", ".heic",
-        ".mp4", ".mov", ".m4v", ".avi", ".mts", ".mkv"
-    }
-    UMBRAL_SIMILITUD = 0.70  # similitud mínima para considerar "similar"
-
     def tarea():
         inicio = time.time()
+        if not _limpiar(salida, contador_var, tiempo_var):
+            return
 
-        try:
-            # Bloqueamos botones si se han pasado
-            bloquear_botones(botones)
-
-            try:
-                salida.delete(1.0, tk.END)
-            except tk.TclError:
-                return
-
-            contador_var.set("0/0")
-            tiempo_var.set("00:00")
+        datos = _mostrar_eventos(
+            nucleo.generar_json(ruta_base, simulacion),
+            salida, progreso, contador_var, tiempo_var, inicio,
+        )
+        if datos is None:
+            return
+        if datos["total"] == 0:
+            _escribir(salida, "No hay archivos de imagen/vídeo sin JSON.\n")
+            return
 
-            if not os.path.isdir(ruta_base):
-                messagebox.showerror("Error", "Ruta no válida o inexistente.")
-                return
+        _escribir(
+            salida,
+            "\n=== RESUMEN ===\n"
+            f"Archivos sin JSON: {datos['total']}\n"
+            f"Con fecha interna (EXIF / vídeo): {datos['con_fecha_interna']}\n"
+            f"Con fecha válida en nombre: {datos['con_nombre_valido']}\n"
+            f"Con JSON similar: {datos['con_similar']}\n"
+            f"Sin coincidencia: {datos['sin_coincidencia']}\n"
+            f"JSON creados realmente: {datos['creados']}\n"
+            f"  - Desde fecha interna: {datos['creados_desde_interna']}\n"
+            f"  - Desde nombre: {datos['creados_desde_nombre']}\n"
+            f"  - Desde similares: {datos['creados_desde_similares']}\n",
+        )
 
-            salida.insert(
-                tk.END,
-                "Buscando archivos sin JSON y posibles fuentes (nombre o similares)...\n\n"
+        if simulacion:
+            messagebox.showinfo(
+                "Previsualización terminada",
+                "Revisa el listado para comprobar las coincidencias."
             )
-            salida.see(tk.END)
-
-            archivos_sin_json = []
-            json_en_carpeta = {}
-
-            # 1) Recorremos todo el árbol y separamos media + json
-            for dirpath, _, files in os.walk(ruta_base):
-                ruta_dir = os.path.abspath(dirpath)
-                lista_media = []
-                lista_json = []
-
-                for f in files:
-                    full = os.path.join(ruta_dir, f)
-                    lower = f.lower()
-
-                    if lower.endswith(".json"):
-                        lista_json.append(full)
-                    else:
-                        _, ext = os.path.splitext(lower)
-                        if ext in MEDIA_EXTS:
-                            lista_media.append(full)
-
-                if not lista_media:
-                    continue
-
-                json_en_carpeta[ruta_dir] = lista_json
-
-                for media in lista_media:
-                    esperado = media + ".json"
-                    if not os.path.exists(esperado):
-                        archivos_sin_json.append(media)
-
-            total = len(archivos_sin_json)
-            if total == 0:
-                salida.insert(
-                    tk.END, "No hay archivos de imagen/vídeo sin JSON.\n"
-                )
-                salida.see(tk.END)
-                return
-
-            try:
-                progreso["maximum"] = total
-                progreso["value"] = 0
-            except tk.TclError:
-                pass
-
-            # Contadores
-            creados_total = 0
-            creados_desde_nombre = 0
-            con_nombre_valido = 0
-            con_similar = 0
-            sin_coincidencia = 0
-
-            for i, media in enumerate(archivos_sin_json, start=1):
-                ruta_dir = os.path.dirname(media)
-                lista_json = json_en_carpeta.get(ruta_dir, [])
-
-                json_destino = media + ".json"
-                creado_este = False
-
-                # -------------------------
-                # 1) Intentar sacar fecha del nombre
-                # -------------------------
-                ts = extraer_timestamp_de_nombre(media)
-                if ts is not None:
-                    con_nombre_valido += 1
-                    salida.insert(
-                        tk.END,
-                        f"[NOMBRE] {media}\n"
-                        f"  → timestamp extraído: {ts}\n"
-                    )
-                    salida.see(tk.END)
-
-                    if not simulacion:
-                        if not os.path.exists(json_destino):
-                            try:
-                                crear_json_desde_timestamp(media, ts)
-                                creados_desde_nombre += 1
-                                creados_total += 1
-                                creado_este = True
-                                salida.insert(
-                                    tk.END,
-                                    f"  JSON creado desde nombre: {json_destino}\n\n"
-                                )
-                            except Exception as e:
-                                salida.insert(
-                                    tk.END,
-                                    f"  ERROR al crear JSON desde nombre: {e}\n\n"
-                                )
-                        else:
-                            salida.insert(
-                                tk.END,
-                                "  (Ya existe JSON, no se crea otro)\n\n"
-                            )
-                    else:
-                        salida.insert(
-                            tk.END,
-                            "  (SIMULACIÓN: se crearía JSON desde nombre)\n\n"
-                        )
-
-                # -------------------------
-                # 2) Si no hay fecha válida en nombre, buscar JSON similar
-                # -------------------------
-                if not creado_este and ts is None:
-                    mejor_json = None
-                    mejor_ratio = 0.0
-
-                    norm_media = normalizar_nombre_archivo(media)
-
-                    for jpath in lista_json:
-                        base_json = jpath[:-5] if jpath.lower().endswith(".json") else jpath
-                        norm_json = normalizar_nombre_archivo(base_json)
-
-                        if not norm_media or not norm_json:
-                            continue
-
-                        ratio = SequenceMatcher(None, norm_media, norm_json).ratio()
-                        if ratio > mejor_ratio:
-                            mejor_ratio = ratio
-                            mejor_json = jpath
-
-                    if mejor_json and mejor_ratio >= UMBRAL_SIMILITUD:
-                        con_similar += 1
-                        salida.insert(
-                            tk.END,
-                            f"[SIMILAR] {media}\n"
-                            f"  a partir de: {mejor_json} "
-                            f"(coincidencia {mejor_ratio:.2f})\n"
-                        )
-                        salida.see(tk.END)
-
-                        if not simulacion:
-                            if not os.path.exists(json_destino):
-                                try:
-                                    shutil.copy2(mejor_json, json_destino)
-                                    creados_total += 1
-                                    salida.insert(
-                                        tk.END,
-                                        f"  JSON copiado a: {json_destino}\n\n"
-                                    )
-                                except Exception as e:
-                                    salida.insert(
-                                        tk.END,
-                                        f"  ERROR al copiar JSON: {e}\n\n"
-                                    )
-                            else:
-                                salida.insert(
-                                    tk.END,
-                                    "  (Ya existe JSON, no se copia)\n\n"
-                                )
-                        else:
-                            salida.insert(
-                                tk.END,
-                                "  (SIMULACIÓN: se copiaría JSON similar)\n\n"
-                            )
-                    else:
-                        sin_coincidencia += 1
-                        salida.insert(
-                            tk.END,
-                            f"[SIN COINCIDENCIA] {media}\n"
-                        )
-                        salida.see(tk.END)
-
-                # Actualizar progreso
-                try:
-                    progreso["value"] = i
-                    contador_var.set(f"{i}/{total}")
-                    tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                    salida.update()
-                except tk.TclError:
-                    return
-
-            # -------------------------
-            # Resumen
-            # -------------------------
-            salida.insert(tk.END, "\n=== RESUMEN ===\n")
-            salida.insert(
-                tk.END,
-                f"Archivos sin JSON: {total}\n"
-                f"Con fecha válida en nombre: {con_nombre_valido}\n"
-                f"Con JSON similar: {con_similar}\n"
-                f"Sin coincidencia: {sin_coincidencia}\n"
-                f"JSON creados realmente: {creados_total}\n"
-                f"  - Desde nombre: {creados_desde_nombre}\n"
-                f"  - Desde similares: {creados_total - creados_desde_nombre}\n"
+        else:
+            messagebox.showinfo(
+                "Proceso terminado",
+                f"Se han creado {datos['creados']} JSON nuevos."
             )
-            salida.see(tk.END)
-
-            if simulacion:
-                messagebox.showinfo(
-                    "Previsualización terminada",
-                    "Revisa el listado para comprobar las coincidencias."
-                )
-            else:
-                messagebox.showinfo(
-                    "Proceso terminado",
-                    f"Se han creado {creados_total} JSON nuevos."
-                )
 
-        finally:
-            desbloquear_botones(botones)
-
-    threading.Thread(target=tarea, daemon=True).start()
+    _en_hilo(tarea, botones)
 
 
 
@@ -1022,151 +514,63 @@ def informe_archivos_sin_json(
     progreso,
     contador_var,
     tiempo_var,
-    botones=None,):
+    botones=None,
+    comprobar_fechas=False,):
     """
     Genera un informe con TODOS los archivos de imagen/vídeo que no
-    tienen su archivo JSON lateral (<archivo.ext>.json).
+    tienen su archivo JSON lateral (<archivo.ext>.json o sus variantes de
+    Takeout: .supplemental-metadata.json, nombres recortados, duplicados).
+    Con comprobar_fechas=True lista también los JSON sin fecha.
 
     Crea un fichero de texto en la carpeta base:
         informe_sin_json_YYYYMMDD_HHMMSS.txt
     """
 
-    MEDIA_EXTS = {
-        ".jpg",
-        ".jpeg",
-        ".png",
-        ".webp",
-        ".gif",
-        ".heic",
-        ".mp4",
-        ".mov",
-        ".m4v",
-        ".avi",
-        ".mts",
-        ".mkv",
-    }
-
     def tarea():
         inicio = time.time()
+        if not _limpiar(salida, contador_var, tiempo_var):
+            return
 
         try:
-            try:
-                salida.delete(1.0, tk.END)
-            except tk.TclError:
-                return
-
-            contador_var.set("0/0")
-            tiempo_var.set("00:00")
-
-            if not os.path.isdir(ruta_base):
-                messagebox.showerror("Error", "Ruta no válida o inexistente.")
-                return
-
-            salida.insert(
-                tk.END, "Generando informe de archivos sin JSON...\n\n"
+            datos = _mostrar_eventos(
+                nucleo.informe_sin_json(ruta_base, comprobar_fechas=comprobar_fechas),
+                salida, progreso, contador_var, tiempo_var, inicio,
             )
-            salida.see(tk.END)
-
-            media_files = []
-            sin_json = []
-
-            # Escaneo recursivo
-            for dirpath, _, files in os.walk(ruta_base):
-                for f in files:
-                    full = os.path.join(dirpath, f)
-                    lower = f.lower()
-                    if lower.endswith(".json"):
-                        continue
-                    _, ext = os.path.splitext(lower)
-                    if ext in MEDIA_EXTS:
-                        media_files.append(full)
-
-            total = len(media_files)
-            if total == 0:
-                salida.insert(
-                    tk.END,
-                    "No se han encontrado archivos de imagen/vídeo.\n",
-                )
-                salida.see(tk.END)
-                return
-
-            try:
-                progreso["maximum"] = total
-                progreso["value"] = 0
-            except tk.TclError:
-                pass
-
-            for i, media in enumerate(media_files, start=1):
-                json_esperado = media + ".json"
-                if not os.path.exists(json_esperado):
-                    sin_json.append(media)
-                    try:
-                        salida.insert(tk.END, f"Sin JSON: {media}\n")
-                        salida.see(tk.END)
-                    except tk.TclError:
-                        return
-
-                try:
-                    progreso["value"] = i
-                    contador_var.set(f"{i}/{total}")
-                    tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                    salida.update()
-                except tk.TclError:
-                    return
-
-            # Resumen e informe a fichero
-            salida.insert(tk.END, "\n=== RESUMEN ===\n")
-            salida.insert(
-                tk.END,
-                (
-                    f"Archivos de imagen/vídeo: {total}\n"
-                    f"Archivos sin JSON: {len(sin_json)}\n\n"
-                ),
+        except OSError as e:
+            messagebox.showerror(
+                "Error al guardar informe",
+                f"No se pudo guardar el informe:\n{e}",
             )
-            salida.see(tk.END)
+            return
+        if datos is None:
+            return
+        if datos["total"] == 0:
+            _escribir(salida, "No se han encontrado archivos de imagen/vídeo.\n")
+            return
 
-            if sin_json:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                nombre_informe = f"informe_sin_json_{timestamp}.txt"
-                ruta_informe = os.path.join(ruta_base, nombre_informe)
-                try:
-                    with open(ruta_informe, "w", encoding="utf-8") as f:
-                        f.write(
-                            "INFORME DE ARCHIVOS SIN JSON\n"
-                            f"Carpeta base: {ruta_base}\n"
-                            f"Total archivos de imagen/vídeo: {total}\n"
-                            f"Archivos sin JSON: {len(sin_json)}\n\n"
-                        )
-                        for media in sin_json:
-                            f.write(media + "\n")
-
-                    salida.insert(
-                        tk.END, f"Informe guardado en:\n{ruta_informe}\n"
-                    )
-                    salida.see(tk.END)
-
-                    messagebox.showinfo(
-                        "Informe generado",
-                        f"Se ha creado el informe:\n{ruta_informe}",
-                    )
-                except Exception as e:
-                    messagebox.showerror(
-                        "Error al guardar informe",
-                        f"No se pudo guardar el informe:\n{e}",
-                    )
-            else:
-                messagebox.showinfo(
-                    "Informe generado",
-                    "Todos los archivos de imagen/vídeo tienen JSON.",
-                )
+        resumen = (
+            "\n=== RESUMEN ===\n"
+            f"Archivos de imagen/vídeo: {datos['total']}\n"
+            f"Archivos sin JSON: {datos['sin_json']}\n"
+        )
+        if datos["json_sin_fecha"] is not None:
+            resumen += f"JSON sin fecha (photoTakenTime): {datos['json_sin_fecha']}\n"
+        _escribir(salida, resumen + "\n")
 
-        finally:
-            if botones:
-                desbloquear_botones(botones)
+        ruta_informe = datos["informe"]
+        if ruta_informe:
+            _escribir(salida, f"Informe guardado en:\n{ruta_informe}\n")
+            messagebox.showinfo(
+                "Informe generado",
+                f"Se ha creado el informe:\n{ruta_informe}",
+            )
+        else:
+            messagebox.showinfo(
+                "Informe generado",
+                "Todos los archivos de imagen/vídeo tienen JSON.",
+            )
 
-    if botones:
-        bloquear_botones(botones)
-    threading.Thread(target=tarea, daemon=True).start()
+    _en_hilo(tarea, botones)
 
 # ==========================================================
 # MANEJO DE LA PESTAÑA CUARENTENA
@@ -1185,85 +589,58 @@ def listar_cuarentena(
     """
     def tarea():
         inicio = time.time()
+        if not _limpiar(salida, contador_var, tiempo_var):
+            return
 
-        try:
-            try:
-                salida.delete(1.0, tk.END)
-            except tk.TclError:
-                return
-
-            contador_var.set("0/0")
-            tiempo_var.set("00:00")
-
-            if not os.path.isdir(ruta_base):
-                messagebox.showerror("Error", "Ruta base no válida o inexistente.")
-                return
-
-            ruta_base_abs = os.path.abspath(ruta_base)
-            carpeta_cuar = os.path.join(ruta_base_abs, NOMBRE_CARPETA_CUARENTENA)
-
-            if not os.path.isdir(carpeta_cuar):
-                salida.insert(
-                    tk.END,
-                    "No se ha encontrado la carpeta de cuarentena para esta ruta.\n"
-                )
-                salida.see(tk.END)
-                messagebox.showinfo(
-                    "Cuarentena vacía",
-                    "No se ha encontrado ninguna carpeta de cuarentena en esta ruta."
-                )
-                return
+        # MUY IMPORTANTE: el núcleo da cada ruta sola en su línea, sin texto
+        # delante, para poder seleccionarla y usarla como ruta exacta.
+        datos = _mostrar_eventos(
+            nucleo.listar_cuarentena(ruta_base),
+            salida, progreso, contador_var, tiempo_var, inicio,
+        )
+        if datos is None:
+            return
 
-            salida.insert(
-                tk.END,
-                f"Listando archivos en cuarentena:\n{carpeta_cuar}\n\n"
+        if datos["carpeta"] is None:
+            messagebox.showinfo(
+                "Cuarentena vacía",
+                "No se ha encontrado ninguna carpeta de cuarentena en esta ruta."
+            )
+        elif datos["total"] == 0:
+            _escribir(salida, "La cuarentena está vacía.\n")
+            messagebox.showinfo(
+                "Cuarentena vacía",
+                "No hay archivos en cuarentena para esta ruta."
+            )
+        else:
+            _escribir(
+                salida,
+                f"\n=== RESUMEN ===\nArchivos en cuarentena: {datos['total']}\n",
             )
-            salida.see(tk.END)
-
-            archivos = []
-            for dirpath, _, files in os.walk(carpeta_cuar):
-                for f in files:
-                    archivos.append(os.path.join(dirpath, f))
-
-            total = len(archivos)
-            if total == 0:
-                salida.insert(tk.END, "La cuarentena está vacía.\n")
-                salida.see(tk.END)
-                messagebox.showinfo(
-                    "Cuarentena vacía",
-                    "No hay archivos en cuarentena para esta ruta."
-                )
-                return
-
-            try:
-                progreso["maximum"] = total
-                progreso["value"] = 0
-            except tk.TclError:
-                pass
-
-            for i, ruta_arch in enumerate(archivos, start=1):
-                try:
-                    # MUY IMPORTANTE: mostramos solo la ruta, sin texto delante,
-                    # para poder seleccionarla y usarla como ruta exacta.
-                    salida.insert(tk.END, ruta_arch + "\n")
-                    salida.see(tk.END)
 
-                    progreso["value"] = i
-                    contador_var.set(f"{i}/{total}")
-                    tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                    salida.update()
-                except tk.TclError:
-                    return
+    _en_hilo(tarea, botones)
 
-            salida.insert(tk.END, "\n=== RESUMEN ===\n")
-            salida.insert(tk.END, f"Archivos en cuarentena: {total}\n")
-            salida.see(tk.END)
 
-        finally:
-            desbloquear_botones(botones)
+def _archivos_de_cuarentena(ruta_base, salida, rutas_seleccionadas, que_hacer):
+    """
+    Archivos de la cuarentena con los que trabajar, o None (ya avisado) si
+    no hay carpeta de cuarentena o no queda ninguno.
+    """
+    archivos = nucleo.archivos_en_cuarentena(ruta_base, rutas_seleccionadas)
+    if archivos is None:
+        _escribir(
+            salida, "No se ha encontrado la carpeta de cuarentena para esta ruta.\n"
+        )
+        messagebox.showinfo(
+            "Cuarentena vacía",
+            "No hay carpeta de cuarentena en esta ruta."
+        )
+        return None
+    if not archivos:
+        _escribir(salida, f"No hay archivos que {que_hacer} en la cuarentena.\n")
+        return None
+    return archivos
 
-    bloquear_botones(botones)
-    threading.Thread(target=tarea, daemon=True).start()
 
 def restaurar_cuarentena(
     ruta_base,
@@ -1283,156 +660,42 @@ def restaurar_cuarentena(
     """
     def tarea():
         inicio = time.time()
-        restaurados = 0
-        errores = 0
-
-        try:
-            try:
-                salida.delete(1.0, tk.END)
-            except tk.TclError:
-                return
-
-            contador_var.set("0/0")
-            tiempo_var.set("00:00")
-
-            if not os.path.isdir(ruta_base):
-                messagebox.showerror("Error", "Ruta base no válida o inexistente.")
-                return
-
-            ruta_base_abs = os.path.abspath(ruta_base)
-            carpeta_cuar = os.path.join(ruta_base_abs, NOMBRE_CARPETA_CUARENTENA)
-
-            if not os.path.isdir(carpeta_cuar):
-                salida.insert(
-                    tk.END,
-                    "No se ha encontrado la carpeta de cuarentena para esta ruta.\n"
-                )
-                salida.see(tk.END)
-                messagebox.showinfo(
-                    "Cuarentena vacía",
-                    "No hay carpeta de cuarentena en esta ruta."
-                )
-                return
-
-            # Construimos la lista de archivos a restaurar
-            if rutas_seleccionadas:
-                archivos = [r for r in rutas_seleccionadas if os.path.exists(r)]
-            else:
-                archivos = []
-                for dirpath, _, files in os.walk(carpeta_cuar):
-                    for f in files:
-                        archivos.append(os.path.join(dirpath, f))
-
-            total = len(archivos)
-            if total == 0:
-                salida.insert(
-                    tk.END,
-                    "No hay archivos que restaurar desde la cuarentena.\n"
-                )
-                salida.see(tk.END)
-                return
-
-            confirmar = messagebox.askyesno(
-                "Confirmar restauración",
-                f"¿Restaurar {total} archivo(s) desde la cuarentena?"
-            )
-            if not confirmar:
-                return
+        if not _limpiar(salida, contador_var, tiempo_var):
+            return
 
-            try:
-                progreso["maximum"] = total
-                progreso["value"] = 0
-            except tk.TclError:
-                pass
+        archivos = _archivos_de_cuarentena(
+            ruta_base, salida, rutas_seleccionadas, "restaurar"
+        )
+        if archivos is None:
+            return
 
-            # Leemos registro para intentar recuperar la ruta original
-            registro = leer_json()
-            if registro is None:
-                registro = []
-
-            for i, ruta_cuar in enumerate(archivos, start=1):
-                try:
-                    # Buscar en el registro la última operación de cuarentena
-                    ruta_original = None
-                    hash_reg = None
-
-                    for op in reversed(registro):
-                        if (
-                            op.get("accion") == "cuarentena"
-                            and op.get("archivo_cuarentena") == ruta_cuar
-                        ):
-                            ruta_original = op.get("archivo_original")
-                            hash_reg = op.get("hash")
-                            break
-
-                    if ruta_original is None:
-                        # Si no hay información en el registro, reconstruimos
-                        # la ruta original a partir de la relativa.
-                        rel = os.path.relpath(ruta_cuar, carpeta_cuar)
-                        ruta_original = os.path.join(ruta_base_abs, rel)
-
-                    hash_actual = calcular_hash(ruta_cuar)
-
-                    # Si tenemos hash en el registro, podemos verificar
-                    if hash_reg and hash_reg != hash_actual:
-                        salida.insert(
-                            tk.END,
-                            f"⚠️ Hash distinto al registrado, restaurando igualmente: {ruta_cuar}\n"
-                        )
-                        salida.see(tk.END)
-
-                    # Creamos carpeta destino si no existe
-                    os.makedirs(os.path.dirname(ruta_original), exist_ok=True)
-
-                    shutil.move(ruta_cuar, ruta_original)
-
-                    salida.insert(
-                        tk.END,
-                        f"🔁 Restaurado: {ruta_cuar} → {ruta_original}\n"
-                    )
-                    salida.see(tk.END)
-                    restaurados += 1
-
-                    # Registramos la restauración
-                    registrar_operacion([{
-                        "accion": "restaurado",
-                        "archivo_original": ruta_original,
-                        "archivo_cuarentena": ruta_cuar,
-                        "hash": hash_actual,
-                    }])
-
-                except Exception as e:
-                    salida.insert(
-                        tk.END,
-                        f"❌ ERROR restaurando {ruta_cuar}: {e}\n"
-                    )
-                    salida.see(tk.END)
-                    errores += 1
-
-                try:
-                    progreso["value"] = i
-                    contador_var.set(f"{i}/{total}")
-                    tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                    salida.update()
-                except tk.TclError:
-                    return
-
-            salida.insert(tk.END, "\n=== RESUMEN RESTAURACIÓN ===\n")
-            salida.insert(tk.END, f"Total a restaurar: {total}\n")
-            salida.insert(tk.END, f"Restaurados: {restaurados}\n")
-            salida.insert(tk.END, f"Errores: {errores}\n")
-            salida.see(tk.END)
+        confirmar = messagebox.askyesno(
+            "Confirmar restauración",
+            f"¿Restaurar {len(archivos)} archivo(s) desde la cuarentena?"
+        )
+        if not confirmar:
+            return
 
-            messagebox.showinfo(
-                "Restauración completada",
-                f"Se han restaurado {restaurados} archivo(s)."
-            )
+        datos = _mostrar_eventos(
+            nucleo.restaurar_cuarentena(ruta_base, archivos),
+            salida, progreso, contador_var, tiempo_var, inicio,
+        )
+        if datos is None:
+            return
 
-        finally:
-            desbloquear_botones(botones)
+        _escribir(
+            salida,
+            "\n=== RESUMEN RESTAURACIÓN ===\n"
+            f"Total a restaurar: {datos['total']}\n"
+            f"Restaurados: {datos['restaurados']}\n"
+            f"Errores: {datos['errores']}\n",
+        )
+        messagebox.showinfo(
+            "Restauración completada",
+            f"Se han restaurado {datos['restaurados']} archivo(s)."
+        )
 
-    bloquear_botones(botones)
-    threading.Thread(target=tarea, daemon=True).start()
+    _en_hilo(tarea, botones)
 
 def purgar_cuarentena(
     ruta_base,
@@ -1452,119 +715,64 @@ def purgar_cuarentena(
     """
     def tarea():
         inicio = time.time()
-        purgados = 0
-        errores = 0
-
-        try:
-            try:
-                salida.delete(1.0, tk.END)
-            except tk.TclError:
-                return
-
-            contador_var.set("0/0")
-            tiempo_var.set("00:00")
+        if not _limpiar(salida, contador_var, tiempo_var):
+            return
 
-            if not os.path.isdir(ruta_base):
-                messagebox.showerror("Error", "Ruta base no válida o inexistente.")
-                return
+        archivos = _archivos_de_cuarentena(
+            ruta_base, salida, rutas_seleccionadas, "purgar"
+        )
+        if archivos is None:
+            return
 
-            ruta_base_abs = os.path.abspath(ruta_base)
-            carpeta_cuar = os.path.join(ruta_base_abs, NOMBRE_CARPETA_CUARENTENA)
+        confirmar = messagebox.askyesno(
+            "Confirmar purga definitiva",
+            f"Se van a ELIMINAR DEFINITIVAMENTE {len(archivos)} archivo(s) "
+            f"de la cuarentena.\nEsta acción no se puede deshacer.\n\n"
+            f"¿Continuar?"
+        )
+        if not confirmar:
+            return
 
-            if not os.path.isdir(carpeta_cuar):
-                salida.insert(
-                    tk.END,
-                    "No se ha encontrado la carpeta de cuarentena para esta ruta.\n"
-                )
-                salida.see(tk.END)
-                messagebox.showinfo(
-                    "Cuarentena vacía",
-                    "No hay carpeta de cuarentena en esta ruta."
-                )
-                return
+        datos = _mostrar_eventos(
+            nucleo.purgar_cuarentena(archivos),
+            salida, progreso, contador_var, tiempo_var, inicio,
+        )
+        if datos is None:
+            return
 
-            # Construimos la lista de archivos a purgar
-            if rutas_seleccionadas:
-                archivos = [r for r in rutas_seleccionadas if os.path.exists(r)]
-            else:
-                archivos = []
-                for dirpath, _, files in os.walk(carpeta_cuar):
-                    for f in files:
-                        archivos.append(os.path.join(dirpath, f))
-
-            total = len(archivos)
-            if total == 0:
-                salida.insert(
-                    tk.END,
-                    "No hay archivos que purgar en la cuarentena.\n"
-                )
-                salida.see(tk.END)
-                return
+        _escribir(
+            salida,
+            "\n=== RESUMEN PURGA ===\n"
+            f"Total a purgar: {datos['total']}\n"
+            f"Purgados: {datos['purgados']}\n"
+            f"Errores: {datos['errores']}\n",
+        )
+        messagebox.showinfo(
+            "Purga completada",
+            f"Se han eliminado definitivamente {datos['purgados']} archivo(s)."
+        )
 
-            confirmar = messagebox.askyesno(
-                "Confirmar purga definitiva",
-                f"Se van a ELIMINAR DEFINITIVAMENTE {total} archivo(s) "
-                f"de la cuarentena.\nEsta acción no se puede deshacer.\n\n"
-                f"¿Continuar?"
-            )
-            if not confirmar:
-                return
+    _en_hilo(tarea, botones)
 
-            try:
-                progreso["maximum"] = total
-                progreso["value"] = 0
-            except tk.TclError:
-                pass
 
-            for i, ruta_cuar in enumerate(archivos, start=1):
-                try:
-                    hash_archivo = calcular_hash(ruta_cuar)
-
-                    os.remove(ruta_cuar)
-
-                    salida.insert(
-                        tk.END,
-                        f"🔥 PURGADO definitivamente: {ruta_cuar}\n"
-                    )
-                    salida.see(tk.END)
-                    purgados += 1
-
-                    # Registramos la purga
-                    registrar_operacion([{
-                        "accion": "purgado",
-                        "archivo_cuarentena": ruta_cuar,
-                        "hash": hash_archivo,
-                    }])
-
-                except Exception as e:
-                    salida.insert(
-                        tk.END,
-                        f"❌ ERROR purgando {ruta_cuar}: {e}\n"
-                    )
-                    salida.see(tk.END)
-                    errores += 1
-
-                try:
-                    progreso["value"] = i
-                    contador_var.set(f"{i}/{total}")
-                    tiempo_var.set(formatear_tiempo(time.time() - inicio))
-                    salida.update()
-                except tk.TclError:
-                    return
-
-            salida.insert(tk.END, "\n=== RESUMEN PURGA ===\n")
-            salida.insert(tk.END, f"Total a purgar: {total}\n")
-            salida.insert(tk.END, f"Purgados: {purgados}\n")
-            salida.insert(tk.END, f"Errores: {errores}\n")
-            salida.see(tk.END)
+# ==========================================================
+# CACHÉ DE HASHES
+# ==========================================================
 
-            messagebox.showinfo(
-                "Purga completada",
-                f"Se han eliminado definitivamente {purgados} archivo(s)."
-            )
 
-        finally:
-            desbloquear_botones(botones)
+def limpiar_cache_hash(salida, botones):
+    """
+    Quita de la caché de hashes las entradas de archivos que ya no existen
+    o han cambiado (hay que mirar cada archivo, así que va en un hilo).
+    """
+    def tarea():
+        _escribir(salida, "\nLimpiando la caché de hashes...\n")
+        eliminadas = purgar_cache_hash()
+        _escribir(salida, f"Entradas eliminadas de la caché: {eliminadas}\n")
+        messagebox.showinfo(
+            "Caché de hashes",
+            f"Se han eliminado {eliminadas} entradas de archivos que ya no "
+            "existen o han cambiado.",
+        )
 
-    bloquear_botones(botones)
-    threading.Thread(target=tarea, daemon=True).start()
+    _en_hilo(tarea, botones)
@@ -0,0 +1,251 @@
+# sidecar.py
+# ==========================================================
+# Lectura rápida de los JSON laterales de Google Photos
+# ==========================================================
+
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Caché persistente de lo leído de cada JSON
+RUTA_CACHE_LATERALES = "cache_laterales.sqlite"
+
+# Hilos para leer JSON en bloque (trabajo de E/S)
+HILOS_LATERALES = min(8, os.cpu_count() or 4)
+
+# Lo que nos interesa de un JSON lateral. Cualquiera de los dos campos
+# puede ser None si el JSON no lo trae (o no es un JSON válido).
+Lateral = namedtuple("Lateral", "timestamp titulo")
+
+# Sufijo de los JSON de los Takeout recientes (IMG_1.jpg.supplemental-metadata.json)
+SUFIJO_SUPLEMENTARIO = ".supplemental-metadata"
+# Takeout recorta el nombre del JSON (sin ".json") a 46 caracteres
+LONGITUD_MAXIMA_TAKEOUT = 46
+
+# "IMG_1234(1)": nombre de un duplicado
+_RE_DUPLICADO = re.compile(r"^(.*)(\(\d+\))$")
+
+# "photoTakenTime": { "timestamp": "1500000000", "formatted": ... }
+_RE_TIMESTAMP = re.compile(
+    rb'"photoTakenTime"\s*:\s*\{[^{}]*?"timestamp"\s*:\s*"?(-?\d+)"?'
+)
+# "title": "IMG_0001.jpg" (con posibles escapes \" é...)
+_RE_TITULO = re.compile(rb'"title"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _interpretar(datos):
+    """
+    Saca timestamp y título del contenido (bytes) de un JSON lateral.
+
+    Primero con expresiones regulares, sin analizar el JSON entero; si la
+    fecha no aparece así, se recurre a json.loads.
+    """
+    m_ts = _RE_TIMESTAMP.search(datos)
+    m_titulo = _RE_TITULO.search(datos)
+    if m_ts and m_titulo:
+        try:
+            titulo = json.loads(b'"' + m_titulo.group(1) + b'"')
+            return Lateral(int(m_ts.group(1)), titulo)
+        except ValueError:
+            pass
+
+    try:
+        contenido = json.loads(datos)
+    except ValueError:
+        return Lateral(None, None)
+    if not isinstance(contenido, dict):
+        return Lateral(None, None)
+
+    titulo = contenido.get("title")
+    if not isinstance(titulo, str):
+        titulo = None
+    try:
+        timestamp = int(contenido["photoTakenTime"]["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        timestamp = None
+    return Lateral(timestamp, titulo)
+
+
+class CacheLaterales:
+    """
+    Guarda lo leído de cada JSON junto a su tamaño y fecha de modificación
+    (ns); mientras no cambien, no hace falta volver a abrir el archivo.
+    """
+
+    def __init__(self, ruta, lote=500):
+        self.ruta = ruta
+        self.lote = lote
+        self._conexion = None
+        self._cambios = 0
+        self._lock = threading.Lock()
+
+    def _abrir(self):
+        if self._conexion is None:
+            con = sqlite3.connect(self.ruta, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS laterales (
+                    ruta TEXT PRIMARY KEY,
+                    tamano INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    timestamp INTEGER,
+                    titulo TEXT
+                )
+                """
+            )
+            self._conexion = con
+        return self._conexion
+
+    def obtener(self, ruta, st):
+        with self._lock:
+            fila = self._abrir().execute(
+                "SELECT tamano, mtime_ns, timestamp, titulo FROM laterales "
+                "WHERE ruta = ?",
+                (ruta,),
+            ).fetchone()
+        if fila and fila[:2] == (st.st_size, st.st_mtime_ns):
+            return Lateral(fila[2], fila[3])
+        return None
+
+    def guardar(self, ruta, st, lateral):
+        with self._lock:
+            self._abrir().execute(
+                "INSERT OR REPLACE INTO laterales VALUES (?, ?, ?, ?, ?)",
+                (ruta, st.st_size, st.st_mtime_ns, lateral.timestamp, lateral.titulo),
+            )
+            self._cambios += 1
+            if self._cambios >= self.lote:
+                self._conexion.commit()
+                self._cambios = 0
+
+    def cerrar(self):
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.commit()
+                self._conexion.close()
+                self._conexion = None
+                self._cambios = 0
+
+
+_cache = CacheLaterales(RUTA_CACHE_LATERALES)
+atexit.register(_cache.cerrar)
+
+
+def leer_lateral(ruta_json, usar_cache=True):
+    """
+    Devuelve el Lateral (timestamp, título) de un JSON de Google Photos, o
+    None si el archivo no existe o no se puede leer.
+    """
+    try:
+        st = os.stat(ruta_json)
+        if usar_cache:
+            try:
+                guardado = _cache.obtener(ruta_json, st)
+            except sqlite3.Error:
+                guardado = None
+            if guardado is not None:
+                return guardado
+
+        with open(ruta_json, "rb") as f:
+            lateral = _interpretar(f.read())
+    except OSError:
+        return None
+
+    if usar_cache:
+        try:
+            _cache.guardar(ruta_json, st, lateral)
+        except sqlite3.Error:
+            pass
+    return lateral
+
+
+def leer_timestamp(ruta_json):
+    """photoTakenTime.timestamp (epoch, int) del JSON, o None."""
+    lateral = leer_lateral(ruta_json)
+    return lateral.timestamp if lateral else None
+
+
+def leer_laterales(rutas, hilos=None):
+    """
+    Lee muchos JSON a la vez con un grupo de hilos.
+
+    Es un generador: devuelve (ruta, lateral) en el mismo orden que
+    'rutas' (lateral es None si el archivo no se pudo leer).
+    """
+    rutas = list(rutas)
+    with ThreadPoolExecutor(max_workers=hilos or HILOS_LATERALES) as pool:
+        yield from zip(rutas, pool.map(leer_lateral, rutas, chunksize=64))
+
+
+# ---------- EMPAREJAR ARCHIVOS CON SU JSON ----------
+
+def nombres_lateral_posibles(nombre):
+    """
+    Nombres que puede tener en un Takeout el JSON del archivo 'nombre',
+    por orden de preferencia:
+
+      - IMG_1.jpg.json
+      - IMG_1.jpg.supplemental-metadata.json y sus versiones recortadas
+        (.supplemental-metad.json, .supp.json...), también a 46 caracteres
+      - el nombre recortado a 46 caracteres + .json
+      - para duplicados IMG_1(1).jpg, el número va tras la extensión:
+        IMG_1.jpg(1).json, IMG_1.jpg.supplemental-metadata(1).json...
+    """
+    base, ext = os.path.splitext(nombre)
+    m = _RE_DUPLICADO.match(base)
+    if m:
+        original, marca = m.group(1) + ext, m.group(2)
+    else:
+        original, marca = nombre, ""
+
+    posibles = [nombre + ".json"]
+    for largo in range(len(SUFIJO_SUPLEMENTARIO), 1, -1):
+        raiz = original + SUFIJO_SUPLEMENTARIO[:largo]
+        posibles.append(raiz[:LONGITUD_MAXIMA_TAKEOUT] + marca + ".json")
+    posibles.append(original[:LONGITUD_MAXIMA_TAKEOUT] + marca + ".json")
+    # Sin repetir y respetando el orden
+    return list(dict.fromkeys(posibles))
+
+
+def emparejar_laterales(nombres, nombres_json=None):
+    """
+    Empareja los archivos de UNA carpeta con sus JSON laterales usando
+    solo el listado de la carpeta (sin tocar el disco).
+
+    - nombres: todos los nombres de archivo de la carpeta
+    - nombres_json: los que son JSON (si no se indican, los que acaban
+      en .json)
+
+    Devuelve {nombre_archivo: nombre_json} para los archivos (no JSON)
+    que tienen JSON.
+    """
+    if nombres_json is None:
+        nombres_json = [n for n in nombres if n.lower().endswith(".json")]
+    # Como en el disco: en Windows no cuentan las mayúsculas ('IMG.JPG'
+    # casa con 'img.jpg.json'). Clave normcase -> nombre real del JSON.
+    disponibles = {os.path.normcase(n): n for n in nombres_json}
+    if not disponibles:
+        return {}
+
+    pares = {}
+    for nombre in nombres:
+        clave = os.path.normcase(nombre)
+        if clave in disponibles:
+            continue
+        # Caso normal: una sola consulta
+        encontrado = disponibles.get(clave + ".json")
+        if encontrado is None:
+            for posible in nombres_lateral_posibles(nombre):
+                encontrado = disponibles.get(os.path.normcase(posible))
+                if encontrado is not None:
+                    break
+        if encontrado is not None:
+            pares[nombre] = encontrado
+    return pares
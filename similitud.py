@@ -0,0 +1,326 @@
+# similitud.py
+# ==========================================================
+# Búsqueda de JSON con nombre parecido (índice por carpeta)
+# ==========================================================
+
+import os
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa el cálculo en Python
+    np = None
+
+# Similitud mínima para considerar "similar" un JSON
+UMBRAL_SIMILITUD = 0.70
+
+# A partir de esta longitud SequenceMatcher activa 'autojunk' y dos
+# nombres iguales podrían no dar 1.0: ahí no usamos el atajo exacto.
+_LONGITUD_AUTOJUNK = 200
+
+# Con menos JSON que estos en la carpeta no compensa montar la matriz
+_MIN_CANDIDATOS_NUMPY = 256
+
+_RE_NUMERO_PARENTESIS = re.compile(r"\(\d+\)")
+
+
+def normalizar_nombre_archivo(ruta):
+    """
+    Convierte un nombre de archivo en una versión simplificada para
+    comparar similitudes. Elimina palabras típicas de Google Photos
+    como 'ha editado', 'effects', espacios, guiones, paréntesis, etc.
+    """
+    nombre = os.path.basename(ruta).lower()
+    # Quitamos la extensión
+    nombre, _ = os.path.splitext(nombre)
+
+    # Palabras / patrones que estorban para comparar
+    reemplazos = [
+        "ha editado",  # Google Photos en español
+        "ha_editado",
+        "edited",  # por si acaso en inglés
+        "effects",
+    ]
+    for r in reemplazos:
+        nombre = nombre.replace(r, "")
+
+    # Quitamos paréntesis con números: (1), (2), etc.
+    nombre = _RE_NUMERO_PARENTESIS.sub("", nombre)
+
+    # Quitamos espacios, guiones y subrayados
+    nombre = nombre.replace(" ", "").replace("-", "").replace("_", "")
+
+    return nombre
+
+
+class _Candidato:
+    """Un JSON de la carpeta con su nombre normalizado ya calculado."""
+
+    __slots__ = ("ruta", "orden", "nombre", "histograma", "_comparador")
+
+    def __init__(self, ruta, orden, nombre):
+        self.ruta = ruta
+        self.orden = orden
+        self.nombre = nombre
+        self.histograma = Counter(nombre)
+        self._comparador = None
+
+    def ratio(self, nombre_media):
+        """
+        Igual que SequenceMatcher(None, nombre_media, self.nombre).ratio(),
+        pero el análisis de self.nombre (seq2) se hace una sola vez.
+        """
+        if self._comparador is None:
+            self._comparador = SequenceMatcher(None, "", self.nombre)
+        self._comparador.set_seq1(nombre_media)
+        return self._comparador.ratio()
+
+
+class LoteNombres:
+    """
+    Matriz de letras (una fila por nombre, una columna por carácter) para
+    calcular con NumPy, de una sola vez, la cota de coincidencia de un
+    nombre contra todos los candidatos:
+
+        2 · (letras en común) / (longitud de ambos)
+
+    que es lo que calcula quick_ratio() de difflib, y nunca es menor que
+    la coincidencia real.
+    """
+
+    def __init__(self, nombres):
+        alfabeto = sorted({c for nombre in nombres for c in nombre})
+        self._columna = {c: i for i, c in enumerate(alfabeto)}
+        self._matriz = np.zeros((len(nombres), len(alfabeto)), dtype=np.int32)
+        for fila, nombre in enumerate(nombres):
+            for c, n in Counter(nombre).items():
+                self._matriz[fila, self._columna[c]] = n
+        self._longitudes = np.fromiter(
+            (len(n) for n in nombres), dtype=np.int64, count=len(nombres)
+        )
+
+    def cotas(self, nombre):
+        """Array con la cota de coincidencia de 'nombre' con cada fila."""
+        columnas = []
+        cuentas = []
+        for c, n in Counter(nombre).items():
+            i = self._columna.get(c)
+            if i is not None:  # letras que nadie tiene no suman
+                columnas.append(i)
+                cuentas.append(n)
+
+        if columnas:
+            comunes = np.minimum(
+                self._matriz[:, columnas], np.array(cuentas, dtype=np.int32)
+            ).sum(axis=1)
+        else:
+            comunes = np.zeros(len(self._longitudes), dtype=np.int64)
+        return 2.0 * comunes / (len(nombre) + self._longitudes)
+
+
+class IndiceSimilares:
+    """
+    Índice de los JSON de UNA carpeta para buscar el más parecido a un
+    archivo de imagen/vídeo.
+
+    Da exactamente el mismo resultado que comparar con SequenceMatcher
+    contra todos los JSON en orden y quedarse con el primero de mayor
+    coincidencia, pero:
+
+      - los nombres se normalizan una sola vez al crear el índice;
+      - si hay un JSON con el mismo nombre normalizado, se devuelve sin
+        comparar nada más (coincidencia 1.0);
+      - los candidatos se recorren de mayor a menor cota por longitud
+        (2·min / suma) y se descartan los que, ni por longitud ni por
+        letras en común (como quick_ratio), pueden superar el umbral o la
+        mejor coincidencia encontrada hasta el momento.
+
+    En carpetas grandes, si NumPy está instalado, las cotas por letras de
+    todos los candidatos se calculan a la vez con un LoteNombres y se
+    comparan en orden de mayor a menor cota.
+    """
+
+    def __init__(self, rutas_json, umbral=UMBRAL_SIMILITUD):
+        self.umbral = umbral
+        self._exactos = {}
+        self._por_longitud = {}
+        self._candidatos = []
+        self._lote = None
+
+        for orden, ruta in enumerate(rutas_json):
+            base = ruta[:-5] if ruta.lower().endswith(".json") else ruta
+            nombre = normalizar_nombre_archivo(base)
+            if not nombre:
+                continue
+            cand = _Candidato(ruta, orden, nombre)
+            self._exactos.setdefault(nombre, ruta)
+            self._por_longitud.setdefault(len(nombre), []).append(cand)
+            self._candidatos.append(cand)
+
+        if np is not None and len(self._candidatos) >= _MIN_CANDIDATOS_NUMPY:
+            self._lote = LoteNombres([c.nombre for c in self._candidatos])
+
+    def __len__(self):
+        return len(self._candidatos)
+
+    def _longitudes_por_cota(self, la):
+        """Longitudes de candidatos con su cota de ratio, de mayor a menor."""
+        cotas = [
+            (2.0 * min(la, lb) / (la + lb), lb) for lb in self._por_longitud
+        ]
+        cotas.sort(key=lambda c: -c[0])
+        return cotas
+
+    def buscar(self, ruta_media):
+        """
+        Devuelve (ruta_json, coincidencia) del JSON más parecido, o
+        (None, 0.0) si ninguno llega al umbral.
+        """
+        nombre = normalizar_nombre_archivo(ruta_media)
+        if not nombre:
+            return None, 0.0
+
+        if len(nombre) < _LONGITUD_AUTOJUNK and nombre in self._exactos:
+            return self._exactos[nombre], 1.0
+
+        if self._lote is not None:
+            mejor, mejor_ratio = self._buscar_en_lote(nombre)
+        else:
+            mejor, mejor_ratio = self._buscar_por_longitud(nombre)
+
+        if mejor is None or mejor_ratio < self.umbral:
+            return None, 0.0
+        return mejor.ruta, mejor_ratio
+
+    def _buscar_en_lote(self, nombre):
+        cotas = self._lote.cotas(nombre)
+        # De mayor a menor cota y, a igualdad, en el orden de la carpeta
+        posiciones = np.lexsort((np.arange(len(cotas)), -cotas))
+        posiciones = posiciones[cotas[posiciones] >= self.umbral]
+
+        mejor = None
+        mejor_ratio = 0.0
+        for pos in posiciones.tolist():
+            cota = float(cotas[pos])
+            cand = self._candidatos[pos]
+            if cota < mejor_ratio:
+                break
+            # Los siguientes tienen cota menor o van después en la carpeta
+            if cota == mejor_ratio and cand.orden > mejor.orden:
+                break
+
+            ratio = cand.ratio(nombre)
+            if ratio > mejor_ratio or (
+                ratio == mejor_ratio and mejor is not None
+                and cand.orden < mejor.orden
+            ):
+                mejor = cand
+                mejor_ratio = ratio
+        return mejor, mejor_ratio
+
+    def _buscar_por_longitud(self, nombre):
+        la = len(nombre)
+        histograma = None
+        mejor = None
+        mejor_ratio = 0.0
+
+        for cota, lb in self._longitudes_por_cota(la):
+            # Las siguientes longitudes tienen una cota aún menor
+            if cota < self.umbral or cota < mejor_ratio:
+                break
+
+            for cand in self._por_longitud[lb]:
+                # Con la misma coincidencia gana el que va antes en la carpeta
+                if cota == mejor_ratio and cand.orden > mejor.orden:
+                    break
+
+                if histograma is None:
+                    histograma = Counter(nombre)
+                comunes = sum(
+                    min(n, cand.histograma[c]) for c, n in histograma.items()
+                )
+                cota_letras = 2.0 * comunes / (la + lb)
+                if cota_letras < self.umbral or cota_letras < mejor_ratio:
+                    continue
+                if cota_letras == mejor_ratio and cand.orden > mejor.orden:
+                    continue
+
+                ratio = cand.ratio(nombre)
+                if ratio > mejor_ratio or (
+                    ratio == mejor_ratio and mejor is not None
+                    and cand.orden < mejor.orden
+                ):
+                    mejor = cand
+                    mejor_ratio = ratio
+        return mejor, mejor_ratio
+
+
+# ---------- COMPARATIVA CON DIFFLIB ----------
+
+def comparar_con_difflib(num_json=100_000, num_media=200, num_referencia=5, semilla=1):
+    """
+    Crea una carpeta sintética (solo nombres) con 'num_json' JSON y mide
+    cuánto tarda IndiceSimilares en buscar 'num_media' archivos, frente a
+    comparar con SequenceMatcher contra todos (como se hacía antes; este
+    se mide solo con 'num_referencia' archivos y se extrapola).
+    Comprueba además que ambos dan el mismo resultado.
+    """
+    import random
+    import time
+
+    azar = random.Random(semilla)
+
+    def nombre_aleatorio():
+        fecha = f"20{azar.randint(10, 24)}{azar.randint(1, 12):02d}{azar.randint(1, 28):02d}"
+        prefijo = azar.choice(["IMG_", "VID_", "PXL_", "Screenshot_", ""])
+        sufijo = azar.choice(["", "-ha editado", "(1)", "_edited", "-effects"])
+        return f"{prefijo}{fecha}_{azar.randint(0, 999999):06d}{sufijo}.jpg"
+
+    rutas_json = [f"/album/{nombre_aleatorio()}.json" for _ in range(num_json)]
+    medias = [f"/album/{nombre_aleatorio()}" for _ in range(num_media)]
+    # Algunos con un JSON de verdad parecido (misma foto editada)
+    for i in range(0, num_media, 4):
+        medias[i] = azar.choice(rutas_json)[:-5].replace(".jpg", "(1).jpg")
+
+    def referencia(media):
+        mejor_json, mejor_ratio = None, 0.0
+        norm_media = normalizar_nombre_archivo(media)
+        for jpath in rutas_json:
+            norm_json = normalizar_nombre_archivo(jpath[:-5])
+            if not norm_media or not norm_json:
+                continue
+            ratio = SequenceMatcher(None, norm_media, norm_json).ratio()
+            if ratio > mejor_ratio:
+                mejor_ratio, mejor_json = ratio, jpath
+        if mejor_json and mejor_ratio >= UMBRAL_SIMILITUD:
+            return mejor_json, mejor_ratio
+        return None, 0.0
+
+    inicio = time.perf_counter()
+    indice = IndiceSimilares(rutas_json)
+    t_indice = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resultados = [indice.buscar(m) for m in medias]
+    t_busqueda = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    esperados = [referencia(m) for m in medias[:num_referencia]]
+    t_referencia = (time.perf_counter() - inicio) / num_referencia * num_media
+
+    return {
+        "numpy": np is not None,
+        "crear_indice_s": t_indice,
+        "buscar_s": t_busqueda,
+        "difflib_s_estimado": t_referencia,
+        "iguales": esperados == resultados[:num_referencia],
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for clave, valor in comparar_con_difflib(n).items():
+        print(f"{clave:20s} {valor}")
@@ -0,0 +1,29 @@
+# conftest.py
+# ==========================================================
+# Configuración común de los tests (python -m pytest)
+# ==========================================================
+
+import os
+import sys
+
+import pytest
+
+# Los módulos están en la raíz del repositorio, sin paquete
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def carpeta_de_trabajo(tmp_path_factory):
+    """
+    El diario, las cachés y el índice de escaneo se crean en la carpeta
+    actual: durante los tests, una temporal y no la del repositorio.
+    """
+    anterior = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("trabajo"))
+    yield
+    from utils import vaciar_registro
+
+    vaciar_registro()
+    os.chdir(anterior)
@@ -0,0 +1,200 @@
+# test_fechas_internas.py
+# ==========================================================
+# Lectura y escritura en el sitio de las fechas EXIF / QuickTime
+# ==========================================================
+
+import os
+import struct
+import time
+
+import pytest
+
+from fechas_internas import (
+    EPOCH_QUICKTIME,
+    _caja,
+    _texto_exif,
+    _tiempos_quicktime,
+    escribir_fecha_interna,
+    leer_fecha_interna,
+    muestra_heic,
+    muestra_jpeg,
+    muestra_mp4,
+    muestras_referencia,
+)
+
+ANTIGUA = 1_500_000_000
+NUEVA = 1_705_326_322  # 2024-01-15 13:45:22 UTC
+
+
+def _crear(carpeta, nombre, contenido):
+    ruta = os.path.join(carpeta, nombre)
+    with open(ruta, "wb") as f:
+        f.write(contenido)
+    return ruta
+
+
+def _leer(ruta):
+    with open(ruta, "rb") as f:
+        return f.read()
+
+
+def _bytes_distintos(antes, despues):
+    return sum(a != b for a, b in zip(antes, despues))
+
+
+@pytest.fixture
+def zona_horaria():
+    """Cambia la zona horaria del proceso (TZ) y la restaura al terminar."""
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset solo existe en Unix")
+    anterior = os.environ.get("TZ")
+
+    def cambiar(zona):
+        os.environ["TZ"] = zona
+        time.tzset()
+
+    yield cambiar
+    if anterior is None:
+        os.environ.pop("TZ", None)
+    else:
+        os.environ["TZ"] = anterior
+    time.tzset()
+
+
+# ---------- LECTURA ----------
+
+@pytest.mark.parametrize(
+    "nombre, contenido, esperado", muestras_referencia(), ids=lambda v: v if isinstance(v, str) else ""
+)
+def test_leer_fecha_interna(tmp_path, nombre, contenido, esperado):
+    assert leer_fecha_interna(_crear(tmp_path, nombre, contenido)) == esperado
+
+
+def test_leer_exif_sin_zona_en_hora_local(tmp_path, zona_horaria):
+    zona_horaria("America/New_York")
+    ruta = _crear(tmp_path, "foto.jpg", muestra_jpeg(NUEVA))
+    assert b"2024:01:15 08:45:22" in _leer(ruta)
+    assert leer_fecha_interna(ruta) == NUEVA
+
+
+# ---------- ESCRITURA: MP4 / MOV ----------
+
+@pytest.mark.parametrize("version", [0, 1])
+@pytest.mark.parametrize(
+    "nombre, marca, moov_al_final",
+    [("video.mp4", b"isom", False), ("video.mov", b"qt  ", False), ("final.mp4", b"isom", True)],
+)
+def test_escribir_quicktime_en_todas_las_cajas(tmp_path, version, nombre, marca, moov_al_final):
+    contenido = muestra_mp4(ANTIGUA, version=version, moov_al_final=moov_al_final, marca=marca)
+    ruta = _crear(tmp_path, nombre, contenido)
+
+    assert escribir_fecha_interna(ruta, NUEVA)
+
+    despues = _leer(ruta)
+    assert len(despues) == len(contenido)
+    # creation_time y modification_time de mvhd, tkhd y mdhd
+    assert _tiempos_quicktime(ruta) == [(NUEVA + EPOCH_QUICKTIME,) * 2] * 3
+    # Fuera de esos 6 campos (4 u 8 bytes) no cambia nada
+    assert _bytes_distintos(contenido, despues) <= 6 * (8 if version else 4)
+    assert leer_fecha_interna(ruta) == NUEVA
+
+
+def test_escribir_quicktime_sin_fecha_previa(tmp_path):
+    ruta = _crear(tmp_path, "sin_fecha.mp4", muestra_mp4(0))
+    assert escribir_fecha_interna(ruta, NUEVA)
+    assert leer_fecha_interna(ruta) == NUEVA
+
+
+# ---------- ESCRITURA: JPEG ----------
+
+@pytest.mark.parametrize("orden", ["<", ">"])
+def test_escribir_jpeg_sin_zona_en_hora_local(tmp_path, orden, zona_horaria):
+    zona_horaria("Europe/Madrid")
+    contenido = muestra_jpeg(ANTIGUA, orden)
+    ruta = _crear(tmp_path, "foto.jpg", contenido)
+
+    assert escribir_fecha_interna(ruta, NUEVA)
+
+    despues = _leer(ruta)
+    assert len(despues) == len(contenido)
+    assert b"2024:01:15 14:45:22\x00" in despues
+    assert _bytes_distintos(contenido, despues) <= 20
+    assert leer_fecha_interna(ruta) == NUEVA
+
+
+def test_escribir_jpeg_con_zona_la_conserva(tmp_path, zona_horaria):
+    zona_horaria("America/New_York")
+    ruta = _crear(tmp_path, "foto.jpg", muestra_jpeg(ANTIGUA, "<", b"+02:00"))
+
+    assert escribir_fecha_interna(ruta, NUEVA)
+
+    despues = _leer(ruta)
+    # La fecha queda en la zona de la foto, no en la del equipo
+    assert b"2024:01:15 15:45:22\x00" in despues
+    assert b"+02:00\x00" in despues
+    assert leer_fecha_interna(ruta) == NUEVA
+
+
+@pytest.mark.parametrize(
+    "nombre, contenido",
+    [
+        ("foto.jpg", muestra_jpeg(NUEVA)),
+        ("zona.jpg", muestra_jpeg(NUEVA, ">", b"-05:00")),
+    ],
+)
+def test_escribir_jpeg_misma_fecha_no_reescribe(tmp_path, nombre, contenido):
+    ruta = _crear(tmp_path, nombre, contenido)
+    os.utime(ruta, (0, 0))
+
+    assert escribir_fecha_interna(ruta, NUEVA)
+
+    assert os.stat(ruta).st_mtime == 0
+    assert _leer(ruta) == contenido
+
+
+def test_texto_exif_con_zona():
+    assert _texto_exif(NUEVA, b"+02:00") == b"2024:01:15 15:45:22"
+    assert _texto_exif(NUEVA, b"-05:00") == b"2024:01:15 08:45:22"
+
+
+# ---------- ARCHIVOS QUE NO SE TOCAN ----------
+
+def _jpeg_recortados():
+    """El JPEG de muestra cortado en distintos puntos dentro del segmento EXIF."""
+    contenido = muestra_jpeg(ANTIGUA)
+    app0 = 4 + struct.unpack(">H", contenido[4:6])[0]
+    fin_app1 = app0 + 2 + struct.unpack(">H", contenido[app0 + 2:app0 + 4])[0]
+    return [(f"recortado_{n}.jpg", contenido[:n]) for n in range(2, fin_app1, 7)]
+
+
+def _mp4_recortados():
+    """El MP4 de muestra (moov delante) cortado dentro de moov."""
+    contenido = muestra_mp4(ANTIGUA)
+    inicio_moov = struct.unpack(">I", contenido[:4])[0]
+    fin_moov = inicio_moov + struct.unpack(">I", contenido[inicio_moov:inicio_moov + 4])[0]
+    return [(f"recortado_{n}.mp4", contenido[:n]) for n in range(inicio_moov + 8, fin_moov, 11)]
+
+
+CASOS_NO_SOPORTADOS = [
+    ("vacio.jpg", b""),
+    ("texto.jpg", b"no es una imagen"),
+    ("sin_exif.jpg", b"\xff\xd8\xff\xdb\x00\x04\x00\x00\xff\xda\x00\x02\xff\xd9"),
+    # Campo de fecha con un largo que no es el de una fecha EXIF
+    ("fecha_corta.jpg", muestra_jpeg(ANTIGUA).replace(b"\x02\x00\x14\x00", b"\x02\x00\x13\x00")),
+    ("vacio.mp4", b""),
+    ("sin_moov.mp4", _caja(b"ftyp", b"isom\x00\x00\x02\x00isom") + _caja(b"mdat", b"x" * 64)),
+    ("moov_comprimido.mov", _caja(b"moov", _caja(b"cmov", b"\x00" * 32))),
+    # Caja con un tamaño mayor que el archivo
+    ("caja_larga.mp4", struct.pack(">I", 1 << 20) + b"moov" + b"\x00" * 64),
+    ("foto.heic", muestra_heic(ANTIGUA)),
+] + _jpeg_recortados() + _mp4_recortados()
+
+
+@pytest.mark.parametrize(
+    "nombre, contenido", CASOS_NO_SOPORTADOS, ids=[c[0] for c in CASOS_NO_SOPORTADOS]
+)
+def test_archivos_no_soportados_quedan_intactos(tmp_path, nombre, contenido):
+    ruta = _crear(tmp_path, nombre, contenido)
+
+    assert escribir_fecha_interna(ruta, NUEVA) is False
+    assert _leer(ruta) == contenido
@@ -0,0 +1,32 @@
+# test_fechas_nombre.py
+# ==========================================================
+# Fecha a partir del nombre: corpus de referencia
+# ==========================================================
+
+import pytest
+
+from fechas_nombre import CORPUS_REFERENCIA, extractor
+
+
+@pytest.mark.parametrize("nombre, esperado", CORPUS_REFERENCIA, ids=[n for n, _ in CORPUS_REFERENCIA])
+def test_corpus_de_referencia(nombre, esperado):
+    assert extractor.extraer(nombre) == esperado
+
+
+def test_ruta_completa_usa_solo_el_nombre():
+    nombre, esperado = CORPUS_REFERENCIA[0]
+    assert extractor.extraer(f"/fotos/20190101_000000/{nombre}") == esperado
+
+
+@pytest.mark.parametrize(
+    "nombre",
+    ["foto.jpg", "IMG_1234.jpg", "19990101_120000.jpg", "20241350_120000.jpg", ""],
+)
+def test_nombres_sin_fecha_valida(nombre):
+    assert extractor.extraer(nombre) is None
+
+
+def test_extraer_varios_en_orden():
+    nombres = [n for n, _ in CORPUS_REFERENCIA] + ["foto.jpg"]
+    esperados = [e for _, e in CORPUS_REFERENCIA] + [None]
+    assert extractor.extraer_varios(nombres) == esperados
@@ -0,0 +1,214 @@
+# test_nucleo.py
+# ==========================================================
+# Motores de nucleo.py sobre carpetas de prueba (sin ExifTool)
+# ==========================================================
+
+import json
+import os
+
+import pytest
+
+import nucleo
+from fechas_internas import leer_fecha_interna, muestra_jpeg
+from sidecar import leer_timestamp
+from utils import leer_json, vaciar_registro
+
+TS = 1_705_326_322  # 2024-01-15 13:45:22 UTC
+
+
+def ejecutar(generador):
+    """Recorre los eventos de un motor. Devuelve (datos del resumen, líneas)."""
+    datos, lineas = None, []
+    for evento in generador:
+        if evento["tipo"] == "linea":
+            lineas.append(evento["texto"])
+        elif evento["tipo"] == "resumen":
+            datos = evento["datos"]
+    return datos, lineas
+
+
+def crear(ruta, contenido=b"x"):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    if isinstance(contenido, str):
+        contenido = contenido.encode("utf-8")
+    with open(ruta, "wb") as f:
+        f.write(contenido)
+    return ruta
+
+
+def json_google(ts):
+    return json.dumps({"title": "x", "photoTakenTime": {"timestamp": str(ts)}})
+
+
+def operaciones(accion):
+    vaciar_registro()
+    return [op for op in leer_json() if op.get("accion") == accion]
+
+
+def test_ruta_inexistente(tmp_path):
+    with pytest.raises(nucleo.ErrorOperacion):
+        next(nucleo.escanear(str(tmp_path / "no_existe")))
+
+
+def test_escanear_cuenta_tipos(tmp_path):
+    crear(str(tmp_path / "a" / "foto.jpg"))
+    crear(str(tmp_path / "a" / "foto.jpg.json"), json_google(TS))
+    crear(str(tmp_path / "b" / "notas.txt"))
+
+    datos, _ = ejecutar(nucleo.escanear(str(tmp_path)))
+
+    assert (datos["archivos"], datos["media"], datos["json"], datos["otros"]) == (3, 1, 1, 1)
+
+
+def test_renombrar_y_revertir(tmp_path):
+    base = str(tmp_path)
+    original = crear(os.path.join(base, "foto.jpg.supplemental-metadata.json"), json_google(TS))
+    nuevo = os.path.join(base, "foto.jpg.json")
+
+    datos, _ = ejecutar(nucleo.renombrar_archivos(base, ".supplemental-metadata.json", ".json"))
+    assert datos["renombrados"] == 1
+    assert os.path.exists(nuevo) and not os.path.exists(original)
+    assert any(op["archivo_nuevo"] == nuevo for op in operaciones("renombrado"))
+
+    datos, _ = ejecutar(
+        nucleo.renombrar_archivos(base, ".supplemental-metadata.json", ".json", revertir=True)
+    )
+    assert datos["renombrados"] == 1
+    assert os.path.exists(original) and not os.path.exists(nuevo)
+    assert operaciones("revertido")[-1]["verificacion"] == "huella"
+
+
+def test_renombrar_cerrado_a_medias_queda_registrado(tmp_path):
+    base = str(tmp_path)
+    for i in range(3):
+        crear(os.path.join(base, f"{i}.jpg.supplemental-metadata.json"), json_google(TS + i))
+
+    generador = nucleo.renombrar_archivos(base, ".supplemental-metadata.json", ".json")
+    for evento in generador:
+        if evento["tipo"] == "linea" and evento["texto"].startswith("✔"):
+            break
+    generador.close()
+
+    renombrados = [
+        op for op in operaciones("renombrado") if op["archivo_nuevo"].startswith(base)
+    ]
+    assert len(renombrados) == 1
+    assert os.path.exists(renombrados[0]["archivo_nuevo"])
+
+
+def test_cuarentena_restaurar_y_purgar(tmp_path):
+    base = str(tmp_path)
+    zip1 = crear(os.path.join(base, "a", "copia.zip"), b"zip 1")
+    zip2 = crear(os.path.join(base, "b", "otra.zip"), b"zip 2")
+
+    archivos = nucleo.buscar_por_extension(base, ".zip")
+    assert sorted(archivos) == sorted([zip1, zip2])
+
+    datos, _ = ejecutar(nucleo.eliminar_archivos(base, archivos, usar_cuarentena=True))
+    assert datos["eliminados"] == 2
+    assert not os.path.exists(zip1) and not os.path.exists(zip2)
+    # Lo que está en la cuarentena ya no aparece al buscar
+    assert nucleo.buscar_por_extension(base, ".zip") == []
+
+    en_cuarentena = nucleo.archivos_en_cuarentena(base)
+    assert len(en_cuarentena) == 2
+    a_restaurar = [r for r in en_cuarentena if r.endswith("copia.zip")]
+
+    datos, _ = ejecutar(nucleo.restaurar_cuarentena(base, a_restaurar))
+    assert datos["restaurados"] == 1
+    with open(zip1, "rb") as f:
+        assert f.read() == b"zip 1"
+    assert operaciones("restaurado")[-1]["verificacion"] == "huella"
+
+    restantes = nucleo.archivos_en_cuarentena(base)
+    datos, _ = ejecutar(nucleo.purgar_cuarentena(restantes))
+    assert datos["purgados"] == 1
+    assert nucleo.archivos_en_cuarentena(base) == []
+    assert not os.path.exists(zip2)
+
+
+def test_eliminar_definitivo(tmp_path):
+    base = str(tmp_path)
+    ruta = crear(os.path.join(base, "basura.tmp"))
+
+    datos, _ = ejecutar(nucleo.eliminar_archivos(base, [ruta], usar_cuarentena=False))
+
+    assert datos["eliminados"] == 1
+    assert not os.path.exists(ruta)
+    assert nucleo.archivos_en_cuarentena(base) is None
+
+
+def test_aplicar_fechas_nativo(tmp_path):
+    base = str(tmp_path)
+    foto = crear(os.path.join(base, "foto.jpg"))
+    crear(foto + ".json", json_google(TS))
+    video = crear(os.path.join(base, "video.mp4"))
+    crear(video + ".supplemental-metadata.json", json_google(TS + 60))
+
+    datos, _ = ejecutar(nucleo.aplicar_fechas(base, solo_fechas_archivo=True))
+    assert (datos["motor"], datos["actualizados"], datos["errores"]) == ("nativo", 2, 0)
+    assert int(os.stat(foto).st_mtime) == TS
+    assert int(os.stat(video).st_mtime) == TS + 60
+
+    # La segunda vez ya están todas aplicadas
+    datos, _ = ejecutar(nucleo.aplicar_fechas(base, solo_fechas_archivo=True))
+    assert (datos["total"], datos["sin_cambios"]) == (0, 2)
+
+
+def test_aplicar_fechas_con_fecha_interna(tmp_path):
+    base = str(tmp_path)
+    foto = crear(os.path.join(base, "foto.jpg"), muestra_jpeg(1_500_000_000))
+    crear(foto + ".json", json_google(TS))
+
+    datos, _ = ejecutar(
+        nucleo.aplicar_fechas(base, solo_fechas_archivo=True, escribir_fecha_interna=True)
+    )
+
+    assert (datos["fechas_internas"], datos["errores"]) == (1, 0)
+    assert leer_fecha_interna(foto) == TS
+    assert int(os.stat(foto).st_mtime) == TS
+
+
+def test_generar_json(tmp_path):
+    base = str(tmp_path)
+    con_nombre = crear(os.path.join(base, "IMG_20240115_134522.jpg"))
+    con_exif = crear(os.path.join(base, "foto.jpg"), muestra_jpeg(TS + 5))
+    sin_fecha = crear(os.path.join(base, "sin_fecha.png"))
+
+    datos, _ = ejecutar(nucleo.generar_json(base, simulacion=True))
+    assert (datos["creados"], datos["con_nombre_valido"], datos["con_fecha_interna"]) == (0, 1, 1)
+    assert not os.path.exists(con_nombre + ".json")
+
+    datos, _ = ejecutar(nucleo.generar_json(base, simulacion=False))
+    assert datos["creados"] == 2
+    assert leer_timestamp(con_nombre + ".json") == TS
+    assert leer_timestamp(con_exif + ".json") == TS + 5
+    assert not os.path.exists(sin_fecha + ".json")
+
+
+def test_informe_sin_json(tmp_path):
+    base = str(tmp_path)
+    crear(os.path.join(base, "con.jpg"))
+    crear(os.path.join(base, "con.jpg.json"), "{}")
+    sin = crear(os.path.join(base, "sin.jpg"))
+
+    datos, lineas = ejecutar(nucleo.informe_sin_json(base, guardar=False))
+    assert (datos["total"], datos["sin_json"], datos["json_sin_fecha"]) == (2, 1, None)
+    assert f"Sin JSON: {sin}" in lineas
+
+    datos, _ = ejecutar(nucleo.informe_sin_json(base, comprobar_fechas=True))
+    assert datos["json_sin_fecha"] == 1
+    assert os.path.exists(datos["informe"])
+
+
+def test_ordenes_exiftool_por_lotes():
+    pares = [(f"/f/{i}.jpg", f"/f/{i}.jpg.json") for i in range(100)]
+    pares += [(f"/f/{i}.mp4", f"/f/{i}.mp4.supplemental-metadata.json") for i in range(100)]
+    pares.append(("/f/x(1).jpg", "/f/x.jpg.supplemental-metadata(1).json"))
+
+    ordenes = nucleo.ordenes_fechas_exiftool(pares, num_procesos=2)
+
+    assert sum(n for _, n in ordenes) == len(pares)
+    sueltas = [argumentos for argumentos, n in ordenes if n == 1]
+    assert len(sueltas) == 1
+    assert "%d/%F.supplemental-metadata.json" in ordenes[-2][0]
@@ -4,10 +4,11 @@
 # ==========================================================
 
 import os
+import json
 import time
 import inspect
 import tkinter as tk
-from tkinter import ttk, scrolledtext, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox
 
 # Intentamos importar el módulo de operaciones
 try:
@@ -15,17 +16,25 @@ try:
 except ImportError:
     ops = None
 
-# Ruta del registro de operaciones (por si lo define utils.py)
-try:
-    from utils import RUTA_REGISTRO_OPERACIONES
-except Exception:
-    RUTA_REGISTRO_OPERACIONES = "registro_operaciones.json"
+from escaner import obtener_instantanea
+from eventos import BusEventos
+from visor_log import VisorLog
+from utils import RUTA_REGISTRO_OPERACIONES, existe_registro, leer_json
+
+
+# Parámetros que son widgets / variables Tk y que los hilos de trabajo
+# deben usar a través del bus de eventos
+PARAMETROS_WIDGET = ("salida", "progreso", "contador_var", "tiempo_var")
 
 
-def _safe_call(func_name: str, **posibles_kwargs):
+def _safe_call(func_name: str, bus=None, **posibles_kwargs):
     """
     Llama a una función de operaciones.py si existe, filtrando los kwargs
     para que solo se pasen los parámetros aceptados por su firma.
+
+    Si se pasa 'bus', los widgets se sustituyen por sus equivalentes
+    diferidos: el hilo de trabajo solo encola eventos y la interfaz los
+    aplica por lotes.
     """
     if ops is None:
         messagebox.showerror(
@@ -47,6 +56,11 @@ def _safe_call(func_name: str, **posibles_kwargs):
     sig = inspect.signature(func)
     kwargs = {k: v for k, v in posibles_kwargs.items() if k in sig.parameters}
 
+    if bus is not None:
+        for nombre in PARAMETROS_WIDGET:
+            if nombre in kwargs:
+                kwargs[nombre] = bus.sustituto(kwargs[nombre])
+
     try:
         return func(**kwargs)
     except Exception as e:
@@ -67,6 +81,9 @@ class GestorArchivosUI(tk.Frame):
         self.master.resizable(True, True)
         self.pack(fill="both", expand=True)
 
+        # Los hilos de trabajo actualizan la interfaz a través de este bus
+        self.bus = BusEventos(self)
+
         # Variables globales
         self.ruta_var = tk.StringVar()
         self.ext1_var = tk.StringVar(value=".supplemental-metadata.json")
@@ -76,6 +93,9 @@ class GestorArchivosUI(tk.Frame):
         self.tiempo_var = tk.StringVar(value="00:00")
         self.filtro_var = tk.StringVar()
         self.cuarentena_var = tk.BooleanVar(value=True)  # NUEVO: usar cuarentena por defecto
+        self.solo_fechas_archivo_var = tk.BooleanVar(value=False)  # por defecto, ExifTool como antes
+        self.fecha_interna_var = tk.BooleanVar(value=False)
+        self.informe_fechas_var = tk.BooleanVar(value=False)
 
 
         # Referencias a widgets que se crean en cada página
@@ -102,6 +122,8 @@ class GestorArchivosUI(tk.Frame):
         self.btn_cuar_purgar_sel = None      # NUEVO
         self.btn_cuar_purgar_todo = None     # NUEVO
 
+        self.btn_hist_limpiar_cache = None
+
         # Crear interfaz
         self._crear_estilo()
         self._crear_panel_lateral()
@@ -369,7 +391,7 @@ class GestorArchivosUI(tk.Frame):
         )
 
         # Área de salida
-        self.salida = scrolledtext.ScrolledText(
+        self.salida = VisorLog(
             self.contenedor,
             bg="#1E1E1E",
             fg="#FFFFFF",
@@ -417,9 +439,9 @@ class GestorArchivosUI(tk.Frame):
         except Exception:
             pass
 
-        # Primero contamos archivos para fijar el máximo
-        for _, _, ficheros in os.walk(ruta):
-            total_archivos += len(ficheros)
+        # Un solo escaneo, compartido con el renombrado posterior
+        instantanea = obtener_instantanea(ruta)
+        total_archivos = instantanea.total_archivos()
 
         if total_archivos == 0:
             self.contador_var.set("0/0")
@@ -432,15 +454,13 @@ class GestorArchivosUI(tk.Frame):
             pass
 
         procesados = 0
-        for raiz, _, ficheros in os.walk(ruta):
-            for nombre in ficheros:
+        for carpeta in instantanea.carpetas:
+            for archivo in carpeta.archivos:
                 procesados += 1
-                if patron in nombre:
+                if patron in archivo.nombre:
                     total_coincidencias += 1
                     if self.salida:
-                        self.salida.insert(
-                            tk.END, os.path.join(raiz, nombre) + "\n"
-                        )
+                        self.salida.insert(tk.END, archivo.ruta + "\n")
                         # Hacer scroll mientras escribe
                         self.salida.see(tk.END)
 
@@ -481,6 +501,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "renombrar_archivos",
+            bus=self.bus,
             ruta_base=ruta,
             ext_origen=self.ext1_var.get(),
             ext_nueva=self.ext2_var.get(),
@@ -505,6 +526,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "renombrar_archivos",
+            bus=self.bus,
             ruta_base=ruta,
             ext_origen=self.ext1_var.get(),
             ext_nueva=self.ext2_var.get(),
@@ -601,7 +623,7 @@ class GestorArchivosUI(tk.Frame):
         )
 
         # Área de salida
-        self.salida = scrolledtext.ScrolledText(
+        self.salida = VisorLog(
             self.contenedor,
             bg="#1E1E1E",
             fg="#FFFFFF",
@@ -627,6 +649,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "previsualizar_archivos",
+            bus=self.bus,
             ruta_base=ruta,
             extension=ext,
             salida=self.salida,
@@ -668,6 +691,7 @@ class GestorArchivosUI(tk.Frame):
             # Solo archivos seleccionados
             _safe_call(
                 "eliminar_archivos",
+                bus=self.bus,
                 ruta_base=ruta,
                 extension=ext,
                 salida=self.salida,
@@ -682,6 +706,7 @@ class GestorArchivosUI(tk.Frame):
             # Todos los archivos con esa extensión
             _safe_call(
                 "eliminar_archivos",
+                bus=self.bus,
                 ruta_base=ruta,
                 extension=ext,
                 salida=self.salida,
@@ -717,8 +742,14 @@ class GestorArchivosUI(tk.Frame):
             text="Actualizar",
             command=self._cargar_historial,
         ).pack(side="left", padx=5)
+        self.btn_hist_limpiar_cache = ttk.Button(
+            frame_filtro,
+            text="Limpiar caché de hashes",
+            command=self._accion_limpiar_cache_hash,
+        )
+        self.btn_hist_limpiar_cache.pack(side="right", padx=5)
 
-        self.salida = scrolledtext.ScrolledText(
+        self.salida = VisorLog(
             self.contenedor,
             bg="#1E1E1E",
             fg="#FFFFFF",
@@ -735,7 +766,7 @@ class GestorArchivosUI(tk.Frame):
 
         self.salida.delete(1.0, tk.END)
 
-        if not os.path.exists(RUTA_REGISTRO_OPERACIONES):
+        if not existe_registro():
             self.salida.insert(
                 tk.END,
                 "No se encontró el archivo de historial:\n"
@@ -744,8 +775,7 @@ class GestorArchivosUI(tk.Frame):
             return
 
         try:
-            with open(RUTA_REGISTRO_OPERACIONES, "r", encoding="utf-8") as f:
-                contenido = f.read()
+            registros = leer_json()
         except Exception as e:
             self.salida.insert(
                 tk.END,
@@ -753,13 +783,20 @@ class GestorArchivosUI(tk.Frame):
             )
             return
 
+        # Una operación por línea, igual que en el diario
         filtro = self.filtro_var.get().strip().lower()
-        if not filtro:
-            self.salida.insert(tk.END, contenido)
-        else:
-            for linea in contenido.splitlines():
-                if filtro in linea.lower():
-                    self.salida.insert(tk.END, linea + "\n")
+        for op in registros:
+            linea = json.dumps(op, ensure_ascii=False)
+            if not filtro or filtro in linea.lower():
+                self.salida.insert(tk.END, linea + "\n")
+
+    def _accion_limpiar_cache_hash(self):
+        _safe_call(
+            "limpiar_cache_hash",
+            bus=self.bus,
+            salida=self.salida,
+            botones=[self.btn_hist_limpiar_cache],
+        )
 
     # ------------------------------------------------------------------
     # PÁGINA 4: FECHAS EXIFTOOL
@@ -823,6 +860,23 @@ class GestorArchivosUI(tk.Frame):
         )
         self.btn_informe.pack(side="left", padx=5)
 
+        ttk.Checkbutton(
+            self.contenedor,
+            text="Solo fechas del archivo, sin ExifTool (más rápido)",
+            variable=self.solo_fechas_archivo_var,
+        ).pack(pady=(0, 5))
+
+        ttk.Checkbutton(
+            self.contenedor,
+            text="Escribir también la fecha dentro del archivo (JPEG / MP4 / MOV)",
+            variable=self.fecha_interna_var,
+        ).pack(pady=(0, 5))
+
+        ttk.Checkbutton(
+            self.contenedor,
+            text="Informe: listar también los JSON sin fecha (lee cada JSON, más lento)",
+            variable=self.informe_fechas_var,
+        ).pack(pady=(0, 5))
 
         self.btn_exif_aplicar = self.btn_exif
         self.btn_exif_prev = self.btn_prev
@@ -844,7 +898,7 @@ class GestorArchivosUI(tk.Frame):
             side="left", padx=5
         )
 
-        self.salida = scrolledtext.ScrolledText(
+        self.salida = VisorLog(
             self.contenedor,
             bg="#1E1E1E",
             fg="#FFFFFF",
@@ -874,12 +928,15 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "aplicar_exiftool_fechas",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
             contador_var=self.contador_var,
             tiempo_var=self.tiempo_var,
             botones=botones,
+            solo_fechas_archivo=self.solo_fechas_archivo_var.get(),
+            escribir_fecha_interna=self.fecha_interna_var.get(),
         )
 
     def _accion_previsualizar_json_similares(self):
@@ -893,6 +950,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "generar_json_desde_similares",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
@@ -925,6 +983,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "generar_json_desde_similares",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
@@ -950,11 +1009,13 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "informe_archivos_sin_json",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
             contador_var=self.contador_var,
             tiempo_var=self.tiempo_var,
+            comprobar_fechas=self.informe_fechas_var.get(),
             botones=[
                 self.btn_exif_aplicar,
                 self.btn_exif_prev,
@@ -1052,7 +1113,7 @@ class GestorArchivosUI(tk.Frame):
             side="left", padx=5
         )
 
-        self.salida = scrolledtext.ScrolledText(
+        self.salida = VisorLog(
             self.contenedor,
             bg="#1E1E1E",
             fg="#FFFFFF",
@@ -1071,6 +1132,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "listar_cuarentena",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
@@ -1112,6 +1174,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "restaurar_cuarentena",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
@@ -1135,6 +1198,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "restaurar_cuarentena",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
@@ -1177,6 +1241,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "purgar_cuarentena",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
@@ -1202,6 +1267,7 @@ class GestorArchivosUI(tk.Frame):
 
         _safe_call(
             "purgar_cuarentena",
+            bus=self.bus,
             ruta_base=ruta,
             salida=self.salida,
             progreso=self.progreso,
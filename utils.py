@@ -3,70 +3,255 @@
 # Funciones auxiliares del Gestor de Archivos Unificado
 # =====================================================
 
-import tkinter as tk
 import json
 import os
 import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from tkinter import messagebox
 
+try:
+    import tkinter as tk
+except ImportError:  # sin Tk (servidor, cron): solo falla lo de los botones
+    tk = None
+
+from cache_hash import abrir_cache
+from diario import abrir_diario
+from motor_hash import ALGORITMO_POR_DEFECTO, ALGORITMOS, hash_archivo
+
+# Registro antiguo (lista JSON completa). Solo se lee; lo nuevo va al diario.
 LOG_FILE = "registro_operaciones.json"
+# Diario append-only: una operación por línea (JSONL)
+RUTA_REGISTRO_OPERACIONES = "registro_operaciones.jsonl"
+
+# Caché persistente de hashes, junto al registro
+RUTA_CACHE_HASH = os.path.join(
+    os.path.dirname(RUTA_REGISTRO_OPERACIONES), "cache_hashes.sqlite"
+)
+
+# Hilos para calcular hashes en paralelo (hashlib libera el GIL)
+HILOS_HASH = min(8, os.cpu_count() or 4)
+
+# Bytes del principio y del final del archivo que entran en la huella rápida
+BYTES_HUELLA = 64 * 1024
+
+_diario = abrir_diario(RUTA_REGISTRO_OPERACIONES, ruta_legado=LOG_FILE)
+_cache_hash = abrir_cache(RUTA_CACHE_HASH)
+
+# Algoritmo de los hashes nuevos (los registros guardan cuál se usó)
+_algoritmo_hash = ALGORITMO_POR_DEFECTO
 
 
 # ---------- FUNCIONES DE ARCHIVOS Y HASH ----------
 
-def calcular_hash(ruta_archivo):
-    """Calcula el hash SHA-256 de un archivo."""
+def usar_algoritmo_hash(algoritmo):
+    """Elige el algoritmo de los hashes nuevos ("sha256" o "blake2b")."""
+    global _algoritmo_hash
+    if algoritmo not in ALGORITMOS:
+        raise ValueError(f"Algoritmo de hash desconocido: {algoritmo}")
+    _algoritmo_hash = algoritmo
+
+
+def algoritmo_hash():
+    """Algoritmo con el que se calculan los hashes nuevos."""
+    return _algoritmo_hash
+
+
+def calcular_hash(ruta_archivo, usar_cache=True, algoritmo=None):
+    """
+    Calcula el hash de un archivo (con el algoritmo elegido, SHA-256 si no
+    se ha cambiado).
+    Si el archivo no ha cambiado (tamaño, fecha e inodo) desde la última
+    vez, devuelve el hash guardado en la caché sin volver a leerlo.
+    """
+    algoritmo = algoritmo or _algoritmo_hash
     try:
-        with open(ruta_archivo, "rb") as f:
-            hasher = hashlib.sha256()
-            while chunk := f.read(8192):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+        st = os.stat(ruta_archivo)
+        if usar_cache:
+            try:
+                guardado = _cache_hash.obtener(ruta_archivo, st, algoritmo)
+            except Exception:
+                guardado = None
+            if guardado:
+                return guardado
+
+        digest, st = hash_archivo(ruta_archivo, algoritmo)
+
+        if usar_cache:
+            try:
+                _cache_hash.guardar(ruta_archivo, st, digest, algoritmo)
+            except Exception:
+                pass
+        return digest
     except Exception:
         return None
 
 
+def calcular_huella(ruta_archivo):
+    """
+    Huella rápida de un archivo: tamaño, fecha de modificación y un hash
+    de los primeros y los últimos 64 KB. Basta para ver que un archivo no
+    se ha cambiado por otro sin tener que leerlo entero.
+    Devuelve un texto "tamaño:mtime:hash", o None si no se puede leer.
+    """
+    try:
+        with open(ruta_archivo, "rb") as f:
+            st = os.fstat(f.fileno())
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(f.read(BYTES_HUELLA))
+            if st.st_size > 2 * BYTES_HUELLA:
+                f.seek(-BYTES_HUELLA, os.SEEK_END)
+            hasher.update(f.read(BYTES_HUELLA))
+        # mtime en segundos: al mover entre discos se pueden perder los ns
+        return f"{st.st_size}:{int(st.st_mtime)}:{hasher.hexdigest()}"
+    except OSError:
+        return None
+
+
+def calcular_huella_y_hash(ruta_archivo):
+    """(huella, hash) de un archivo, para registrar una operación."""
+    return calcular_huella(ruta_archivo), calcular_hash(ruta_archivo)
+
+
+def comprobar_archivo(ruta_archivo, huella, operaciones):
+    """
+    Busca entre las 'operaciones' registradas la que corresponde a este
+    archivo. Primero se compara la huella rápida; solo si ninguna coincide
+    se calcula el hash completo (con el algoritmo de cada registro; los
+    antiguos son SHA-256) y se compara con los registrados.
+
+    Devuelve (op, hash, algoritmo, nivel):
+    - op: la operación que coincide, o None
+    - hash: el hash del archivo (el registrado, si bastó la huella)
+    - algoritmo: con qué algoritmo está calculado ese hash
+    - nivel: "huella" o "hash", según lo que haya hecho falta
+    """
+    if huella:
+        for op in operaciones:
+            if op.get("huella") == huella and op.get("hash"):
+                return op, op["hash"], op.get("algoritmo", "sha256"), "huella"
+
+    calculados = {}
+    for op in operaciones:
+        if not op.get("hash"):
+            continue
+        algoritmo = op.get("algoritmo", "sha256")
+        if algoritmo not in calculados:
+            calculados[algoritmo] = calcular_hash(ruta_archivo, algoritmo=algoritmo)
+        if calculados[algoritmo] == op["hash"]:
+            return op, op["hash"], algoritmo, "hash"
+
+    digest = calculados.get(_algoritmo_hash) or calcular_hash(ruta_archivo)
+    return None, digest, _algoritmo_hash, "hash"
+
+
+def calcular_hashes(rutas, hilos=None, max_pendientes=None, funcion=None):
+    """
+    Calcula los hashes de varias rutas con un grupo de hilos (o lo que
+    devuelva 'funcion' para cada ruta, p. ej. calcular_huella).
+
+    Devuelve un generador de (ruta, hash) en el MISMO orden que 'rutas',
+    de modo que el bucle de cada operación puede ir consumiendo hashes
+    ya calculados. Como mucho hay 'max_pendientes' hashes en curso o
+    esperando a ser consumidos.
+    """
+    hilos = hilos or HILOS_HASH
+    max_pendientes = max_pendientes or hilos * 4
+    funcion = funcion or calcular_hash
+
+    pendientes = deque()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        try:
+            for ruta in rutas:
+                pendientes.append((ruta, pool.submit(funcion, ruta)))
+                if len(pendientes) >= max_pendientes:
+                    ruta_lista, futuro = pendientes.popleft()
+                    yield ruta_lista, futuro.result()
+
+            while pendientes:
+                ruta_lista, futuro = pendientes.popleft()
+                yield ruta_lista, futuro.result()
+        finally:
+            # Si el consumidor abandona el bucle, no seguimos leyendo archivos
+            for _, futuro in pendientes:
+                futuro.cancel()
+
+
+def olvidar_hash(ruta_archivo):
+    """Quita un archivo de la caché de hashes (p. ej. tras borrarlo)."""
+    try:
+        _cache_hash.olvidar(ruta_archivo)
+    except Exception:
+        pass
+
+
+def purgar_cache_hash():
+    """
+    Elimina de la caché las entradas de archivos que ya no existen o han
+    cambiado. Devuelve cuántas se han eliminado.
+    """
+    return _cache_hash.purgar_inexistentes()
+
+
+def estadisticas_cache_hash():
+    """Entradas de la caché de hashes y aciertos / fallos en esta sesión."""
+    return _cache_hash.estadisticas()
+
+
 # ---------- FUNCIONES DE REGISTRO JSON ----------
 
 def leer_json():
-    """Lee el archivo JSON de registro si existe."""
-    if os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return []
-    return []
+    """Lee todas las operaciones registradas (registro antiguo + diario)."""
+    return _diario.leer()
+
+
+def indice_registro():
+    """
+    Índice de operaciones por 'archivo_nuevo', 'archivo_cuarentena' y 'hash'.
+    Se construye una vez y se actualiza solo al registrar operaciones.
+    """
+    return _diario.indice()
 
 
 def guardar_json(data):
-    """Guarda la lista completa de operaciones en el archivo JSON."""
-    with open(LOG_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Sustituye el registro completo por la lista de operaciones dada."""
+    _diario.reescribir(data)
 
 
 def registrar_operacion(operaciones):
     """
-    Añade una o varias operaciones al registro JSON.
+    Añade una o varias operaciones al diario de operaciones.
     Cada operación es un diccionario con:
     {
         "accion": "renombrado/eliminado/revertido",
         "archivo_original": "...",
         "archivo_nuevo": "...",
         "hash": "...",
+        "algoritmo": "sha256/blake2b",
+        "huella": "tamaño:mtime:hash de los extremos",
+        "verificacion": "huella/hash (al revertir o restaurar)",
         "fecha": "YYYY-MM-DD HH:MM:SS"
     }
+    Las operaciones se escriben en disco por lotes; usa vaciar_registro()
+    al terminar un proceso para asegurarte de que todo queda guardado.
     """
-    registro = leer_json()
     if isinstance(operaciones, dict):
         operaciones = [operaciones]
 
     fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     for op in operaciones:
         op["fecha"] = fecha
-        registro.append(op)
-    guardar_json(registro)
+    _diario.anadir(operaciones)
+
+
+def vaciar_registro():
+    """Escribe en disco las operaciones que queden pendientes."""
+    _diario.volcar()
+
+
+def existe_registro():
+    """Indica si hay operaciones registradas."""
+    return _diario.existe()
 
 
 # ---------- FUNCIONES DE INTERFAZ ----------
@@ -0,0 +1,296 @@
+# visor_log.py
+# ==========================================================
+# Visor de log virtualizado (buffer circular + ventana visible)
+# ==========================================================
+
+import tkinter as tk
+import tkinter.font as tkfont
+
+
+class BufferLineas:
+    """
+    Buffer circular de líneas de texto. Cada línea guarda también sus
+    etiquetas de color. Al llenarse, se descartan las más antiguas.
+    """
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.vaciar()
+
+    def __len__(self):
+        return self._total
+
+    def vaciar(self):
+        # Las listas crecen hasta 'capacidad'; a partir de ahí, circulares
+        self._lineas = []
+        self._etiquetas = []
+        self._inicio = 0
+        self._total = 0
+
+    def anadir(self, linea, etiquetas):
+        """Añade una línea. Devuelve True si se ha descartado la más antigua."""
+        if self._total < self.capacidad:
+            self._lineas.append(linea)
+            self._etiquetas.append(etiquetas)
+            self._total += 1
+            return False
+
+        pos = self._inicio
+        self._lineas[pos] = linea
+        self._etiquetas[pos] = etiquetas
+        self._inicio = (self._inicio + 1) % self.capacidad
+        return True
+
+    def linea(self, i):
+        pos = (self._inicio + i) % self.capacidad
+        return self._lineas[pos], self._etiquetas[pos]
+
+    def ampliar_ultima(self, texto):
+        pos = (self._inicio + self._total - 1) % self.capacidad
+        self._lineas[pos] += texto
+
+    def rango(self, desde, hasta):
+        """Devuelve las líneas [desde, hasta) como lista de (texto, etiquetas)."""
+        return [self.linea(i) for i in range(max(0, desde), min(hasta, self._total))]
+
+
+class VisorLog(tk.Frame):
+    """
+    Sustituto de ScrolledText para logs muy largos.
+
+    Las líneas se guardan en un BufferLineas y el Text interior solo
+    contiene las que caben en pantalla, así que añadir 200.000 líneas no
+    ralentiza Tk. Admite la parte del API de Text que usa el programa:
+    insert(END, texto, etiqueta), delete(1.0, END), see(END),
+    get("sel.first", "sel.last") y tag_config().
+
+    La selección es por líneas completas (clic, arrastrar, Mayús+clic),
+    y puede abarcar líneas que no están en pantalla.
+    """
+
+    def __init__(self, master, capacidad=1_000_000, **opciones_texto):
+        fondo = opciones_texto.get("bg", "#1E1E1E")
+        super().__init__(master, bg=fondo)
+
+        self._buffer = BufferLineas(capacidad)
+        self._linea_abierta = False  # la última línea no acaba en "\n"
+        self._primera = 0  # primera línea visible
+        self._seguir_final = True
+        self._render_pendiente = False
+
+        # Selección (índices absolutos en el buffer, inclusive)
+        self._ancla = None
+        self._cursor = None
+
+        self._texto = tk.Text(self, wrap="none", **opciones_texto)
+        self._barra = tk.Scrollbar(self, orient="vertical", command=self._yview)
+        self._barra.pack(side="right", fill="y")
+        self._texto.pack(side="left", fill="both", expand=True)
+        self._texto.tag_config("seleccion", background="#264F78")
+        self._texto.configure(state="disabled")
+
+        self._alto_linea = tkfont.Font(font=self._texto.cget("font")).metrics(
+            "linespace"
+        )
+
+        self._texto.bind("<Configure>", lambda _e: self._programar_render())
+        self._texto.bind("<MouseWheel>", self._rueda)
+        self._texto.bind("<Button-4>", lambda _e: self._desplazar(-3))
+        self._texto.bind("<Button-5>", lambda _e: self._desplazar(3))
+        self._texto.bind("<Button-1>", self._clic)
+        self._texto.bind("<Shift-Button-1>", self._clic_mayus)
+        self._texto.bind("<B1-Motion>", self._arrastrar)
+        self._texto.bind("<Control-c>", self._copiar)
+        self._texto.bind("<Control-a>", self._seleccionar_todo)
+
+    # ---------- API COMPATIBLE CON Text ----------
+
+    def insert(self, _indice, texto, *etiquetas):
+        if not texto:
+            return
+        etiquetas = tuple(etiquetas) or None
+        trozos = texto.split("\n")
+
+        # El primer trozo continúa la última línea si quedó abierta
+        inicio = 0
+        if self._linea_abierta:
+            self._buffer.ampliar_ultima(trozos[0])
+            inicio = 1
+
+        for trozo in trozos[inicio:-1]:
+            self._anadir_linea(trozo, etiquetas)
+        if len(trozos) > inicio:
+            # Lo que hay tras el último "\n" (puede ser "")
+            ultimo = trozos[-1]
+            if ultimo:
+                self._anadir_linea(ultimo, etiquetas)
+                self._linea_abierta = True
+            else:
+                self._linea_abierta = False
+        self._programar_render()
+
+    def delete(self, *_indices):
+        self._buffer.vaciar()
+        self._linea_abierta = False
+        self._primera = 0
+        self._seguir_final = True
+        self._ancla = self._cursor = None
+        self._programar_render()
+
+    def see(self, indice=tk.END):
+        if str(indice) == tk.END:
+            self._seguir_final = True
+            self._programar_render()
+
+    def get(self, desde, hasta=None):
+        if desde == "sel.first":
+            if self._ancla is None:
+                raise tk.TclError(
+                    'text doesn\'t contain any characters tagged with "sel"'
+                )
+            a, b = sorted((self._ancla, self._cursor))
+            return "\n".join(t for t, _ in self._buffer.rango(a, b + 1))
+
+        lineas = [t for t, _ in self._buffer.rango(0, len(self._buffer))]
+        texto = "\n".join(lineas)
+        return texto if self._linea_abierta else texto + "\n"
+
+    def tag_config(self, etiqueta, **opciones):
+        self._texto.tag_config(etiqueta, **opciones)
+        self._texto.tag_raise("seleccion")
+
+    tag_configure = tag_config
+
+    # ---------- INTERNOS ----------
+
+    def _anadir_linea(self, linea, etiquetas):
+        if self._buffer.anadir(linea, etiquetas):
+            # Se ha descartado la línea 0: corregimos los índices
+            self._primera = max(0, self._primera - 1)
+            if self._ancla is not None:
+                self._ancla = max(0, self._ancla - 1)
+                self._cursor = max(0, self._cursor - 1)
+
+    def _filas_visibles(self):
+        alto = self._texto.winfo_height()
+        if alto <= 1:
+            return int(self._texto.cget("height"))
+        return max(1, alto // max(1, self._alto_linea))
+
+    def _programar_render(self):
+        if not self._render_pendiente:
+            self._render_pendiente = True
+            self.after_idle(self._render)
+
+    def _render(self):
+        self._render_pendiente = False
+        filas = self._filas_visibles()
+        total = len(self._buffer)
+        ultima_posible = max(0, total - filas)
+
+        if self._seguir_final:
+            self._primera = ultima_posible
+        self._primera = max(0, min(self._primera, ultima_posible))
+
+        t = self._texto
+        t.configure(state="normal")
+        t.delete("1.0", tk.END)
+
+        # Insertamos agrupando líneas seguidas con las mismas etiquetas
+        grupo, etiquetas_grupo = [], None
+        for texto, etiquetas in self._buffer.rango(self._primera, self._primera + filas):
+            if grupo and etiquetas != etiquetas_grupo:
+                t.insert(tk.END, "\n".join(grupo) + "\n", etiquetas_grupo or ())
+                grupo = []
+            grupo.append(texto)
+            etiquetas_grupo = etiquetas
+        if grupo:
+            t.insert(tk.END, "\n".join(grupo) + "\n", etiquetas_grupo or ())
+
+        if self._ancla is not None:
+            a, b = sorted((self._ancla, self._cursor))
+            a = max(a, self._primera) - self._primera
+            b = min(b, self._primera + filas - 1) - self._primera
+            if a <= b:
+                t.tag_add("seleccion", f"{a + 1}.0", f"{b + 2}.0")
+
+        t.configure(state="disabled")
+
+        if total:
+            self._barra.set(self._primera / total, min(1.0, (self._primera + filas) / total))
+        else:
+            self._barra.set(0.0, 1.0)
+
+    def _desplazar(self, lineas):
+        filas = self._filas_visibles()
+        ultima_posible = max(0, len(self._buffer) - filas)
+        self._primera = max(0, min(self._primera + lineas, ultima_posible))
+        self._seguir_final = self._primera >= ultima_posible
+        self._programar_render()
+        return "break"
+
+    def _yview(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            filas = self._filas_visibles()
+            destino = int(float(args[1]) * len(self._buffer))
+            self._desplazar(destino - self._primera)
+            if destino + filas >= len(self._buffer):
+                self._seguir_final = True
+        elif args[0] == "scroll":
+            cantidad = int(args[1])
+            if args[2] == "pages":
+                cantidad *= self._filas_visibles()
+            self._desplazar(cantidad)
+
+    def _rueda(self, evento):
+        return self._desplazar(-3 if evento.delta > 0 else 3)
+
+    def _linea_en(self, y):
+        fila = int(self._texto.index(f"@0,{max(0, y)}").split(".")[0]) - 1
+        return max(0, min(self._primera + fila, len(self._buffer) - 1))
+
+    def _clic(self, evento):
+        self._texto.focus_set()
+        if not len(self._buffer):
+            return "break"
+        self._ancla = self._cursor = self._linea_en(evento.y)
+        self._programar_render()
+        return "break"
+
+    def _clic_mayus(self, evento):
+        if self._ancla is None:
+            return self._clic(evento)
+        self._cursor = self._linea_en(evento.y)
+        self._programar_render()
+        return "break"
+
+    def _arrastrar(self, evento):
+        if self._ancla is None:
+            return "break"
+        # Si el ratón sale por arriba o por abajo, desplazamos la vista
+        if evento.y < 0:
+            self._desplazar(-1)
+        elif evento.y > self._texto.winfo_height():
+            self._desplazar(1)
+        self._cursor = self._linea_en(
+            min(max(evento.y, 0), self._texto.winfo_height() - 1)
+        )
+        self._programar_render()
+        return "break"
+
+    def _seleccionar_todo(self, _evento=None):
+        if len(self._buffer):
+            self._ancla, self._cursor = 0, len(self._buffer) - 1
+            self._programar_render()
+        return "break"
+
+    def _copiar(self, _evento=None):
+        try:
+            texto = self.get("sel.first", "sel.last")
+        except tk.TclError:
+            return "break"
+        self.clipboard_clear()
+        self.clipboard_append(texto)
+        return "break"